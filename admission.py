@@ -0,0 +1,126 @@
+"""Admission control for the render and merge stages: admit work against a memory budget, queue the rest"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import metrics
+from slide_specs import get_render_profile, get_render_workers, DEFAULT_RENDERER
+
+def _default_budget():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 2
+    except (OSError, ValueError, AttributeError):
+        return 2 * 1024 ** 3
+
+ADMISSION_MEMORY_BYTES = int(os.environ.get('ADMISSION_MEMORY_BYTES', 0)) or _default_budget()
+# Interactive requests allowed to wait at once, and for how long, before getting a 503
+ADMISSION_QUEUE_SIZE = int(os.environ.get('ADMISSION_QUEUE_SIZE', 8))
+ADMISSION_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT', 30))
+ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 10))
+
+# Peak-memory model, fitted to RSS while rendering the sample deck. Raster slides render and merge page by
+# page, so the cost follows the slides in flight (at most the deck's render workers) plus the one page being
+# encoded or merged, not the deck length; vector cost still grows with slides
+SLIDE_AREA_SQ_INCHES = 15.9 * 8.9
+RENDER_BYTES_PER_PIXEL = {'matplotlib': 120, 'pillow': 8}
+MERGE_BYTES_PER_PIXEL = 4
+VECTOR_BYTES_PER_SLIDE = {'pdf': 45 * 1024 ** 2, 'ppt': 2 * 1024 ** 2, 'html': 256 * 1024}
+REQUEST_BASE_BYTES = 16 * 1024 ** 2
+# Streamed decks are admitted before their slide count is known
+DEFAULT_SLIDE_ESTIMATE = 8
+
+def estimate_render_bytes(slides, format, mode='vector', profile='print', renderer=None, encoding=None,
+                          workers=None):
+    """Rough peak memory for rendering and merging one deck"""
+    slides = slides or DEFAULT_SLIDE_ESTIMATE
+    if mode == 'vector' or format == 'html':
+        return REQUEST_BASE_BYTES + slides * VECTOR_BYTES_PER_SLIDE[format]
+    dpi = get_render_profile(profile, encoding)['dpi']
+    pixels = SLIDE_AREA_SQ_INCHES * dpi * dpi
+    in_flight = min(get_render_workers(workers), slides)
+    per_pixel = in_flight * RENDER_BYTES_PER_PIXEL[renderer or DEFAULT_RENDERER] + MERGE_BYTES_PER_PIXEL
+    return REQUEST_BASE_BYTES + int(pixels * per_pixel)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; the server answers 503 with Retry-After"""
+
+    def __init__(self, reason, retry_after=ADMISSION_RETRY_AFTER):
+        super().__init__(f'render capacity exhausted ({reason}), retry in {retry_after}s')
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """FIFO memory-budget gate. A request whose estimate exceeds the whole budget runs alone.
+
+    Bounded (interactive) waiters are limited to max_queue and max_wait; unbounded ones (background
+    jobs, batch items) wait as long as it takes.
+    """
+
+    def __init__(self, budget=ADMISSION_MEMORY_BYTES, max_queue=ADMISSION_QUEUE_SIZE, max_wait=ADMISSION_MAX_WAIT):
+        self.budget = budget
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_use = 0
+        self.active = 0
+        self._bounded_waiting = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+
+    def _reject(self, reason):
+        metrics.admission_rejections.inc(reason=reason)
+        raise Overloaded(reason)
+
+    def _wait_turn(self, cost, bounded):
+        if bounded and self._bounded_waiting >= self.max_queue:
+            self._reject('queue_full')
+        ticket = object()
+        self._queue.append(ticket)
+        self._bounded_waiting += bounded
+        deadline = time.monotonic() + self.max_wait if bounded else None
+        try:
+            while self._queue[0] is not ticket or self.in_use + cost > self.budget:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    self._reject('timeout')
+                self._cond.wait(remaining)
+        finally:
+            self._queue.remove(ticket)
+            self._bounded_waiting -= bounded
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, cost, bounded=True):
+        cost = min(cost, self.budget)
+        started = time.perf_counter()
+        with self._cond:
+            if self._queue or self.in_use + cost > self.budget:
+                self._wait_turn(cost, bounded)
+            self.in_use += cost
+            self.active += 1
+        metrics.observe_stage('admission_wait', time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_use -= cost
+                self.active -= 1
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {'queue_depth': len(self._queue), 'active': self.active, 'in_use_bytes': self.in_use,
+                    'budget_bytes': self.budget}
+
+_controller = AdmissionController()
+
+def get_admission_controller():
+    return _controller
+
+def admission_gauges():
+    stats = _controller.stats()
+    return {f'flowchats_admission_{name}': {(): value} for name, value in stats.items()}
+
+metrics.GAUGE_PROVIDERS.append(admission_gauges)
@@ -1,11 +1,62 @@
+import copy
+import hashlib
 import json
+import os
 import re
-from groq import Groq
+import threading
+import time
+from caching import LRUCache, SQLiteCache, SingleFlight, AsyncSingleFlight
+import metrics
 
-client = Groq(api_key='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')
+GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
+# Connection pool of the async client: LLM calls are I/O-bound, so one event loop can keep hundreds in flight
+LLM_MAX_CONNECTIONS = int(os.environ.get('LLM_MAX_CONNECTIONS', 256))
+LLM_MAX_KEEPALIVE = int(os.environ.get('LLM_MAX_KEEPALIVE', 64))
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 60))
 
-def get_presentation_structure(topic):
-    prompt = f"""Create a presentation structure for: "{topic}"
+# Created on first use so importing this module does not pay for the groq SDK; tests and benchmarks may assign it
+client = None
+async_client = None
+
+def _api_key():
+    if not GROQ_API_KEY:
+        raise RuntimeError('GROQ_API_KEY is not set; export it before starting the server')
+    return GROQ_API_KEY
+
+def get_client():
+    global client
+    if client is None:
+        from groq import Groq
+        client = Groq(api_key=_api_key())
+    return client
+
+def get_async_client():
+    """AsyncGroq over one pooled httpx.AsyncClient; must be used from a single event loop"""
+    global async_client
+    if async_client is None:
+        api_key = _api_key()
+        import httpx
+        from groq import AsyncGroq
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_KEEPALIVE),
+            timeout=LLM_TIMEOUT)
+        async_client = AsyncGroq(api_key=api_key, http_client=http_client, timeout=LLM_TIMEOUT)
+    return async_client
+
+STRUCTURE_MODEL = "openai/gpt-oss-20b"
+STRUCTURE_TEMPERATURE = 0.3
+STRUCTURE_CACHE_TTL = int(os.environ.get('STRUCTURE_CACHE_TTL', 24 * 60 * 60))
+
+_structure_cache = LRUCache(max_entries=int(os.environ.get('STRUCTURE_CACHE_SIZE', 1024)), ttl=STRUCTURE_CACHE_TTL)
+_structure_disk_cache = SQLiteCache(os.environ['STRUCTURE_CACHE_DB'], ttl=STRUCTURE_CACHE_TTL) if os.environ.get('STRUCTURE_CACHE_DB') else None
+_structure_flight = SingleFlight()
+_async_structure_flight = AsyncSingleFlight()
+# Streamed completions in flight: key -> Event set once the first stream has finished (and cached its result)
+_structure_streams = {}
+_structure_streams_lock = threading.Lock()
+
+def build_structure_prompt(topic):
+    return f"""Create a presentation structure for: "{topic}"
 Return ONLY a JSON object with this EXACT structure:
 {{
   "title": "Main Presentation Title",
@@ -59,17 +110,264 @@ Requirements:
 - Each slide type should have appropriate fields.
 - No explanation, just JSON."""
 
-    completion = client.chat.completions.create(
-        model="openai/gpt-oss-20b",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.3,
-        max_tokens=2000
-    )
-    response = completion.choices[0].message.content
+def parse_structure_response(response):
     json_match = re.search(r'\{.*\}', response, re.DOTALL)
     if json_match:
         json_str = json_match.group(0)
         return json.loads(json_str)
+    return None
+
+def request_structure_completion(topic):
+    with metrics.timed('llm', mode='blocking'):
+        completion = get_client().chat.completions.create(
+            model=STRUCTURE_MODEL,
+            messages=[{"role": "user", "content": build_structure_prompt(topic)}],
+            temperature=STRUCTURE_TEMPERATURE,
+            max_tokens=2000
+        )
+    metrics.record_usage(getattr(completion, 'usage', None))
+    return parse_structure_response(completion.choices[0].message.content)
+
+async def request_structure_completion_async(topic):
+    with metrics.timed('llm', mode='async'):
+        completion = await get_async_client().chat.completions.create(
+            model=STRUCTURE_MODEL,
+            messages=[{"role": "user", "content": build_structure_prompt(topic)}],
+            temperature=STRUCTURE_TEMPERATURE,
+            max_tokens=2000
+        )
+    metrics.record_usage(getattr(completion, 'usage', None))
+    return parse_structure_response(completion.choices[0].message.content)
+
+def normalize_topic(topic):
+    return ' '.join(topic.lower().split())
+
+def structure_cache_key(topic, model=STRUCTURE_MODEL, temperature=STRUCTURE_TEMPERATURE):
+    payload = json.dumps([normalize_topic(topic), model, temperature])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _load_structure(key, topic):
+    if _structure_disk_cache is not None:
+        structure = _structure_disk_cache.get(key)
+        if structure is not None:
+            _structure_cache.put(key, structure)
+            return structure
+    structure = request_structure_completion(topic)
+    if structure is not None:
+        _structure_cache.put(key, structure)
+        if _structure_disk_cache is not None:
+            _structure_disk_cache.put(key, structure)
+    return structure
+
+def get_presentation_structure(topic, use_cache=True):
+    with metrics.timed('structure'):
+        if use_cache:
+            key = structure_cache_key(topic)
+            structure = _structure_cache.get(key)
+            metrics.structure_requests.inc(result='miss' if structure is None else 'hit')
+            if structure is None:
+                structure = _structure_flight.do(key, lambda: _load_structure(key, topic))
+            # Callers annotate slides in place, so never hand out the cached object itself
+            structure = copy.deepcopy(structure)
+        else:
+            structure = request_structure_completion(topic)
+    if structure is not None:
+        return structure
+    return fallback_structure(topic)
+
+async def _load_structure_async(key, topic):
+    import asyncio
+    # SQLite is blocking, so the disk tier runs on a thread instead of on the event loop
+    if _structure_disk_cache is not None:
+        structure = await asyncio.to_thread(_structure_disk_cache.get, key)
+        if structure is not None:
+            _structure_cache.put(key, structure)
+            return structure
+    structure = await request_structure_completion_async(topic)
+    if structure is not None:
+        _structure_cache.put(key, structure)
+        if _structure_disk_cache is not None:
+            await asyncio.to_thread(_structure_disk_cache.put, key, structure)
+    return structure
+
+async def get_presentation_structure_async(topic, use_cache=True):
+    """get_presentation_structure for an event loop: same caches, but the LLM call does not hold a thread"""
+    with metrics.timed('structure'):
+        if use_cache:
+            key = structure_cache_key(topic)
+            structure = _structure_cache.get(key)
+            metrics.structure_requests.inc(result='miss' if structure is None else 'hit')
+            if structure is None:
+                structure = await _async_structure_flight.do(key, lambda: _load_structure_async(key, topic))
+            structure = copy.deepcopy(structure)
+        else:
+            structure = await request_structure_completion_async(topic)
+    if structure is not None:
+        return structure
+    return fallback_structure(topic)
+
+class IncrementalSlidesParser:
+    """Scan a streamed JSON completion and emit the header and each slide object as soon as it closes"""
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.root_start = None
+        self.string_start = None
+        self.last_key = None
+        self.last_key_start = None
+        self.slide_start = None
+        self.in_slides = False
+        self.header = None
+        # Set once a slide object fails to parse; later slides are not emitted so the streamed ones stay a prefix
+        self.broken = False
+
+    def feed(self, text):
+        self.buffer += text
+        events = []
+        if self.broken:
+            return events
+        buf = self.buffer
+        for i in range(self.pos, len(buf)):
+            ch = buf[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                    if len(self.stack) == 1:
+                        self.last_key = buf[self.string_start + 1:i]
+                        self.last_key_start = self.string_start
+                continue
+            if ch == '"':
+                if self.stack:
+                    self.in_string = True
+                    self.string_start = i
+            elif ch in '{[':
+                if not self.stack:
+                    if ch != '{':
+                        continue
+                    self.root_start = i
+                elif len(self.stack) == 1 and ch == '[' and self.last_key == 'slides' and self.header is None:
+                    self.in_slides = True
+                    self.header = self._parse_header()
+                    events.append(('header', self.header))
+                elif self.in_slides and len(self.stack) == 2 and ch == '{':
+                    self.slide_start = i
+                self.stack.append(ch)
+            elif ch in '}]' and self.stack:
+                self.stack.pop()
+                if self.in_slides and len(self.stack) == 2 and ch == '}' and self.slide_start is not None:
+                    try:
+                        events.append(('slide', json.loads(buf[self.slide_start:i + 1])))
+                    except ValueError:
+                        self.broken = True
+                        break
+                    self.slide_start = None
+                elif self.in_slides and len(self.stack) == 1:
+                    self.in_slides = False
+        self.pos = len(buf)
+        return events
+
+    def _parse_header(self):
+        head = self.buffer[self.root_start:self.last_key_start].rstrip().rstrip(',')
+        try:
+            return json.loads(head + '}')
+        except ValueError:
+            return {}
+
+def _cached_structure(key):
+    structure = _structure_cache.get(key)
+    if structure is None and _structure_disk_cache is not None:
+        structure = _structure_disk_cache.get(key)
+    return structure
+
+def stream_presentation_structure(topic, llm_client=None, use_cache=True):
+    """Yield ('header', dict), then ('slide', dict) per slide, then ('done', structure) while the completion streams.
+
+    Concurrent streams for the same topic share one completion: later callers wait for the first one and replay
+    its cached result. If the completion cannot be parsed, the deck ends after the slides already streamed.
+    """
+    key = structure_cache_key(topic)
+    structure = _cached_structure(key) if use_cache else None
+    leader = None
+    if structure is None and use_cache:
+        with _structure_streams_lock:
+            leader = key not in _structure_streams
+            done = _structure_streams.setdefault(key, threading.Event())
+        if not leader:
+            done.wait()
+            structure = _cached_structure(key)
+    metrics.structure_requests.inc(result='miss' if structure is None else 'hit')
+    if structure is None:
+        try:
+            yield from _stream_completion(topic, key, llm_client, use_cache)
+        finally:
+            if leader:
+                with _structure_streams_lock:
+                    _structure_streams.pop(key, None)
+                done.set()
+        return
+    structure = copy.deepcopy(structure)
+    yield ('header', {k: v for k, v in structure.items() if k != 'slides'})
+    for slide in structure.get('slides', []):
+        yield ('slide', slide)
+    yield ('done', structure)
+
+def _stream_completion(topic, key, llm_client, use_cache):
+    parser = IncrementalSlidesParser()
+    started = time.perf_counter()
+    chunks = (llm_client or get_client()).chat.completions.create(
+        model=STRUCTURE_MODEL,
+        messages=[{"role": "user", "content": build_structure_prompt(topic)}],
+        temperature=STRUCTURE_TEMPERATURE,
+        max_tokens=2000,
+        stream=True
+    )
+    emitted = []
+    for chunk in chunks:
+        # Groq reports usage on the final chunk under x_groq
+        metrics.record_usage(getattr(chunk, 'usage', None) or getattr(getattr(chunk, 'x_groq', None), 'usage', None))
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        for event in parser.feed(delta):
+            if event[0] == 'slide':
+                emitted.append(event[1])
+            yield event
+    metrics.observe_stage('llm', time.perf_counter() - started, mode='stream')
+    try:
+        structure = parse_structure_response(parser.buffer)
+    except ValueError:
+        structure = None
+    if structure is not None and use_cache:
+        _structure_cache.put(key, structure)
+        if _structure_disk_cache is not None:
+            _structure_disk_cache.put(key, structure)
+    if structure is None and emitted:
+        # Truncated or malformed completion: keep what already streamed rather than appending canned slides;
+        # a degraded deck is never cached
+        structure = dict(parser.header or {}, slides=emitted, degraded=True)
+    elif structure is None:
+        structure = fallback_structure(topic)
+    structure = copy.deepcopy(structure)
+    if parser.header is None:
+        yield ('header', {k: v for k, v in structure.items() if k != 'slides'})
+    for slide in structure.get('slides', [])[len(emitted):]:
+        yield ('slide', slide)
+    yield ('done', structure)
+
+def structure_cache_stats():
+    return _structure_cache.stats()
+
+metrics.register_cache('structure', _structure_cache)
+
+def fallback_structure(topic):
     return {
         "title": f"Introduction to {topic.title()}",
         "subtitle": "A comprehensive overview",
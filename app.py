@@ -1,40 +1,244 @@
-from flask import Flask, request, send_file
-from ppt_generator import create_slide_images, convert_slides_to_images
-from ai_structures import get_presentation_structure
-from file_utils import merge_images_to_pdf, merge_images_to_ppt
-import tempfile
+from flask import Flask, request, send_file, jsonify, url_for, g, Response
+import metrics
+from admission import Overloaded
+import base64
+import cProfile
 import os
+import random
+import tempfile
+import time
 
+# Pipeline modules (matplotlib, numpy, PIL, python-pptx, groq) are imported inside the routes that need
+# them, so a cold instance only pays for what its first request uses
 app = Flask(__name__)
 
+_job_manager = None
+
+def get_job_manager():
+    global _job_manager
+    if _job_manager is None:
+        from jobs import JobManager
+        _job_manager = JobManager()
+    return _job_manager
+
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'flowchats-profiles'))
+
+@app.before_request
+def start_instrumentation():
+    g.timings_token = metrics.start_request_timings()
+    g.request_started = time.perf_counter()
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def add_server_timing(response):
+    total = time.perf_counter() - g.request_started
+    metrics.stage_duration.observe(total, stage='request', endpoint=request.endpoint or '')
+    timings = metrics.finish_request_timings(g.pop('timings_token'))
+    response.headers['Server-Timing'] = metrics.server_timing_header(timings + [('total', total)])
+    return response
+
+@app.teardown_request
+def stop_instrumentation(exc):
+    token = g.pop('timings_token', None)
+    if token is not None:
+        metrics.finish_request_timings(token)
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unknown'}-{os.getpid()}-{random.randrange(1 << 16):04x}.prof"
+        profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+
+@app.errorhandler(Overloaded)
+def render_overloaded(exc):
+    return jsonify({'error': str(exc)}), 503, {'Retry-After': str(exc.retry_after)}
+
+def arg_flag(name):
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
 @app.route('/generate/<format>/', methods=['GET'])
 def generate_presentation(format):
     prompt = request.args.get('prompt')
-    if not prompt or format not in ['pdf', 'ppt']:
-        return "Usage: /generate/{ppt|pdf}/?prompt=Your+Topic", 400
+    if not prompt or format not in ['pdf', 'ppt', 'html']:
+        return ("Usage: /generate/{ppt|pdf|html}/?prompt=Your+Topic[&mode=vector|raster][&renderer=matplotlib|pillow]"
+                "[&encoding=fast|png|optimized|palette|jpeg|webp]"), 400
+    from pipeline import generate_deck, generate_deck_cached, validate_options, validate_workers
+    mode = request.args.get('mode', 'vector')
+    profile = request.args.get('profile', 'print')
+    renderer = request.args.get('renderer')
+    encoding = request.args.get('encoding')
+    try:
+        validate_options(format, mode, profile, renderer, encoding)
+        workers = validate_workers(request.args.get('workers'))
+    except ValueError as exc:
+        return str(exc), 400
 
+    # send_file streams the buffer (or cached file) and closes it, which also removes any spill file
+    if arg_flag('stream') and format == 'pdf' and mode == 'raster':
+        # Each page goes out as soon as it is written, so the client sees bytes before the deck is finished
+        from pipeline import stream_deck_pdf
+        chunks, mimetype, download_name = stream_deck_pdf(prompt, profile, workers, renderer, encoding)
+        response = Response(chunks, mimetype=mimetype,
+                            headers={'Content-Disposition': f'attachment; filename={download_name}'})
+        response.cache_control.no_cache = True
+        return response
+    if arg_flag('stream'):
+        # Streamed decks are rendered before the final structure is known, so they bypass the artifact cache
+        result, mimetype, download_name = generate_deck(
+            prompt, format, mode=mode, profile=profile, renderer=renderer, encoding=encoding, workers=workers, stream=True)
+        response = send_file(result, mimetype=mimetype, as_attachment=format != 'html', download_name=download_name)
+        response.cache_control.no_cache = True
+        return response
+    from artifact_cache import ARTIFACT_MAX_AGE
+    result, mimetype, download_name, etag = generate_deck_cached(
+        prompt, format, mode=mode, profile=profile, renderer=renderer, encoding=encoding, workers=workers)
+    # A matching If-None-Match gets a 304 without the body; HTML decks open in the browser instead of downloading
+    return send_file(result, mimetype=mimetype, as_attachment=format != 'html', download_name=download_name, etag=etag,
+                     max_age=ARTIFACT_MAX_AGE)
+
+@app.route('/regenerate/<format>/', methods=['POST'])
+def regenerate_presentation(format):
+    from pipeline import regenerate_deck, validate_workers
+    params = request.get_json(silent=True) or {}
+    try:
+        # Only slides whose content changed since the last export are rendered again
+        result, mimetype, download_name = regenerate_deck(
+            params.get('structure'), format, mode=params.get('mode', 'raster'), profile=params.get('profile', 'print'),
+            renderer=params.get('renderer'), encoding=params.get('encoding'),
+            workers=validate_workers(params.get('workers')))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return send_file(result, mimetype=mimetype, as_attachment=format != 'html', download_name=download_name)
+
+@app.route('/preview/', methods=['GET'])
+def preview_presentation():
+    from slide_specs import build_slide_specs, get_image_encoding, get_render_profile, PREVIEW_PROFILES, RENDERERS, IMAGE_ENCODINGS
+    from image_encoding import IMAGE_MIMETYPES
+    from ai_structures import get_presentation_structure
+    from ppt_generator import iter_rendered_slides
+    from pipeline import validate_workers
+    prompt = request.args.get('prompt')
+    profile = request.args.get('profile', 'preview')
+    renderer = request.args.get('renderer')
+    encoding = request.args.get('encoding')
+    if (not prompt or profile not in PREVIEW_PROFILES or renderer not in (None,) + RENDERERS
+            or encoding not in (None,) + tuple(IMAGE_ENCODINGS)):
+        return ("Usage: /preview/?prompt=Your+Topic[&profile=preview|screen][&renderer=matplotlib|pillow]"
+                "[&encoding=fast|png|optimized|palette|jpeg|webp]"), 400
+    try:
+        workers = validate_workers(request.args.get('workers'))
+    except ValueError as exc:
+        return str(exc), 400
+    from admission import get_admission_controller, estimate_render_bytes
     presentation_data = get_presentation_structure(prompt)
-    slides = create_slide_images(presentation_data)
-    image_buffers = convert_slides_to_images(slides)
-
-    temp_dir = tempfile.mkdtemp()
-    image_files = []
-    for idx, buf in enumerate(image_buffers):
-        img_path = os.path.join(temp_dir, f"slide_{idx+1}.png")
-        with open(img_path, "wb") as f:
-            f.write(buf.read())
-        image_files.append(img_path)
-
-    if format == 'pdf':
-        result_file = merge_images_to_pdf(image_files, temp_dir)
-        mimetype = 'application/pdf'
-        download_name = 'presentation.pdf'
-    else:
-        result_file = merge_images_to_ppt(image_files, temp_dir)
-        mimetype = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
-        download_name = 'presentation.pptx'
-
-    return send_file(result_file, mimetype=mimetype, as_attachment=True, download_name=download_name)
+    specs = build_slide_specs(presentation_data)
+    mimetype = IMAGE_MIMETYPES[get_image_encoding(get_render_profile(profile, encoding))['format']]
+    # Previews share the render budget with full decks; Overloaded becomes a 503 like /generate/
+    cost = estimate_render_bytes(len(specs), 'pdf', 'raster', profile, renderer, encoding, workers)
+    with get_admission_controller().admit(cost):
+        slides = [
+            f'data:{mimetype};base64,' + base64.b64encode(buf.getvalue()).decode('ascii')
+            for buf in iter_rendered_slides(specs, workers, profile, renderer, encoding)
+        ]
+    return jsonify({
+        'title': presentation_data.get('title', ''),
+        'profile': profile,
+        'slides': slides
+    })
+
+@app.route('/events/<format>/', methods=['GET'])
+def deck_events(format):
+    prompt = request.args.get('prompt')
+    if not prompt:
+        return "Usage: /events/{ppt|pdf}/?prompt=Your+Topic[&mode=vector|raster][&profile=...][&renderer=...]", 400
+    from events import stream_deck_events
+    options = {
+        'mode': request.args.get('mode', 'vector'),
+        'profile': request.args.get('profile', 'print'),
+        'renderer': request.args.get('renderer'),
+        'encoding': request.args.get('encoding')
+    }
+    # The full-resolution deck renders as a job while low-resolution previews stream to the client
+    try:
+        job_id = get_job_manager().submit(prompt, format, **options)
+    except ValueError as exc:
+        return str(exc), 400
+    links = {
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id),
+        'download_url': url_for('job_download', job_id=job_id)
+    }
+    return Response(stream_deck_events(prompt, get_job_manager(), job_id, links),
+                    mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/', methods=['POST'])
+def submit_job():
+    params = request.get_json(silent=True) or request.form
+    prompt = params.get('prompt')
+    format = params.get('format', 'pdf')
+    if not prompt:
+        return jsonify({'error': 'prompt is required'}), 400
+    options = {
+        'mode': params.get('mode', 'vector'),
+        'profile': params.get('profile', 'print'),
+        'renderer': params.get('renderer'),
+        'encoding': params.get('encoding'),
+        'stream': str(params.get('stream', '')).lower() in ('1', 'true', 'yes', 'on')
+    }
+    try:
+        job_id = get_job_manager().submit(prompt, format, **options)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify({
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id),
+        'download_url': url_for('job_download', job_id=job_id)
+    }), 202
+
+@app.route('/batch/', methods=['POST'])
+def generate_batch():
+    from batch import validate_batch, stream_batch_zip
+    params = request.get_json(silent=True) or {}
+    prompts = params.get('prompts')
+    format = params.get('format', 'pdf')
+    options = {
+        'mode': params.get('mode', 'vector'),
+        'profile': params.get('profile', 'print'),
+        'renderer': params.get('renderer'),
+        'encoding': params.get('encoding')
+    }
+    try:
+        workers = validate_batch(prompts, format, workers=params.get('workers'), **options)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    # Entries are appended as decks finish; report.json at the end lists every item, including failures
+    return Response(stream_batch_zip(prompts, format, workers=workers, **options),
+                    mimetype='application/zip', headers={'Content-Disposition': 'attachment; filename=decks.zip'})
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = get_job_manager().status(job_id)
+    if job is None:
+        return jsonify({'error': 'unknown or expired job'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/download', methods=['GET'])
+def job_download(job_id):
+    job = get_job_manager().status(job_id)
+    if job is not None and job['status'] != 'done':
+        return jsonify(job), 409
+    result = get_job_manager().result(job_id)
+    if result is None:
+        return jsonify({'error': 'unknown or expired job'}), 404
+    fileobj, meta = result
+    return send_file(fileobj, mimetype=meta['mimetype'], as_attachment=True, download_name=meta['download_name'])
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,82 @@
+"""Finished-deck cache: artifacts on disk keyed by structure and render options, each with a strong ETag"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from caching import DiskCache
+from slide_specs import get_render_profile, DEFAULT_RENDERER
+import metrics
+
+ARTIFACT_CACHE_DIR = os.environ.get('ARTIFACT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'flowchats-artifacts'))
+# 0 disables the cache
+ARTIFACT_CACHE_BYTES = int(os.environ.get('ARTIFACT_CACHE_BYTES', 1024 ** 3))
+# Cache-Control max-age for cached decks; clients and the CDN revalidate with If-None-Match afterwards
+ARTIFACT_MAX_AGE = int(os.environ.get('ARTIFACT_MAX_AGE', 60 * 60))
+# Bump whenever rendering changes what a deck looks like
+ARTIFACT_CACHE_VERSION = 2
+
+_artifacts = None
+_artifacts_lock = threading.Lock()
+
+def get_artifact_cache():
+    """Return the shared DiskCache, created on first use, or None when disabled"""
+    global _artifacts
+    if ARTIFACT_CACHE_BYTES <= 0:
+        return None
+    with _artifacts_lock:
+        if _artifacts is None:
+            _artifacts = DiskCache(ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_BYTES)
+            metrics.register_cache('artifacts', _artifacts)
+        return _artifacts
+
+def artifact_key(structure, format, mode='vector', profile='print', renderer=None, encoding=None):
+    # Vector and HTML output ignore the raster options, so they stay out of their keys
+    raster = None
+    if mode == 'raster' and format != 'html':
+        raster = [get_render_profile(profile, encoding), renderer or DEFAULT_RENDERER]
+    payload = [ARTIFACT_CACHE_VERSION, structure, format, mode, raster]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _file_digest(fileobj):
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(1024 * 1024), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+def open_artifact(key):
+    """Return (fileobj, mimetype, download_name, etag) for a cached deck, or None"""
+    cache = get_artifact_cache()
+    if cache is None:
+        return None
+    meta = cache.get(key)
+    if meta is None:
+        return None
+    meta = json.loads(meta)
+    fileobj = cache.open('deck:' + meta['etag'])
+    if fileobj is None:
+        return None
+    return fileobj, meta['mimetype'], meta['download_name'], meta['etag']
+
+def store_artifact(key, result, mimetype, download_name):
+    """Cache a freshly rendered deck and return it as (fileobj, mimetype, download_name, etag).
+
+    The ETag is a hash of the bytes themselves: re-rendering the same deck is not byte-identical
+    (PDF creation dates), so an input hash would not be a valid strong validator. Deck bytes are stored
+    under their ETag and the key only points at one, so a reader never pairs a file with another render's ETag.
+    """
+    etag = _file_digest(result)
+    cache = get_artifact_cache()
+    if cache is None or not cache.put_file('deck:' + etag, result):
+        result.seek(0)
+        return result, mimetype, download_name, etag
+    cache.put(key, json.dumps({'mimetype': mimetype, 'download_name': download_name, 'etag': etag}).encode('utf-8'))
+    fileobj = cache.open('deck:' + etag)
+    if fileobj is None:
+        # Evicted already by another process; the rendered buffer still holds the same bytes
+        result.seek(0)
+        return result, mimetype, download_name, etag
+    result.close()
+    return fileobj, mimetype, download_name, etag
@@ -0,0 +1,215 @@
+"""ASGI entry point: /generate/ waits on the LLM without holding a thread, every other route goes to the Flask app.
+
+Under WSGI each request pins a worker thread for the whole structure call, so a few slow completions exhaust the
+pool while the CPUs sit idle. Here the structure comes from the async Groq client (one pooled HTTP connection
+set per process) so hundreds of calls can be in flight, and only rendering takes a thread, from an executor
+sized to the cores. Run one process per machine and let the render pool use the cores:
+
+    uvicorn asgi:app --workers 1
+"""
+import asyncio
+import contextvars
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+import metrics
+from admission import Overloaded
+
+# Decks rendering at once; raster slides still go to the shared process pool, so this bounds decks, not slides
+ASYNC_RENDER_THREADS = int(os.environ.get('ASYNC_RENDER_THREADS', 0)) or os.cpu_count() or 1
+# Threads for the Flask routes; SSE and long downloads hold one each for as long as they stream
+WSGI_THREADS = int(os.environ.get('WSGI_THREADS', 32))
+RESPONSE_CHUNK_SIZE = 256 * 1024
+GENERATE_PATH = re.compile(r'/generate/([^/]+)/')
+USAGE = (b"Usage: /generate/{ppt|pdf|html}/?prompt=Your+Topic[&mode=vector|raster][&renderer=matplotlib|pillow]"
+         b"[&encoding=fast|png|optimized|palette|jpeg|webp]")
+
+_render_executor = ThreadPoolExecutor(ASYNC_RENDER_THREADS, thread_name_prefix='asgi-render')
+_wsgi_executor = ThreadPoolExecutor(WSGI_THREADS, thread_name_prefix='asgi-wsgi')
+
+def _run_in(executor, fn, *args):
+    # Copy the context so stages timed on the worker thread still land in this request's Server-Timing
+    context = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(executor, lambda: context.run(fn, *args))
+
+def _header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+async def _send_simple(send, status, body, content_type=b'text/plain; charset=utf-8', headers=()):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())] + list(headers)})
+    await send({'type': 'http.response.body', 'body': body})
+
+async def generate_presentation(scope, send, format, args, started):
+    """Async twin of app.generate_presentation for non-streamed decks"""
+    from werkzeug.http import parse_etags, quote_etag
+    from pipeline import validate_options, validate_workers, render_structure_cached
+    from artifact_cache import artifact_key, open_artifact, ARTIFACT_MAX_AGE
+    from ai_structures import get_presentation_structure_async
+
+    prompt = args.get('prompt')
+    if not prompt or format not in ['pdf', 'ppt', 'html']:
+        return await _send_simple(send, 400, USAGE)
+    mode = args.get('mode', 'vector')
+    profile = args.get('profile', 'print')
+    renderer = args.get('renderer')
+    encoding = args.get('encoding')
+    try:
+        validate_options(format, mode, profile, renderer, encoding)
+        workers = validate_workers(args.get('workers'))
+    except ValueError as exc:
+        return await _send_simple(send, 400, str(exc).encode('utf-8'))
+
+    structure = await get_presentation_structure_async(prompt)
+    key = artifact_key(structure, format, mode, profile, renderer, encoding)
+    # Cache hits skip the render executor, so they never queue behind renders
+    cached = await asyncio.to_thread(open_artifact, key)
+    if cached is None:
+        cached = await _run_in(_render_executor, render_structure_cached, structure, format, mode, profile, workers,
+                               renderer, encoding)
+    fileobj, mimetype, download_name, etag = cached
+    headers = [(b'etag', quote_etag(etag).encode('latin-1')),
+               (b'cache-control', f'public, max-age={ARTIFACT_MAX_AGE}'.encode('latin-1'))]
+    try:
+        if parse_etags(_header(scope, b'if-none-match')).contains(etag):
+            # A 304 carries only the validators; content headers would override the cached representation's
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            return await send({'type': 'http.response.body', 'body': b''})
+        total = time.perf_counter() - started
+        disposition = 'inline' if format == 'html' else 'attachment'
+        timing = metrics.server_timing_header(metrics.current_request_timings() + [('total', total)])
+        fileobj.seek(0, 2)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers + [
+            (b'content-type', mimetype.encode('latin-1')),
+            (b'content-length', str(size).encode('latin-1')),
+            (b'content-disposition', f'{disposition}; filename={download_name}'.encode('latin-1')),
+            (b'server-timing', timing.encode('latin-1'))]})
+        while True:
+            chunk = await asyncio.to_thread(fileobj.read, RESPONSE_CHUNK_SIZE)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': bool(chunk)})
+            if not chunk:
+                break
+    finally:
+        fileobj.close()
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    return bytes(body)
+
+def _wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body)),
+    }
+    for key, value in scope['headers']:
+        name = key.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            name = 'HTTP_' + name
+            environ[name] = environ[name] + ',' + value if name in environ else value
+    return environ
+
+async def call_flask(scope, receive, send):
+    """Run the Flask app on the WSGI threads and relay its response chunk by chunk, so SSE and ZIPs still stream"""
+    from app import app as flask_app
+    environ = _wsgi_environ(scope, await _read_body(receive))
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+    loop = asyncio.get_running_loop()
+    app_iter = await loop.run_in_executor(_wsgi_executor, flask_app, environ, start_response)
+    try:
+        await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+        chunks = iter(app_iter)
+        while True:
+            chunk = await loop.run_in_executor(_wsgi_executor, next, chunks, None)
+            if chunk is None:
+                break
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(app_iter, 'close'):
+            await loop.run_in_executor(_wsgi_executor, app_iter.close)
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Fonts, figure templates and background layers are built before the first request rather than during it
+            import warmup
+            try:
+                elapsed = await _run_in(_render_executor, warmup.warm)
+                print(f'warmup finished in {elapsed:.2f}s', file=sys.stderr)
+            except Exception as exc:
+                print(f'warmup failed, continuing cold: {exc!r}', file=sys.stderr)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            import ai_structures
+            if ai_structures.async_client is not None:
+                await ai_structures.async_client.close()
+            _render_executor.shutdown(wait=False, cancel_futures=True)
+            _wsgi_executor.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        raise ValueError(f"unsupported ASGI scope type: {scope['type']}")
+    # Exactly the Flask rule /generate/<format>/; anything else (e.g. no trailing slash) is Flask's to answer
+    route = GENERATE_PATH.fullmatch(scope['path'])
+    args = {name: values[-1] for name, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+    # Streamed decks overlap the LLM stream with rendering on threads anyway, so Flask keeps those
+    if (scope['method'] == 'GET' and route is not None
+            and args.get('stream', '').lower() not in ('1', 'true', 'yes', 'on')):
+        token = metrics.start_request_timings()
+        started = time.perf_counter()
+        try:
+            await generate_presentation(scope, send, route.group(1), args, started)
+        except Overloaded as exc:
+            await _send_simple(send, 503, json.dumps({'error': str(exc)}).encode('utf-8'), b'application/json',
+                               [(b'retry-after', str(exc.retry_after).encode('latin-1'))])
+        finally:
+            metrics.stage_duration.observe(time.perf_counter() - started, stage='request', endpoint='generate_presentation')
+            metrics.finish_request_timings(token)
+        return
+    await call_flask(scope, receive, send)
@@ -0,0 +1,129 @@
+"""POST /batch/: generate several decks and stream them back as one ZIP, entry by entry as decks finish.
+
+The response lasts as long as the whole batch (each deck waits for its LLM call and renders in full), far past
+a serverless function's timeout, so the route is not deployed on Vercel; serve it from a long-lived process
+(gunicorn, uvicorn, app.run), or generate large batches offline with bulk.py.
+"""
+import json
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pipeline import OUTPUT_FORMATS, validate_options, validate_workers, render_deck
+from slide_specs import build_slide_specs
+from ai_structures import get_presentation_structure
+import metrics
+
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 500))
+# Concurrent Groq calls per batch, kept below the account's rate limit
+BATCH_STRUCTURE_CONCURRENCY = int(os.environ.get('BATCH_STRUCTURE_CONCURRENCY', 4))
+# Decks rendered at once; raster slides from all of them share the process render pool
+BATCH_RENDER_CONCURRENCY = int(os.environ.get('BATCH_RENDER_CONCURRENCY', 2))
+BATCH_COPY_CHUNK = 1024 * 1024
+
+def deck_filename(index, prompt, format):
+    slug = re.sub(r'[^a-z0-9]+', '-', prompt.lower()).strip('-')[:60] or 'deck'
+    extension = OUTPUT_FORMATS[format][1].rsplit('.', 1)[-1]
+    return f'{index + 1:03d}-{slug}.{extension}'
+
+def validate_batch(prompts, format, mode='vector', profile='print', renderer=None, encoding=None, workers=None):
+    """Check a batch request and return its per-deck worker count, capped at the render pool size"""
+    if not isinstance(prompts, list) or not prompts:
+        raise ValueError('prompts must be a non-empty list')
+    if len(prompts) > BATCH_MAX_ITEMS:
+        raise ValueError(f'at most {BATCH_MAX_ITEMS} prompts per batch')
+    validate_options(format, mode, profile, renderer, encoding)
+    return validate_workers(workers)
+
+def _build_item(index, prompt, structure_future, format, options):
+    item = {'index': index, 'prompt': prompt, 'status': 'failed'}
+    started = time.perf_counter()
+    try:
+        presentation_data, item['structure_s'] = structure_future.result()
+        rendered = time.perf_counter()
+        result, _, _ = render_deck(build_slide_specs(presentation_data), format, **options)
+        item['render_s'] = time.perf_counter() - rendered
+        item.update(status='done', filename=deck_filename(index, prompt, format))
+        return item, result
+    except Exception as exc:
+        item['error'] = f'{type(exc).__name__}: {exc}'
+        return item, None
+    finally:
+        item['total_s'] = time.perf_counter() - started
+
+def _timed_structure(prompt):
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError('prompt must be a non-empty string')
+    started = time.perf_counter()
+    return get_presentation_structure(prompt), time.perf_counter() - started
+
+def iter_batch(prompts, format, mode='vector', profile='print', workers=None, renderer=None, encoding=None,
+               structure_concurrency=None, render_concurrency=None):
+    """Yield (item, buffer) per prompt in completion order; failed items come back with buffer None"""
+    options = {'mode': mode, 'profile': profile, 'workers': workers, 'renderer': renderer, 'encoding': encoding,
+               'interactive': False}
+    structure_pool = ThreadPoolExecutor(structure_concurrency or BATCH_STRUCTURE_CONCURRENCY,
+                                        thread_name_prefix='batch-structure')
+    render_pool = ThreadPoolExecutor(render_concurrency or BATCH_RENDER_CONCURRENCY, thread_name_prefix='batch-render')
+    try:
+        structures = [structure_pool.submit(_timed_structure, prompt) for prompt in prompts]
+        futures = [render_pool.submit(_build_item, index, prompt, structures[index], format, options)
+                   for index, prompt in enumerate(prompts)]
+        for future in as_completed(futures):
+            item, result = future.result()
+            metrics.batch_items.inc(status=item['status'])
+            yield item, result
+    finally:
+        # A client that disconnects mid-stream closes the generator; drop the work that has not started
+        structure_pool.shutdown(wait=False, cancel_futures=True)
+        render_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _ChunkSink:
+    """Write-only file object that ZipFile streams into; drain() hands back what was written so far"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_batch_zip(prompts, format, **options):
+    """Yield a zip archive chunk by chunk, adding each deck as soon as it finishes and report.json last"""
+    sink = _ChunkSink()
+    report = {'format': format, 'options': {k: v for k, v in options.items() if v is not None}, 'items': []}
+    started = time.perf_counter()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+        for item, result in iter_batch(prompts, format, **options):
+            report['items'].append(item)
+            if result is None:
+                continue
+            try:
+                # PDFs and PPTX files are already compressed, so entries are stored as-is
+                with archive.open(item['filename'], 'w', force_zip64=True) as entry:
+                    while True:
+                        chunk = result.read(BATCH_COPY_CHUNK)
+                        if not chunk:
+                            break
+                        entry.write(chunk)
+                        yield sink.drain()
+            finally:
+                result.close()
+            yield sink.drain()
+        report['items'].sort(key=lambda entry: entry['index'])
+        report['succeeded'] = sum(1 for entry in report['items'] if entry['status'] == 'done')
+        report['failed'] = len(report['items']) - report['succeeded']
+        report['total_s'] = time.perf_counter() - started
+        archive.writestr('report.json', json.dumps(report, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    yield sink.drain()
@@ -0,0 +1,398 @@
+"""Micro-benchmarks for every render stage, with a deterministic stand-in for the Groq client.
+
+    python benchmark.py --dpi 72 150 --repeat 3 --output bench.json
+    python benchmark.py --compare bench.json --threshold 15
+"""
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from slide_specs import SAMPLE_DECK
+
+class _Obj:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+class FakeGroqClient:
+    """Deterministic replacement for ai_structures.client; supports both plain and streamed completions"""
+
+    def __init__(self, deck=SAMPLE_DECK, latency=0.0, chunk_size=64):
+        self.response = json.dumps(deck, indent=2)
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chat = _Obj(completions=self)
+        self.calls = 0
+
+    def create(self, stream=False, **kwargs):
+        self.calls += 1
+        if stream:
+            return self._stream()
+        time.sleep(self.latency)
+        message = _Obj(content=self.response)
+        return _Obj(choices=[_Obj(message=message)], usage=_Obj(prompt_tokens=0, completion_tokens=len(self.response) // 4))
+
+    def _stream(self):
+        chunks = [self.response[i:i + self.chunk_size] for i in range(0, len(self.response), self.chunk_size)]
+        for chunk in chunks:
+            time.sleep(self.latency / len(chunks))
+            yield _Obj(choices=[_Obj(delta=_Obj(content=chunk))])
+
+class FakeAsyncGroqClient(FakeGroqClient):
+    """FakeGroqClient for ai_structures.async_client: waits on the event loop instead of blocking a thread"""
+
+    async def create(self, stream=False, **kwargs):
+        import asyncio
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        message = _Obj(content=self.response)
+        return _Obj(choices=[_Obj(message=message)], usage=_Obj(prompt_tokens=0, completion_tokens=len(self.response) // 4))
+
+    async def close(self):
+        pass
+
+def _current_rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux and bytes on macOS; either way it is a lifetime high-water mark
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+class RSSSampler:
+    """Poll resident set size in the background and keep the peak seen while active"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _current_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = _current_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss())
+
+def measure(name, fn, repeat=3, setup=None, **params):
+    """Run fn repeat times (after an untimed setup) and summarise wall, CPU and peak RSS"""
+    walls, cpus, peaks = [], [], []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        with RSSSampler() as sampler:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            fn(*args)
+            cpus.append(time.process_time() - cpu_start)
+            walls.append(time.perf_counter() - wall_start)
+        peaks.append(sampler.peak)
+    result = {
+        'name': name,
+        'params': params,
+        'repeat': repeat,
+        'wall_s': {'median': statistics.median(walls), 'min': min(walls), 'max': max(walls)},
+        'cpu_s': {'median': statistics.median(cpus), 'min': min(cpus), 'max': max(cpus)},
+        'peak_rss_mb': max(peaks) / (1024 * 1024)
+    }
+    print(f"{name:<48} wall {result['wall_s']['median']:8.3f}s  cpu {result['cpu_s']['median']:8.3f}s  "
+          f"rss {result['peak_rss_mb']:8.1f}MB", flush=True)
+    return result
+
+def bench_slide_builders(repeat, dpi=150):
+    from ppt_generator import build_slide_specs, create_slide_figure
+    from pil_renderer import PillowSlideCanvas
+    from slide_layouts import draw_slide
+
+    results = []
+    for spec in build_slide_specs(copy.deepcopy(SAMPLE_DECK)):
+        slide_type = spec[0]
+        results.append(measure(f'create_slide[{slide_type},{dpi}dpi]', lambda: create_slide_figure(*spec, dpi=dpi),
+                               repeat, slide_type=slide_type, renderer='matplotlib', dpi=dpi))
+        results.append(measure(f'draw_slide[pillow,{slide_type},{dpi}dpi]',
+                               lambda: draw_slide(PillowSlideCanvas(spec[3], dpi), *spec),
+                               repeat, slide_type=slide_type, renderer='pillow', dpi=dpi))
+    return results
+
+def bench_encoders(repeat, dpis):
+    from ppt_generator import create_slide_images, convert_slides_to_images
+    from slide_specs import IMAGE_ENCODINGS, build_slide_specs
+    from pil_renderer import PillowSlideCanvas
+    from slide_layouts import draw_slide
+    from image_encoding import encode_image
+
+    def setup_for(dpi):
+        return lambda: (create_slide_images(copy.deepcopy(SAMPLE_DECK), dpi=dpi), dpi)
+
+    def encode(slides, dpi):
+        convert_slides_to_images(slides, {'dpi': dpi, 'encoding': 'optimized' if dpi >= 600 else 'png'})
+
+    results = [measure(f'convert_slides_to_images[{dpi}dpi]', encode, repeat, setup_for(dpi), dpi=dpi) for dpi in dpis]
+    # Encoder settings alone, on pre-drawn images so rasterization is not part of the timing
+    for dpi in dpis:
+        images = [(draw_slide(PillowSlideCanvas(spec[3], dpi), *spec), spec[3])
+                  for spec in build_slide_specs(copy.deepcopy(SAMPLE_DECK))]
+        for name, encoding in IMAGE_ENCODINGS.items():
+            sizes = []
+
+            def run():
+                sizes.clear()
+                for image, theme in images:
+                    buf = io.BytesIO()
+                    encode_image(image, buf, encoding, dpi, theme)
+                    sizes.append(buf.tell())
+            result = measure(f'encode_image[{name},{dpi}dpi]', run, repeat, encoding=name, dpi=dpi)
+            result['output_bytes'] = sum(sizes)
+            results.append(result)
+    return results
+
+def bench_merges(repeat, dpi):
+    from ppt_generator import render_slides_parallel
+    from file_utils import merge_images_to_pdf, merge_images_to_ppt
+
+    pngs = [buf.getvalue() for buf in render_slides_parallel(copy.deepcopy(SAMPLE_DECK), workers=1,
+                                                             profile={'dpi': dpi, 'encoding': 'png'})]
+    return [
+        measure(f'merge_images_to_pdf[{dpi}dpi]', lambda: merge_images_to_pdf(pngs).close(), repeat, dpi=dpi),
+        measure(f'merge_images_to_ppt[{dpi}dpi]', lambda: merge_images_to_ppt(pngs).close(), repeat, dpi=dpi)
+    ]
+
+def bench_incremental(repeat, profile='screen'):
+    """Re-export after a one-bullet edit: only the edited slide should miss the slide raster cache"""
+    import ppt_generator
+    from pipeline import regenerate_deck
+
+    def edited(n):
+        deck = copy.deepcopy(SAMPLE_DECK)
+        deck['slides'][0]['characteristics'][0] += f' (edit {n})'
+        return deck
+
+    def cold():
+        ppt_generator._slide_rasters.clear()
+        return (copy.deepcopy(SAMPLE_DECK),)
+
+    def export(deck):
+        regenerate_deck(deck, 'pdf', profile=profile, workers=1)[0].close()
+
+    edits = iter(range(1 << 30))
+    return [
+        measure(f'regenerate_deck[cold,{profile}]', export, repeat, cold, profile=profile),
+        measure(f'regenerate_deck[one_edit,{profile}]', export, repeat, lambda: (edited(next(edits)),), profile=profile)
+    ]
+
+def bench_end_to_end(repeat, profiles, llm_latency):
+    import ai_structures
+    import artifact_cache
+    import ppt_generator
+    from app import app
+
+    ai_structures.client = FakeGroqClient(latency=llm_latency)
+    # Every run should render from scratch: no finished decks and no cached slide rasters
+    artifact_cache.ARTIFACT_CACHE_BYTES = 0
+    ppt_generator._slide_rasters_disk = None
+    client = app.test_client()
+    cases = [('pdf', 'vector', None), ('ppt', 'vector', None), ('html', 'vector', None)]
+    cases += [(format, 'raster', profile) for profile in profiles for format in ('pdf', 'ppt')]
+    cases += [(format, 'raster', profile, 'pillow') for profile in profiles for format in ('pdf', 'ppt')]
+    results = []
+    for format, mode, profile, *renderer in cases:
+        query = f'/generate/{format}/?prompt=machine+learning&mode={mode}&workers=1'
+        if profile:
+            query += f'&profile={profile}'
+        if renderer:
+            query += f'&renderer={renderer[0]}'
+
+        def run():
+            ai_structures._structure_cache.clear()
+            ppt_generator._slide_rasters.clear()
+            response = client.get(query)
+            assert response.status_code == 200, response.data[:200]
+            response.close()
+
+        label = f'generate_presentation[{format},{mode}' + (f',{profile}' if profile else '') + \
+            ''.join(f',{name}' for name in renderer) + ']'
+        results.append(measure(label, run, repeat, format=format, mode=mode, profile=profile,
+                               renderer=renderer[0] if renderer else None))
+    return results
+
+def _asgi_get(app, path, query):
+    """Drive one GET through an ASGI app and return (status, body)"""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    async def call():
+        scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(), 'headers': [],
+                 'http_version': '1.1', 'scheme': 'http'}
+        await app(scope, receive, send)
+        return messages[0]['status'], b''.join(m.get('body', b'') for m in messages[1:])
+    return call
+
+def bench_concurrency(repeat, llm_latency, requests=64, threads=8):
+    """Many cold requests waiting on a slow LLM: WSGI threads each hold a thread per call, ASGI holds none"""
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    import ai_structures
+    import artifact_cache
+    from app import app
+    from asgi import app as asgi_app
+
+    latency = llm_latency or 0.5
+    ai_structures.client = FakeGroqClient(latency=latency)
+    ai_structures.async_client = FakeAsyncGroqClient(latency=latency)
+    # Every request should render, so the deck cache must not answer the later ones
+    artifact_cache.ARTIFACT_CACHE_BYTES = 0
+    client = app.test_client()
+    prompts = iter(range(1 << 30))
+
+    def wsgi():
+        def one(n):
+            response = client.get(f'/generate/ppt/?prompt=topic+{n}')
+            assert response.status_code == 200, response.data[:200]
+            response.close()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(one, [next(prompts) for _ in range(requests)]))
+
+    def asgi():
+        async def run_all():
+            calls = [_asgi_get(asgi_app, '/generate/ppt/', f'prompt=topic+{next(prompts)}')() for _ in range(requests)]
+            for status, body in await asyncio.gather(*calls):
+                assert status == 200, body[:200]
+        asyncio.run(run_all())
+
+    return [
+        measure(f'concurrent_generate[wsgi,{threads}_threads]', wsgi, repeat, requests=requests, llm_latency=latency),
+        measure('concurrent_generate[asgi]', asgi, repeat, requests=requests, llm_latency=latency)
+    ]
+
+# Modules whose import cost lands on the first request of each route after a cold start
+STARTUP_IMPORTS = {
+    'app': 'import app',
+    'route_ppt_vector': 'import app, pipeline, pptx_renderer',
+    'route_pdf_vector': 'import app, pipeline, ppt_generator, file_utils',
+    'route_raster': 'import app, pipeline, ppt_generator, file_utils, pdf_writer',
+    'route_html': 'import app, pipeline, svg_renderer',
+}
+
+def bench_startup(repeat):
+    """Time imports in fresh interpreters, since in-process timings would hit the module cache"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for name, statement in STARTUP_IMPORTS.items():
+        def run():
+            subprocess.run([sys.executable, '-c', statement], cwd=here, check=True, capture_output=True)
+        results.append(measure(f'startup[{name}]', run, repeat, statement=statement))
+    return results
+
+def isolate_disk_caches():
+    """Give this run its own artifact cache directory and no disk slide or structure caches.
+
+    The on-disk caches are shared with the server and across runs, so without this a benchmark could be
+    answered from an earlier run's files (or leave its decks behind for the server). Must run before the
+    pipeline modules are imported, since they read these settings at import. Returns the directory to remove.
+    """
+    run_dir = tempfile.mkdtemp(prefix='flowchats-bench-')
+    os.environ['ARTIFACT_CACHE_DIR'] = os.path.join(run_dir, 'artifacts')
+    os.environ.pop('SLIDE_CACHE_DIR', None)
+    os.environ.pop('STRUCTURE_CACHE_DB', None)
+    return run_dir
+
+def environment_info():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ''
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'git_revision': revision,
+        'timestamp': time.time()
+    }
+
+def compare(current, baseline, threshold):
+    """Return the benchmarks whose median wall time regressed by more than threshold percent"""
+    previous = {item['name']: item for item in baseline['results']}
+    regressions = []
+    for item in current['results']:
+        before = previous.get(item['name'])
+        if before is None or before['wall_s']['median'] == 0:
+            continue
+        change = (item['wall_s']['median'] / before['wall_s']['median'] - 1) * 100
+        marker = 'REGRESSION' if change > threshold else ''
+        print(f"{item['name']:<48} {before['wall_s']['median']:8.3f}s -> {item['wall_s']['median']:8.3f}s "
+              f"({change:+6.1f}%) {marker}")
+        if change > threshold:
+            regressions.append({'name': item['name'], 'change_pct': change})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', nargs='+', default=['startup', 'slides', 'encode', 'merge', 'incremental', 'e2e'],
+                        choices=['startup', 'slides', 'encode', 'merge', 'incremental', 'e2e', 'concurrency'])
+    parser.add_argument('--dpi', nargs='+', type=int, default=[72, 150, 300], help='DPIs for the slide builder and encoder stages')
+    parser.add_argument('--merge-dpi', type=int, default=150)
+    parser.add_argument('--profiles', nargs='+', default=['preview', 'screen'], help='render profiles for raster e2e runs')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='simulated LLM latency in seconds')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help='baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+    run_dir = isolate_disk_caches()
+    results = []
+    try:
+        if 'startup' in args.stages:
+            results += bench_startup(args.repeat)
+        if 'slides' in args.stages:
+            results += [result for dpi in args.dpi for result in bench_slide_builders(args.repeat, dpi)]
+        if 'encode' in args.stages:
+            results += bench_encoders(args.repeat, args.dpi)
+        if 'merge' in args.stages:
+            results += bench_merges(args.repeat, args.merge_dpi)
+        if 'incremental' in args.stages:
+            results += bench_incremental(args.repeat)
+        if 'e2e' in args.stages:
+            results += bench_end_to_end(args.repeat, args.profiles, args.llm_latency)
+        if 'concurrency' in args.stages:
+            results += bench_concurrency(args.repeat, args.llm_latency)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    report = {'environment': environment_info(), 'results': results}
+    if args.compare:
+        with open(args.compare) as f:
+            report['regressions'] = compare(report, json.load(f), args.threshold)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'wrote {args.output}')
+    return 1 if report.get('regressions') else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
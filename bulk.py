@@ -0,0 +1,191 @@
+"""Generate decks offline from a JSONL file of prompts, spread across a process pool, with resume.
+
+Each input line is a JSON object: {"prompt": ..., "format": "pdf"|"ppt", "theme": ..., "mode": ...,
+"profile": ..., "renderer": ..., "encoding": ..., "id": ...}; only prompt is required. Finished decks and a
+manifest.jsonl checkpoint go to the output directory, and rerunning the same command skips every record the
+manifest already lists as done:
+
+    python bulk.py prompts.jsonl --output-dir decks --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+MANIFEST_NAME = 'manifest.jsonl'
+REPORT_NAME = 'report.json'
+RECORD_DEFAULTS = {'format': 'pdf', 'theme': None, 'mode': 'vector', 'profile': 'print', 'renderer': None,
+                   'encoding': None}
+
+def record_key(record):
+    """Stable identity of a record, so resume still matches after lines are reordered or added"""
+    if record.get('id') is not None:
+        return str(record['id'])
+    return hashlib.sha256(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def read_records(path):
+    """Yield (line_number, record or None, error) for each non-blank line"""
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield number, None, f'invalid JSON: {exc}'
+                continue
+            if not isinstance(record, dict) or not isinstance(record.get('prompt'), str) or not record['prompt'].strip():
+                yield number, None, 'record must be an object with a non-empty prompt'
+                continue
+            yield number, dict(RECORD_DEFAULTS, **record), None
+
+def load_manifest(output_dir):
+    """Return {key: entry} for decks already written; later lines win, so retries replace failures"""
+    done = {}
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A run killed mid-write can leave a truncated last line
+                    continue
+                if entry.get('status') == 'done' and os.path.exists(os.path.join(output_dir, entry['file'])):
+                    done[entry['key']] = entry
+                else:
+                    done.pop(entry.get('key'), None)
+    except FileNotFoundError:
+        pass
+    return done
+
+def generate_record(number, record, output_dir):
+    """Worker entry point: build one deck into output_dir and return its manifest entry"""
+    from pipeline import validate_options, render_deck
+    from batch import deck_filename
+    from slide_specs import build_slide_specs
+    from ai_structures import get_presentation_structure
+
+    entry = {'key': record_key(record), 'line': number, 'prompt': record['prompt'], 'status': 'failed'}
+    started = time.perf_counter()
+    try:
+        validate_options(record['format'], record['mode'], record['profile'], record['renderer'], record['encoding'])
+        presentation_data = get_presentation_structure(record['prompt'])
+        entry['structure_s'] = time.perf_counter() - started
+        rendered = time.perf_counter()
+        specs = build_slide_specs(presentation_data, record['theme'])
+        # One deck per process: slides render serially here instead of in a nested pool
+        result, _, _ = render_deck(specs, record['format'], record['mode'], record['profile'], workers=1,
+                                   renderer=record['renderer'], total=len(specs), encoding=record['encoding'],
+                                   interactive=False)
+        name = deck_filename(number - 1, record['prompt'], record['format'])
+        path = os.path.join(output_dir, name)
+        try:
+            with open(path + '.tmp', 'wb') as f:
+                while True:
+                    chunk = result.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                entry['bytes'] = f.tell()
+            os.replace(path + '.tmp', path)
+        finally:
+            result.close()
+        entry['render_s'] = time.perf_counter() - rendered
+        entry.update(status='done', file=name)
+    except Exception as exc:
+        entry['error'] = f'{type(exc).__name__}: {exc}'
+    entry['total_s'] = time.perf_counter() - started
+    return entry
+
+def summarize(entries, skipped, wall_seconds):
+    done = [entry for entry in entries if entry['status'] == 'done']
+    timings = sorted(entry['total_s'] for entry in done)
+    report = {
+        'processed': len(entries),
+        'succeeded': len(done),
+        'failed': len(entries) - len(done),
+        'skipped': skipped,
+        'wall_s': wall_seconds,
+        'decks_per_minute': len(done) / wall_seconds * 60 if wall_seconds else 0.0,
+        'bytes': sum(entry.get('bytes', 0) for entry in done)
+    }
+    if timings:
+        report['deck_s'] = {
+            'median': statistics.median(timings),
+            'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            'max': timings[-1],
+            'structure_median': statistics.median(entry['structure_s'] for entry in done),
+            'render_median': statistics.median(entry['render_s'] for entry in done)
+        }
+    return report
+
+def run(input_path, output_dir, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    finished = load_manifest(output_dir)
+    todo, entries, skipped = [], [], 0
+    for number, record, error in read_records(input_path):
+        if record is None:
+            entries.append({'key': f'line-{number}', 'line': number, 'status': 'failed', 'error': error, 'total_s': 0.0})
+        elif record_key(record) in finished:
+            skipped += 1
+        else:
+            todo.append((number, record))
+    print(f'{len(todo)} to generate, {skipped} already done', flush=True)
+
+    started = time.perf_counter()
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'a+', encoding='utf-8') as manifest:
+        # Start on a fresh line after a truncated one, or the first checkpoint would be lost with it
+        if manifest.tell():
+            manifest.seek(manifest.tell() - 1)
+            if manifest.read(1) != '\n':
+                manifest.write('\n')
+
+        def checkpoint(entry):
+            # Append-only: each finished deck is durable before the next one is reported
+            manifest.write(json.dumps(entry) + '\n')
+            manifest.flush()
+            os.fsync(manifest.fileno())
+
+        for entry in entries:
+            checkpoint(entry)
+        pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        try:
+            futures = [pool.submit(generate_record, number, record, output_dir) for number, record in todo]
+            for count, future in enumerate(as_completed(futures), 1):
+                entry = future.result()
+                checkpoint(entry)
+                entries.append(entry)
+                detail = entry.get('file') or entry.get('error')
+                print(f"[{count}/{len(todo)}] line {entry['line']:>5} {entry['status']:<6} {entry['total_s']:7.2f}s  "
+                      f"{detail}", flush=True)
+        finally:
+            # On Ctrl-C, drop queued decks; everything already checkpointed is skipped on the next run
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    report = summarize(entries, skipped, time.perf_counter() - started)
+    with open(os.path.join(output_dir, REPORT_NAME), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='JSONL file with one record per line')
+    parser.add_argument('--output-dir', default='decks')
+    parser.add_argument('--workers', type=int, help='decks generated in parallel (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    report = run(args.input, args.output_dir, args.workers)
+    print(f"{report['succeeded']} succeeded, {report['failed']} failed, {report['skipped']} skipped in "
+          f"{report['wall_s']:.1f}s ({report['decks_per_minute']:.1f} decks/min)")
+    if 'deck_s' in report:
+        timing = report['deck_s']
+        print(f"per deck: median {timing['median']:.2f}s  p95 {timing['p95']:.2f}s  max {timing['max']:.2f}s  "
+              f"(structure {timing['structure_median']:.2f}s, render {timing['render_median']:.2f}s)")
+    return 1 if report['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
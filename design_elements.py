@@ -1,52 +1,25 @@
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Circle, Rectangle
+from matplotlib.colors import LinearSegmentedColormap
 import numpy as np
+import os
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from caching import LRUCache
+import metrics
+from themes import COLOR_SCHEMES
 
-COLOR_SCHEMES = {
-    'professional': {
-        'primary': '#2E4057',
-        'secondary': '#048A81', 
-        'accent': '#54C6EB',
-        'bg': '#F8F9FA',
-        'text': '#2C3E50',
-        'light': '#E8F4F8'
-    },
-    'modern': {
-        'primary': '#667eea',
-        'secondary': '#764ba2',
-        'accent': '#f093fb',
-        'bg': '#ffecd2',
-        'text': '#4a4a4a',
-        'light': '#f8f1ff'
-    },
-    'tech': {
-        'primary': '#0f0f23',
-        'secondary': '#262640',
-        'accent': '#7c3aed',
-        'bg': '#f1f5f9',
-        'text': '#1e293b',
-        'light': '#e2e8f0'
-    },
-    'creative': {
-        'primary': '#ff6b6b',
-        'secondary': '#4ecdc4',
-        'accent': '#45b7d1',
-        'bg': '#fef7f7',
-        'text': '#2d3748',
-        'light': '#fef2f2'
-    }
-}
-
-def create_gradient_background(ax, colors, direction='vertical'):
+def create_gradient_background(ax, colors, direction='vertical', interpolation=None):
     if direction == 'vertical':
         gradient = np.linspace(0, 1, 256).reshape(256, -1)
     elif direction == 'horizontal':
         gradient = np.linspace(0, 1, 256).reshape(-1, 256)
     else:
         gradient = np.outer(np.linspace(0, 1, 256), np.linspace(0, 1, 256))
-    ax.imshow(gradient, aspect='auto', cmap=plt.cm.colors.LinearSegmentedColormap.from_list('', colors),
-              extent=[0, 10, 0, 10], alpha=0.3)
+    ax.imshow(gradient, aspect='auto', cmap=LinearSegmentedColormap.from_list('', colors),
+              extent=[0, 10, 0, 10], alpha=0.3, interpolation=interpolation)
 
 def draw_icon_computer(ax, x, y, size=0.8, color='#4ECDC4'):
     monitor = Rectangle((x-size/2, y-size/4), size, size/2, facecolor=color, edgecolor='white', linewidth=2)
@@ -121,13 +94,69 @@ def add_decorative_elements(ax, theme='professional'):
     side_rect = Rectangle((0, 4), 0.1, 2, facecolor=colors['primary'], alpha=0.8)
     ax.add_patch(side_rect)
 
-def create_title_banner(ax, title, theme='professional', y_pos=8.5):
+def add_title_banner_box(ax, theme='professional', y_pos=8.5):
     colors = COLOR_SCHEMES[theme]
     title_bg = FancyBboxPatch((0.5, y_pos-0.4), 9, 0.8, boxstyle="round,pad=0.1", facecolor=colors['primary'], edgecolor=colors['accent'], linewidth=2, alpha=0.9)
     ax.add_patch(title_bg)
+
+def add_title_banner_text(ax, title, y_pos=8.5):
     ax.text(5, y_pos, title, fontsize=24, fontweight='bold', color='white', ha='center', va='center',
             bbox=dict(boxstyle="round,pad=0.3", facecolor='none', edgecolor='none'))
 
+def create_title_banner(ax, title, theme='professional', y_pos=8.5):
+    add_title_banner_box(ax, theme, y_pos)
+    add_title_banner_text(ax, title, y_pos)
+
+# Slides are saved with a white facecolor, so the translucent gradient is composited over white
+BACKGROUND_LAYER_FIGSIZE = (16, 9)
+# Layers are only cached up to this dpi (one 16x9in layer is ~39MB at 300 dpi, ~155MB at 600); above it the
+# background is drawn as vector artists at full resolution rather than upsampled from a cached layer
+BACKGROUND_LAYER_MAX_DPI = int(os.environ.get('BACKGROUND_LAYER_MAX_DPI', 300))
+_background_layers = LRUCache(max_bytes=int(os.environ.get('BACKGROUND_CACHE_BYTES', 256 * 1024 * 1024)),
+                              sizeof=lambda layer: layer.nbytes)
+
+def render_background_layer(theme, gradient_colors, direction, dpi, banner_y=None):
+    """Rasterize the gradient, decorations and title banner box of a slide into an opaque RGB array"""
+    fig = Figure(figsize=BACKGROUND_LAYER_FIGSIZE, dpi=dpi, facecolor='white')
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    ax.axis('off')
+    create_gradient_background(ax, gradient_colors, direction)
+    add_decorative_elements(ax, theme)
+    if banner_y is not None:
+        add_title_banner_box(ax, theme, banner_y)
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())[..., :3].copy()
+
+def get_background_layer(theme, gradient_colors, direction, dpi, banner_y=None):
+    dpi = int(dpi)
+    key = (theme, tuple(gradient_colors), direction, dpi, banner_y)
+    return _background_layers.get_or_create(
+        key, lambda: render_background_layer(theme, gradient_colors, direction, dpi, banner_y))
+
+def draw_background_layer(ax, theme, gradient_colors, direction, dpi=None, banner_y=None):
+    """Draw the static slide background from the cached raster layer at the slide's dpi.
+
+    dpi=None (vector output) or a dpi above BACKGROUND_LAYER_MAX_DPI draws the vector artists instead.
+    """
+    if dpi is None or dpi > BACKGROUND_LAYER_MAX_DPI:
+        # Vector output embeds the 256-step gradient as is and lets the viewer scale it, instead of resampling
+        # it to a page-sized image on every draw
+        create_gradient_background(ax, gradient_colors, direction, interpolation='none' if dpi is None else None)
+        add_decorative_elements(ax, theme)
+        if banner_y is not None:
+            add_title_banner_box(ax, theme, banner_y)
+        return
+    layer = get_background_layer(theme, gradient_colors, direction, dpi, banner_y)
+    ax.imshow(layer, extent=[0, 10, 0, 10], aspect='auto', interpolation='bilinear', zorder=0)
+
+def background_cache_stats():
+    return _background_layers.stats()
+
+metrics.register_cache('background_layers', _background_layers)
+
 ICON_FUNCTIONS = {
     'computer': draw_icon_computer,
     'brain': draw_icon_brain,
@@ -136,3 +165,46 @@ ICON_FUNCTIONS = {
     'gear': draw_icon_gear,
     'lightbulb': draw_icon_lightbulb
   }
+
+# Slide axes span 10x10 data units over a 16x9 inch figure, so one unit is 1.6in wide and 0.9in tall
+SLIDE_INCHES_PER_UNIT = (1.6, 0.9)
+ICON_SPRITE_MAX_DPI = int(os.environ.get('ICON_SPRITE_MAX_DPI', 600))
+_icon_sprites = LRUCache(max_bytes=int(os.environ.get('ICON_SPRITE_CACHE_BYTES', 128 * 1024 * 1024)),
+                         sizeof=lambda sprite: sprite.nbytes)
+
+def icon_half_extent(size):
+    return size * 0.9 + 0.15
+
+def render_icon_sprite(icon_name, color, size, dpi):
+    """Rasterize one icon onto a transparent RGBA buffer at the slide's data-unit scale"""
+    half = icon_half_extent(size)
+    fig = Figure(figsize=(2 * half * SLIDE_INCHES_PER_UNIT[0], 2 * half * SLIDE_INCHES_PER_UNIT[1]), dpi=dpi)
+    fig.patch.set_alpha(0)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(-half, half)
+    ax.set_ylim(-half, half)
+    ax.axis('off')
+    ICON_FUNCTIONS[icon_name](ax, 0, 0, size=size, color=color)
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+def get_icon_sprite(icon_name, color, size, dpi):
+    dpi = min(int(dpi), ICON_SPRITE_MAX_DPI)
+    return _icon_sprites.get_or_create(
+        (icon_name, color, size, dpi), lambda: render_icon_sprite(icon_name, color, size, dpi))
+
+def stamp_icon(ax, icon_name, x, y, size, color, dpi=None):
+    """Place an icon on the slide; dpi=None draws the vector patches instead of the cached sprite"""
+    if dpi is None:
+        ICON_FUNCTIONS[icon_name](ax, x, y, size=size, color=color)
+        return
+    sprite = get_icon_sprite(icon_name, color, size, dpi)
+    half = icon_half_extent(size)
+    ax.imshow(sprite, extent=[x - half, x + half, y - half, y + half], aspect='auto',
+              interpolation='bilinear', zorder=1)
+
+def icon_sprite_cache_stats():
+    return _icon_sprites.stats()
+
+metrics.register_cache('icon_sprites', _icon_sprites)
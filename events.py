@@ -0,0 +1,75 @@
+"""Server-Sent Events for progressive delivery: structure, then low-resolution slides, then the full deck link"""
+import base64
+import json
+import time
+from slide_specs import build_slide_specs, IMAGE_ENCODINGS
+from ai_structures import get_presentation_structure
+from admission import get_admission_controller, estimate_render_bytes, Overloaded
+import metrics
+
+PREVIEW_PROFILE = 'preview'
+# Pillow draws a slide several times faster than matplotlib, which matters while the full deck renders alongside
+PREVIEW_RENDERER = 'pillow'
+# Previews only need to look right at thumbnail size, so JPEG keeps the events small
+PREVIEW_ENCODING = 'jpeg'
+JOB_POLL_INTERVAL = 0.5
+
+def sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+def stream_deck_events(prompt, job_manager, job_id, links, renderer=PREVIEW_RENDERER, poll_interval=JOB_POLL_INTERVAL):
+    """Yield SSE messages for one deck whose full-resolution render is already running as job_id.
+
+    Events: 'structure' (titles and slide count), 'slide' (index, title and a data URL) per slide as it renders,
+    'progress' while the full deck is still rendering, then 'done' with links or 'error'. Previews are admitted
+    against the render budget like any other render; when they are refused, 'previews_skipped' (with the
+    reason) replaces the slide events and the stream goes on to report the job.
+    """
+    from ppt_generator import iter_slide_previews
+    from image_encoding import IMAGE_MIMETYPES
+
+    started = time.perf_counter()
+    # The job asks for the same structure; the cache (or the in-flight call) is shared
+    presentation_data = get_presentation_structure(prompt)
+    specs = build_slide_specs(presentation_data)
+    yield sse('structure', {
+        'title': presentation_data.get('title', ''),
+        'subtitle': presentation_data.get('subtitle', ''),
+        'slide_count': len(specs),
+        'slides': [spec[1].get('title', '') for spec in specs]
+    })
+
+    mimetype = IMAGE_MIMETYPES[IMAGE_ENCODINGS[PREVIEW_ENCODING]['format']]
+    # iter_slide_previews renders one slide at a time in this thread
+    cost = estimate_render_bytes(len(specs), 'pdf', 'raster', PREVIEW_PROFILE, renderer, PREVIEW_ENCODING, workers=1)
+    try:
+        with get_admission_controller().admit(cost):
+            previews = iter_slide_previews(specs, PREVIEW_PROFILE, renderer, PREVIEW_ENCODING)
+            for index, (spec, buf) in enumerate(previews):
+                if index == 0:
+                    metrics.observe_stage('first_slide', time.perf_counter() - started)
+                yield sse('slide', {
+                    'index': index,
+                    'title': spec[1].get('title', ''),
+                    'image': f'data:{mimetype};base64,' + base64.b64encode(buf.getvalue()).decode('ascii')
+                })
+    except Overloaded as exc:
+        yield sse('previews_skipped', {'error': str(exc), 'retry_after': exc.retry_after})
+
+    last = None
+    while True:
+        job = job_manager.status(job_id)
+        if job is None or job['status'] == 'failed':
+            yield sse('error', {'error': job.get('error', 'job failed') if job else 'unknown or expired job'})
+            return
+        if job['status'] == 'done':
+            yield sse('done', links)
+            return
+        progress = {'stage': job['stage'], 'slides_done': job.get('slides_done'), 'slides_total': job.get('slides_total')}
+        if progress != last:
+            yield sse('progress', progress)
+            last = progress
+        else:
+            # Comment line: keeps proxies from closing an idle stream
+            yield ': keep-alive\n\n'
+        time.sleep(poll_interval)
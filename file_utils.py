@@ -1,20 +1,119 @@
-from PIL import Image
 from pptx import Presentation
 from pptx.util import Inches
+import io
 import os
+import tempfile
+from pdf_writer import StreamingPDFWriter, PendingBytes
+import metrics
 
-def merge_images_to_pdf(image_files, temp_dir):
-    imgs = [Image.open(img).convert("RGB") for img in image_files]
-    pdf_path = os.path.join(temp_dir, "presentation.pdf")
-    imgs[0].save(pdf_path, save_all=True, append_images=imgs[1:])
-    return pdf_path
-
-def merge_images_to_ppt(image_files, temp_dir):
-    prs = Presentation()
-    blank_slide_layout = prs.slide_layouts[6]
-    for img_file in image_files:
-        slide = prs.slides.add_slide(blank_slide_layout)
-        slide.shapes.add_picture(img_file, Inches(0), Inches(0), width=prs.slide_width, height=prs.slide_height)
-    ppt_path = os.path.join(temp_dir, "presentation.pptx")
-    prs.save(ppt_path)
-    return ppt_path
+# Only raster artists (the background gradient) are resampled at this dpi; text and shapes stay vector
+PDF_IMAGE_DPI = 100
+# Merged outputs stay in memory up to this size, then spill to an anonymous temp file deleted on close
+OUTPUT_SPILL_BYTES = int(os.environ.get('OUTPUT_SPILL_BYTES', 64 * 1024 * 1024))
+
+def new_output_buffer():
+    return tempfile.SpooledTemporaryFile(max_size=OUTPUT_SPILL_BYTES)
+
+# Image types python-pptx can embed as-is; anything else (e.g. WebP) is converted to PNG first
+PPTX_IMAGE_SIGNATURES = (b'\x89PNG\r\n\x1a\n', b'\xff\xd8', b'GIF8')
+
+def open_image_source(image):
+    """Accept a path, raw bytes or a file-like object and return something PIL/python-pptx can read"""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return io.BytesIO(image)
+    if hasattr(image, 'read'):
+        image.seek(0)
+    return image
+
+def open_pptx_image_source(image):
+    source = open_image_source(image)
+    if isinstance(source, str):
+        return source
+    header = source.read(8)
+    source.seek(0)
+    if header.startswith(PPTX_IMAGE_SIGNATURES):
+        return source
+    from PIL import Image
+    buf = io.BytesIO()
+    with Image.open(source) as img:
+        img.save(buf, format='PNG', dpi=img.info.get('dpi', (72, 72)), compress_level=1)
+    buf.seek(0)
+    return buf
+
+def _finish_output(buf, temp_dir, filename):
+    if temp_dir is None:
+        buf.seek(0)
+        return buf
+    path = os.path.join(temp_dir, filename)
+    buf.seek(0)
+    with open(path, 'wb') as f:
+        f.write(buf.read())
+    buf.close()
+    return path
+
+def merge_images_to_pdf(images, temp_dir=None):
+    """Merge slide images into a PDF; returns a rewound buffer, or a path when temp_dir is given.
+
+    Pages are written one at a time, so peak memory does not grow with the number of slides. PNG (RGB or
+    palette) and JPEG slides are embedded without re-encoding; other images are decoded and deflated.
+    """
+    buf = new_output_buffer()
+    # Only the merge work is timed; waiting on the image iterator (rendering) is excluded
+    merge_time = metrics.Stopwatch()
+    with merge_time:
+        writer = StreamingPDFWriter(buf)
+    for img in images:
+        with merge_time:
+            writer.add_image(img)
+    with merge_time:
+        writer.close()
+    metrics.observe_stage('merge', merge_time.total, format='pdf', mode='raster')
+    return _finish_output(buf, temp_dir, "presentation.pdf")
+
+def iter_images_to_pdf(images):
+    """Like merge_images_to_pdf, but yield the PDF bytes as each page is written instead of keeping the file"""
+    sink = PendingBytes()
+    merge_time = metrics.Stopwatch()
+    with merge_time:
+        writer = StreamingPDFWriter(sink)
+    for img in images:
+        with merge_time:
+            writer.add_image(img)
+        yield sink.drain()
+    with merge_time:
+        writer.close()
+    metrics.observe_stage('merge', merge_time.total, format='pdf', mode='raster')
+    yield sink.drain()
+
+def merge_images_to_ppt(images, temp_dir=None):
+    """Merge slide images (PNG, JPEG or WebP) into a PPTX; returns a rewound buffer, or a path when temp_dir is given"""
+    merge_time = metrics.Stopwatch()
+    with merge_time:
+        prs = Presentation()
+        blank_slide_layout = prs.slide_layouts[6]
+    for img in images:
+        with merge_time:
+            slide = prs.slides.add_slide(blank_slide_layout)
+            slide.shapes.add_picture(open_pptx_image_source(img), Inches(0), Inches(0), width=prs.slide_width, height=prs.slide_height)
+    buf = new_output_buffer()
+    with merge_time:
+        prs.save(buf)
+    metrics.observe_stage('merge', merge_time.total, format='ppt', mode='raster')
+    return _finish_output(buf, temp_dir, "presentation.pptx")
+
+def merge_figures_to_pdf(figures):
+    """Write slide figures straight into one vector PDF, one page per figure"""
+    import matplotlib
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    buf = new_output_buffer()
+    merge_time = metrics.Stopwatch()
+    with PdfPages(buf) as pdf:
+        for fig in figures:
+            with merge_time:
+                # bbox_inches='tight' would draw the whole figure once just to measure it
+                bbox = fig.get_tightbbox().padded(matplotlib.rcParams['savefig.pad_inches'])
+                pdf.savefig(fig, dpi=PDF_IMAGE_DPI, bbox_inches=bbox, facecolor='white', edgecolor='none')
+    metrics.observe_stage('merge', merge_time.total, format='pdf', mode='vector')
+    buf.seek(0)
+    return buf
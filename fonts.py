@@ -0,0 +1,38 @@
+"""The DejaVu fonts the raster and SVG backends draw with, and text measurement in points (Pillow only, no numpy)"""
+import functools
+import os
+from importlib.util import find_spec
+from PIL import ImageFont
+
+FONT_FILES = {
+    ('normal', 'normal'): 'DejaVuSans.ttf',
+    ('bold', 'normal'): 'DejaVuSans-Bold.ttf',
+    ('normal', 'italic'): 'DejaVuSans-Oblique.ttf',
+    ('bold', 'italic'): 'DejaVuSans-BoldOblique.ttf'
+}
+# Widths are measured at this size and scaled
+_METRICS_SIZE = 100
+
+def font_dir():
+    """SLIDE_FONT_DIR, else the DejaVu fonts bundled with matplotlib (located without importing it)"""
+    configured = os.environ.get('SLIDE_FONT_DIR')
+    if configured:
+        return configured
+    spec = find_spec('matplotlib')
+    if spec is None or spec.origin is None:
+        return ''
+    return os.path.join(os.path.dirname(spec.origin), 'mpl-data', 'fonts', 'ttf')
+
+@functools.lru_cache(maxsize=128)
+def get_font(weight, style, size_px):
+    path = os.path.join(font_dir(), FONT_FILES[(weight, style)])
+    try:
+        return ImageFont.truetype(path, size_px)
+    except OSError:
+        return ImageFont.load_default(size_px)
+
+def text_width(s, fontsize, fontweight='normal', style='normal'):
+    """Width of one line of text in points"""
+    font = get_font('bold' if fontweight == 'bold' else 'normal', 'italic' if style == 'italic' else 'normal',
+                    _METRICS_SIZE)
+    return font.getlength(s) * fontsize / _METRICS_SIZE
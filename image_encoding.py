@@ -0,0 +1,58 @@
+"""Slide image encoders: PNG at a chosen zlib level, theme-palette PNG, JPEG and WebP"""
+from PIL import Image
+from themes import COLOR_SCHEMES
+
+IMAGE_MIMETYPES = {'png': 'image/png', 'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+PALETTE_SIZE = 256
+
+def hex_to_rgb(color):
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+def theme_palette_colors(theme):
+    """Colors a theme's slides are drawn with: white and black plus every COLOR_SCHEMES entry"""
+    colors = [(255, 255, 255), (0, 0, 0)]
+    for color in COLOR_SCHEMES.get(theme, {}).values():
+        rgb = hex_to_rgb(color)
+        if rgb not in colors:
+            colors.append(rgb)
+    return colors
+
+def quantize_to_theme(image, theme):
+    """Map image onto a 256-color palette that holds the theme colors exactly.
+
+    Flat fills and text land on their exact theme entry; the remaining slots are chosen adaptively
+    for gradient tints and antialiased edges. No dithering, since dither noise defeats zlib.
+    """
+    image = image.convert('RGB')
+    reserved = theme_palette_colors(theme)
+    adaptive = image.quantize(PALETTE_SIZE - len(reserved), method=Image.Quantize.FASTOCTREE,
+                              dither=Image.Dither.NONE)
+    palette = [value for color in reserved for value in color]
+    palette += adaptive.getpalette()[:3 * (PALETTE_SIZE - len(reserved))]
+    palette_image = Image.new('P', (1, 1))
+    palette_image.putpalette(palette)
+    return image.quantize(palette=palette_image, dither=Image.Dither.NONE)
+
+def encode_image(image, buf, encoding, dpi=None, theme=None):
+    """Encode a PIL slide image into buf according to an IMAGE_ENCODINGS entry"""
+    format = encoding['format']
+    options = {'dpi': (dpi, dpi)} if dpi else {}
+    if format == 'png':
+        if encoding.get('palette'):
+            image = quantize_to_theme(image, theme)
+        elif image.mode != 'RGB':
+            # Slides are opaque; RGB PNGs are smaller and the PDF writer embeds them without re-encoding
+            image = image.convert('RGB')
+        if encoding.get('optimize'):
+            options['optimize'] = True
+        else:
+            options['compress_level'] = encoding.get('compress_level', 6)
+    else:
+        image = image.convert('RGB')
+        options['quality'] = encoding.get('quality', 90)
+        if format == 'webp':
+            options['method'] = encoding.get('method', 4)
+        elif encoding.get('optimize'):
+            options['optimize'] = True
+    image.save(buf, format=format.upper(), **options)
@@ -0,0 +1,206 @@
+"""Background deck jobs: a local worker pool runs generate_deck and a result store keeps each job's status and artifact.
+
+Jobs run on threads of the process that accepted them, so they need a long-lived server process (gunicorn,
+uvicorn, app.run); a serverless function is frozen once it returns its response and the job never finishes.
+With JOB_RESULT_STORE=fs, status and results live on disk, so any process sharing JOB_RESULT_DIR can answer
+status and download requests and both survive a restart; a job whose process died stays 'running' until it expires.
+"""
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pipeline import generate_deck, validate_options
+
+JOB_TTL = int(os.environ.get('JOB_TTL', 60 * 60))
+STATUS_SUFFIX = '.status.json'
+
+class InMemoryResultStore:
+    """Keep finished artifacts in process memory until they expire"""
+
+    def __init__(self, ttl=JOB_TTL):
+        self.ttl = ttl
+        self._items = {}
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def put(self, key, fileobj, meta):
+        fileobj.seek(0)
+        data = fileobj.read()
+        with self._lock:
+            self._items[key] = (data, dict(meta), time.time() + self.ttl)
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[2] <= time.time():
+                del self._items[key]
+                return None
+            return io.BytesIO(item[0]), dict(item[1])
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def put_status(self, key, status):
+        with self._lock:
+            self._statuses[key] = (dict(status), time.time() + self.ttl)
+
+    def get_status(self, key):
+        with self._lock:
+            item = self._statuses.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.time():
+                del self._statuses[key]
+                return None
+            return dict(item[0])
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            for key in [key for key, item in self._items.items() if item[2] <= now]:
+                del self._items[key]
+            for key in [key for key, item in self._statuses.items() if item[1] <= now]:
+                del self._statuses[key]
+
+
+class FileSystemResultStore:
+    """Store artifacts as files next to a JSON sidecar, so they survive restarts and can be shared"""
+
+    def __init__(self, directory, ttl=JOB_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.bin', base + '.json'
+
+    def _status_path(self, key):
+        return os.path.join(self.directory, key + STATUS_SUFFIX)
+
+    def _write_json(self, path, obj):
+        with open(path + '.tmp', 'w') as f:
+            json.dump(dict(obj, expires_at=time.time() + self.ttl), f)
+        os.replace(path + '.tmp', path)
+
+    def put(self, key, fileobj, meta):
+        data_path, meta_path = self._paths(key)
+        fileobj.seek(0)
+        with open(data_path + '.tmp', 'wb') as f:
+            shutil.copyfileobj(fileobj, f)
+        os.replace(data_path + '.tmp', data_path)
+        self._write_json(meta_path, meta)
+
+    def get(self, key):
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.pop('expires_at') <= time.time():
+                self.delete(key)
+                return None
+            return open(data_path, 'rb'), meta
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def delete(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def put_status(self, key, status):
+        self._write_json(self._status_path(key), status)
+
+    def get_status(self, key):
+        path = self._status_path(key)
+        try:
+            with open(path) as f:
+                status = json.load(f)
+            if status.pop('expires_at') <= time.time():
+                os.remove(path)
+                return None
+            return status
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def purge_expired(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(STATUS_SUFFIX):
+                self.get_status(name[:-len(STATUS_SUFFIX)])
+            elif name.endswith('.json'):
+                key = name[:-len('.json')]
+                result = self.get(key)
+                if result is not None:
+                    result[0].close()
+
+
+def create_result_store():
+    if os.environ.get('JOB_RESULT_STORE', 'memory') == 'fs':
+        return FileSystemResultStore(os.environ.get('JOB_RESULT_DIR', os.path.join(os.getcwd(), 'job_results')))
+    return InMemoryResultStore()
+
+
+class JobManager:
+    """Run deck generation in a local worker pool and record per-stage progress for each job in the result store"""
+
+    def __init__(self, store=None, workers=None):
+        self.store = store or create_result_store()
+        self.executor = ThreadPoolExecutor(max_workers=workers or int(os.environ.get('JOB_WORKERS', 2)),
+                                           thread_name_prefix='deck-job')
+        self._lock = threading.Lock()
+
+    def submit(self, prompt, format, **options):
+        validate_options(format, options.get('mode', 'vector'), options.get('profile', 'print'), options.get('renderer'),
+                         options.get('encoding'))
+        self.purge_expired()
+        job_id = uuid.uuid4().hex
+        self.store.put_status(job_id, {
+            'id': job_id,
+            'status': 'queued',
+            'stage': 'queued',
+            'format': format,
+            'created_at': time.time(),
+            'updated_at': time.time()
+        })
+        self.executor.submit(self._run, job_id, prompt, format, options)
+        return job_id
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self.store.get_status(job_id)
+            if job is not None:
+                job.update(fields, updated_at=time.time())
+                self.store.put_status(job_id, job)
+
+    def _run(self, job_id, prompt, format, options):
+        def progress(stage, done=None, total=None):
+            self._update(job_id, status='running', stage=stage, slides_done=done, slides_total=total)
+
+        try:
+            # Jobs are already queued, so they wait for render capacity rather than being rejected
+            result, mimetype, download_name = generate_deck(prompt, format, progress=progress, interactive=False, **options)
+            try:
+                self.store.put(job_id, result, {'mimetype': mimetype, 'download_name': download_name})
+            finally:
+                result.close()
+            self._update(job_id, status='done', stage='done')
+        except Exception as exc:
+            self._update(job_id, status='failed', stage='failed', error=str(exc))
+
+    def status(self, job_id):
+        return self.store.get_status(job_id)
+
+    def result(self, job_id):
+        return self.store.get(job_id)
+
+    def purge_expired(self):
+        self.store.purge_expired()
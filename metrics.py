@@ -0,0 +1,163 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = tuple(2 ** power for power in range(10, 31, 2))
+
+# (stage, seconds) pairs recorded while serving the current request, for the Server-Timing header
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_labels(key, le=_format(bound))} {cumulative}')
+                lines.append(f'{self.name}_bucket{_labels(key, le="+Inf")} {series["count"]}')
+                lines.append(f'{self.name}_sum{_labels(key)} {_format(series["sum"])}')
+                lines.append(f'{self.name}_count{_labels(key)} {series["count"]}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(key)} {_format(value)}')
+        return lines
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(key, **extra):
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+stage_duration = Histogram('flowchats_stage_duration_seconds', 'Time spent in each pipeline stage')
+output_bytes = Histogram('flowchats_output_bytes', 'Size of generated artifacts', BYTES_BUCKETS)
+llm_tokens = Counter('flowchats_llm_tokens_total', 'Tokens consumed by structure completions')
+structure_requests = Counter('flowchats_structure_requests_total', 'Structure lookups by cache outcome')
+batch_items = Counter('flowchats_batch_items_total', 'Batch deck items by outcome')
+admission_rejections = Counter('flowchats_admission_rejections_total', 'Render requests turned away by admission control')
+REGISTRY = [stage_duration, output_bytes, llm_tokens, structure_requests, batch_items, admission_rejections]
+# Callables returning {metric_name: {labels_tuple: value}} for gauges owned by other modules
+GAUGE_PROVIDERS = []
+_caches = {}
+
+def register_cache(name, cache):
+    """Expose an LRUCache's size and hit/miss/eviction counters on /metrics"""
+    _caches[name] = cache
+
+def observe_stage(stage, seconds, **labels):
+    stage_duration.observe(seconds, stage=stage, **labels)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+@contextmanager
+def timed(stage, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, **labels)
+
+class Stopwatch:
+    """Accumulate the time spent inside repeated `with` blocks, e.g. merge work interleaved with rendering"""
+
+    def __init__(self):
+        self.total = 0.0
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.total += time.perf_counter() - self._start
+
+def record_usage(usage):
+    if usage is None:
+        return
+    for kind in ('prompt_tokens', 'completion_tokens'):
+        count = getattr(usage, kind, None)
+        if count:
+            llm_tokens.inc(count, kind=kind.split('_')[0])
+
+def start_request_timings():
+    return _request_timings.set([])
+
+def current_request_timings():
+    return list(_request_timings.get() or [])
+
+def finish_request_timings(token):
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+def server_timing_header(timings):
+    totals = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ', '.join(f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in totals.items())
+
+def render_prometheus():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    cache_stats = {name: cache.stats() for name, cache in _caches.items()}
+    for field, kind in (('entries', 'gauge'), ('bytes', 'gauge'), ('hits', 'counter'), ('misses', 'counter'),
+                        ('evictions', 'counter')):
+        name = f'flowchats_cache_{field}' + ('_total' if kind == 'counter' else '')
+        lines.append(f'# TYPE {name} {kind}')
+        for cache_name, stats in sorted(cache_stats.items()):
+            lines.append(f'{name}{_labels((("cache", cache_name),))} {stats[field]}')
+    for provider in GAUGE_PROVIDERS:
+        for name, series in provider().items():
+            lines.append(f'# TYPE {name} gauge')
+            for key, value in sorted(series.items()):
+                lines.append(f'{name}{_labels(key)} {_format(value)}')
+    return '\n'.join(lines) + '\n'
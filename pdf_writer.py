@@ -0,0 +1,190 @@
+import io
+import struct
+import zlib
+from PIL import Image
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# PNG color type -> (PDF color space, samples per pixel) for streams PDF can decode natively
+PNG_PASSTHROUGH_COLOR_TYPES = {0: ('/DeviceGray', 1), 2: ('/DeviceRGB', 3), 3: (None, 1)}
+FALLBACK_STRIP_ROWS = 256
+
+class StreamingPDFWriter:
+    """Write one image per page to a PDF, holding only the current page in memory.
+
+    Opaque 8-bit PNGs and JPEGs are embedded as their original compressed streams; anything else
+    is decoded, flattened onto white and deflated one page at a time.
+    """
+
+    def __init__(self, output, default_dpi=72):
+        self.output = output
+        self.default_dpi = default_dpi
+        self.offsets = {}
+        self.page_refs = []
+        # Objects 1 and 2 are the catalog and page tree, written last once every page is known
+        self.next_obj = 3
+        self.start = output.tell()
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _write(self, data):
+        self.output.write(data)
+
+    def _tell(self):
+        return self.output.tell() - self.start
+
+    def _alloc(self):
+        num = self.next_obj
+        self.next_obj += 1
+        return num
+
+    def _write_object(self, num, body, stream=None):
+        self.offsets[num] = self._tell()
+        self._write(b'%d 0 obj\n' % num)
+        if stream is None:
+            self._write(body + b'\nendobj\n')
+            return
+        self._write(body[:-2] + b' /Length %d >>\nstream\n' % len(stream))
+        self._write(stream)
+        self._write(b'\nendstream\nendobj\n')
+
+    def add_image(self, image):
+        """Append a page showing image (a path, bytes or file-like PNG/JPEG)"""
+        data = _read_bytes(image)
+        if data.startswith(PNG_SIGNATURE):
+            embedded = _png_passthrough(data)
+        elif data.startswith(b'\xff\xd8'):
+            embedded = _jpeg_passthrough(data)
+        else:
+            embedded = None
+        if embedded is None:
+            embedded = _flattened_image(data)
+        del data
+        header, stream, width, height, dpi = embedded
+        dpi = dpi or self.default_dpi
+        page_w = width * 72.0 / dpi
+        page_h = height * 72.0 / dpi
+
+        image_num = self._alloc()
+        self._write_object(image_num, header, stream)
+        del stream
+        content = b'q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q' % (page_w, page_h)
+        content_num = self._alloc()
+        self._write_object(content_num, b'<< >>', content)
+        page_num = self._alloc()
+        self._write_object(page_num, (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.4f %.4f] '
+            b'/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>'
+        ) % (page_w, page_h, image_num, content_num))
+        self.page_refs.append(page_num)
+
+    def close(self):
+        kids = b' '.join(b'%d 0 R' % num for num in self.page_refs)
+        self._write_object(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.page_refs)))
+        self._write_object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        xref_offset = self._tell()
+        self._write(b'xref\n0 %d\n0000000000 65535 f \n' % self.next_obj)
+        for num in range(1, self.next_obj):
+            self._write(b'%010d 00000 n \n' % self.offsets[num])
+        self._write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (self.next_obj, xref_offset))
+
+class PendingBytes:
+    """Write target for a PDF sent while it is built: tracks the offset and hands back what is not yet sent"""
+
+    def __init__(self):
+        self.position = 0
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.position += len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _read_bytes(image):
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return bytes(image)
+    if hasattr(image, 'read'):
+        image.seek(0)
+        return image.read()
+    with open(image, 'rb') as f:
+        return f.read()
+
+def _png_passthrough(data):
+    pos = len(PNG_SIGNATURE)
+    ihdr = palette = dpi = None
+    idat = []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b'IHDR':
+            ihdr = struct.unpack('>IIBBBBB', chunk)
+        elif kind == b'PLTE':
+            palette = chunk
+        elif kind == b'tRNS':
+            return None
+        elif kind == b'pHYs':
+            ppu_x, _, unit = struct.unpack('>IIB', chunk)
+            if unit == 1 and ppu_x:
+                dpi = ppu_x * 0.0254
+        elif kind == b'IDAT':
+            idat.append(chunk)
+        elif kind == b'IEND':
+            break
+    if ihdr is None:
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = ihdr
+    if color_type not in PNG_PASSTHROUGH_COLOR_TYPES or interlace:
+        return None
+    if bit_depth != 8 and color_type != 3:
+        return None
+    color_space, colors = PNG_PASSTHROUGH_COLOR_TYPES[color_type]
+    if color_type == 3:
+        if palette is None:
+            return None
+        color_space = b'[/Indexed /DeviceRGB %d <%s>]' % (len(palette) // 3 - 1, palette.hex().encode('ascii'))
+    else:
+        color_space = color_space.encode('ascii')
+    header = (
+        b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent %d '
+        b'/Filter /FlateDecode /DecodeParms << /Predictor 15 /Colors %d /BitsPerComponent %d /Columns %d >> >>'
+    ) % (width, height, color_space, bit_depth, colors, bit_depth, width)
+    return header, b''.join(idat), width, height, dpi
+
+def _jpeg_passthrough(data):
+    with Image.open(io.BytesIO(data)) as img:
+        if img.mode not in ('RGB', 'L', 'CMYK'):
+            return None
+        color_space = {'RGB': b'/DeviceRGB', 'L': b'/DeviceGray', 'CMYK': b'/DeviceCMYK'}[img.mode]
+        width, height = img.size
+        dpi = img.info.get('dpi', (None,))[0]
+    header = (
+        b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 '
+        b'/Filter /DCTDecode >>'
+    ) % (width, height, color_space)
+    return header, data, width, height, dpi
+
+def _flattened_image(data):
+    with Image.open(io.BytesIO(data)) as img:
+        dpi = img.info.get('dpi', (None,))[0]
+        img = img.convert('RGBA')
+        page = Image.new('RGB', img.size, 'white')
+        page.paste(img, mask=img.getchannel('A'))
+        del img
+    width, height = page.size
+    compressor = zlib.compressobj(6)
+    parts = []
+    for top in range(0, height, FALLBACK_STRIP_ROWS):
+        parts.append(compressor.compress(page.crop((0, top, width, min(height, top + FALLBACK_STRIP_ROWS))).tobytes()))
+    parts.append(compressor.flush())
+    del page
+    header = (
+        b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB /BitsPerComponent 8 '
+        b'/Filter /FlateDecode >>'
+    ) % (width, height)
+    return header, b''.join(parts), width, height, dpi
@@ -0,0 +1,282 @@
+"""Pillow backend for slide_layouts: draws the raster slides directly with ImageDraw, without matplotlib.
+
+Geometry, z-order and styling follow the matplotlib canvas so both backends produce the same slide:
+patches and icons first (in call order), then lines, then text with its bbox on top.
+"""
+import math
+import os
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+from caching import LRUCache
+from fonts import get_font
+from themes import COLOR_SCHEMES
+import metrics
+
+# tight_layout leaves the 10x10 axes at 15.7x8.7in of the 16x9in figure; savefig pads it by 0.1in
+SLIDE_AXES_INCHES = (15.7, 8.7)
+SLIDE_PAD_INCHES = 0.1
+TEXT_LINE_SPACING = 1.2
+# Shapes are drawn into a local mask at this many dpi (or more) and downsampled, for antialiased edges
+SHAPE_SUPERSAMPLE_DPI = int(os.environ.get('SHAPE_SUPERSAMPLE_DPI', 300))
+
+_backgrounds = LRUCache(max_bytes=int(os.environ.get('PIL_BACKGROUND_CACHE_BYTES', 256 * 1024 * 1024)),
+                        sizeof=lambda image: image.width * image.height * 3)
+
+def to_rgb(color):
+    return ImageColor.getrgb(color)[:3]
+
+def _ellipse_points(cx, cy, rx, ry, start, end, steps):
+    return [(cx + rx * math.cos(math.radians(a)), cy + ry * math.sin(math.radians(a)))
+            for a in np.linspace(start, end, steps)]
+
+def round_rect_points(x0, y0, x1, y1, rx, ry):
+    """Outline of a rectangle with elliptical corners, in pixel coordinates (y down)"""
+    rx = max(0.0, min(rx, (x1 - x0) / 2))
+    ry = max(0.0, min(ry, (y1 - y0) / 2))
+    if rx == 0 or ry == 0:
+        return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    # About one vertex per 4px of arc keeps large circles smooth at print dpi
+    steps = max(4, min(128, int(max(rx, ry) / 4)))
+    return (_ellipse_points(x1 - rx, y0 + ry, rx, ry, -90, 0, steps) +
+            _ellipse_points(x1 - rx, y1 - ry, rx, ry, 0, 90, steps) +
+            _ellipse_points(x0 + rx, y1 - ry, rx, ry, 90, 180, steps) +
+            _ellipse_points(x0 + rx, y0 + ry, rx, ry, 180, 270, steps))
+
+
+class PillowSlideCanvas:
+    """Renderer canvas drawing slide layouts straight into an RGB image at the profile's dpi"""
+
+    def __init__(self, theme='professional', dpi=150):
+        self.theme = theme
+        self.dpi = dpi
+        self.scale_x = SLIDE_AXES_INCHES[0] / 10 * dpi
+        self.scale_y = SLIDE_AXES_INCHES[1] / 10 * dpi
+        self.pad = SLIDE_PAD_INCHES * dpi
+        self.size = (int(self.pad * 2 + SLIDE_AXES_INCHES[0] * dpi), int(self.pad * 2 + SLIDE_AXES_INCHES[1] * dpi))
+        self.supersample = max(1, min(4, round(SHAPE_SUPERSAMPLE_DPI / dpi)))
+        self.image = Image.new('RGB', self.size, 'white')
+        self.static_ready = False
+        self._lines = []
+        self._texts = []
+        self._slots = {}
+
+    def px(self, x, y):
+        return self.pad + x * self.scale_x, self.pad + (10 - y) * self.scale_y
+
+    def pt(self, points):
+        return points * self.dpi / 72
+
+    def _paint(self, color, alpha, bounds, draw_shape, supersample=None):
+        """Composite color through an antialiased mask drawn by draw_shape(draw, to_mask, ss) within bounds"""
+        left = max(0, int(math.floor(bounds[0])) - 1)
+        top = max(0, int(math.floor(bounds[1])) - 1)
+        right = min(self.size[0], int(math.ceil(bounds[2])) + 1)
+        bottom = min(self.size[1], int(math.ceil(bounds[3])) + 1)
+        if right <= left or bottom <= top:
+            return
+        ss = supersample or self.supersample
+        mask = Image.new('L', ((right - left) * ss, (bottom - top) * ss), 0)
+
+        def to_mask(points):
+            return [((x - left) * ss, (y - top) * ss) for x, y in points]
+
+        draw_shape(ImageDraw.Draw(mask), to_mask, ss)
+        if ss > 1:
+            mask = mask.reduce(ss)
+        if alpha is not None and alpha < 1:
+            mask = mask.point(lambda value: round(value * alpha))
+        self.image.paste(to_rgb(color), (left, top, right, bottom), mask)
+
+    def _fill_polygon(self, points, color, alpha=None):
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        self._paint(color, alpha, (min(xs), min(ys), max(xs), max(ys)),
+                    lambda draw, to_mask, ss: draw.polygon(to_mask(points), fill=255))
+
+    def _stroke_ring(self, outer, inner, color, alpha=None):
+        xs = [x for x, _ in outer]
+        ys = [y for _, y in outer]
+
+        def draw_ring(draw, to_mask, ss):
+            draw.polygon(to_mask(outer), fill=255)
+            if inner:
+                draw.polygon(to_mask(inner), fill=0)
+
+        self._paint(color, alpha, (min(xs), min(ys), max(xs), max(ys)), draw_ring)
+
+    def _round_rect(self, x0, y0, x1, y1, rx, ry, facecolor, edgecolor, linewidth, alpha):
+        """Fill and stroke a rounded rectangle given in pixels, stroking centered on the outline like matplotlib"""
+        if facecolor not in (None, 'none'):
+            self._fill_polygon(round_rect_points(x0, y0, x1, y1, rx, ry), facecolor, alpha)
+        if edgecolor not in (None, 'none') and linewidth:
+            half = self.pt(linewidth) / 2
+            outer = round_rect_points(x0 - half, y0 - half, x1 + half, y1 + half, rx + half, ry + half)
+            inner = None
+            if x1 - x0 > 2 * half and y1 - y0 > 2 * half:
+                inner = round_rect_points(x0 + half, y0 + half, x1 - half, y1 - half, max(0, rx - half), max(0, ry - half))
+            self._stroke_ring(outer, inner, edgecolor, alpha)
+
+    def _box(self, xy, width, height, pad, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        x0, y1 = self.px(xy[0] - pad, xy[1] - pad)
+        x1, y0 = self.px(xy[0] + width + pad, xy[1] + height + pad)
+        self._round_rect(x0, y0, x1, y1, pad * self.scale_x, pad * self.scale_y, facecolor, edgecolor, linewidth, alpha)
+
+    def _circle(self, x, y, radius, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        cx, cy = self.px(x, y)
+        rx, ry = radius * self.scale_x, radius * self.scale_y
+        self._round_rect(cx - rx, cy - ry, cx + rx, cy + ry, rx, ry, facecolor, edgecolor, linewidth, alpha)
+
+    def _polygon(self, points, color, alpha=None):
+        self._fill_polygon([self.px(x, y) for x, y in points], color, alpha)
+
+    def _line(self, points, color, linewidth, alpha=None):
+        pixels = [self.px(x, y) for x, y in points]
+        width = self.pt(linewidth)
+        xs = [x for x, _ in pixels]
+        ys = [y for _, y in pixels]
+        bounds = (min(xs) - width, min(ys) - width, max(xs) + width, max(ys) + width)
+        self._paint(color, alpha, bounds, lambda draw, to_mask, ss: draw.line(
+            to_mask(pixels), fill=255, width=max(1, round(width * ss)), joint='curve'))
+
+    def background(self, gradient_colors, direction, banner_y=None):
+        key = (self.theme, tuple(gradient_colors), direction, banner_y, self.dpi)
+        self.image = _backgrounds.get_or_create(key, lambda: self._render_background(gradient_colors, direction,
+                                                                                     banner_y)).copy()
+
+    def _render_background(self, gradient_colors, direction, banner_y):
+        """Gradient at 30% over white plus the corner decorations and banner box, as in design_elements"""
+        colors = COLOR_SCHEMES[self.theme]
+        left, top = (round(v) for v in self.px(0, 10))
+        right, bottom = (round(v) for v in self.px(10, 0))
+        height, width = bottom - top, right - left
+        down = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+        across = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+        if direction == 'vertical':
+            t = np.broadcast_to(down, (height, width))
+        elif direction == 'horizontal':
+            t = np.broadcast_to(across, (height, width))
+        else:
+            t = down * across
+        start = np.array(to_rgb(gradient_colors[0]), dtype=np.float32)
+        end = np.array(to_rgb(gradient_colors[1]), dtype=np.float32)
+        gradient = start + (end - start) * t[..., None]
+        layer = 255 * 0.7 + gradient * 0.3
+        self.image.paste(Image.fromarray(np.round(layer).astype(np.uint8), 'RGB'), (left, top))
+        self._circle(0.5, 9.5, 0.3, colors['accent'], alpha=0.3)
+        self._circle(9.5, 0.5, 0.25, colors['secondary'], alpha=0.3)
+        self._box((0, 4), 0.1, 2, 0, colors['primary'], alpha=0.8)
+        if banner_y is not None:
+            self._box((0.5, banner_y - 0.4), 9, 0.8, 0.1, colors['primary'], colors['accent'], 2, 0.9)
+        return self.image
+
+    def text(self, x, y, s, fontsize, color, ha='center', va='center', fontweight='normal', style='normal',
+             alpha=None, bbox=None):
+        self._texts.append([x, y, s, fontsize, color, ha, va, fontweight, style, alpha, bbox])
+
+    def text_slot(self, name, x, y, fontsize, color, **text_kwargs):
+        self.text(x, y, '', fontsize, color, **text_kwargs)
+        self._slots[name] = self._texts[-1]
+
+    def fill_slot(self, name, s):
+        self._slots[name][2] = s
+
+    def round_box(self, xy, width, height, pad, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        self._box(xy, width, height, pad, facecolor, edgecolor, linewidth, alpha)
+
+    def vline(self, x, ymin, ymax, color, linewidth, alpha=None):
+        self._lines.append(([(x, ymin * 10), (x, ymax * 10)], color, linewidth, alpha))
+
+    def icon(self, icon_name, x, y, size, color):
+        PIL_ICONS[icon_name](self, x, y, size, color)
+
+    def _draw_text(self, x, y, s, fontsize, color, ha, va, fontweight, style, alpha, bbox):
+        font = get_font('bold' if fontweight == 'bold' else 'normal', 'italic' if style == 'italic' else 'normal',
+                        self.pt(fontsize))
+        ascent, descent = font.getmetrics()
+        pitch = self.pt(fontsize) * TEXT_LINE_SPACING
+        lines = s.split('\n')
+        widths = [font.getlength(line) for line in lines]
+        block_w = max(widths)
+        block_h = (len(lines) - 1) * pitch + ascent + descent
+        px, py = self.px(x, y)
+        left = px - block_w / 2 if ha == 'center' else px
+        top = {'center': py - block_h / 2, 'top': py, 'bottom': py - block_h}.get(va, py - block_h / 2)
+        if bbox:
+            # Like matplotlib's text bbox, the patch gets a black 1pt edge unless told otherwise
+            pad = float(bbox.get('boxstyle', 'round,pad=0.3').split('pad=')[-1]) * self.pt(fontsize)
+            self._round_rect(left - pad, top - pad, left + block_w + pad, top + block_h + pad, pad, pad,
+                             bbox.get('facecolor'), bbox.get('edgecolor', 'black'), bbox.get('linewidth', 1),
+                             bbox.get('alpha'))
+
+        def draw_lines(draw, to_mask, ss):
+            for i, (line, width) in enumerate(zip(lines, widths)):
+                line_x = left + (block_w - width) / 2 if ha == 'center' else left
+                draw.text(to_mask([(line_x, top + ascent + i * pitch)])[0], line, font=font, fill=255, anchor='ls')
+
+        # FreeType already antialiases glyphs, so text masks are drawn at 1x
+        self._paint(color, alpha, (left - 2, top - 2, left + block_w + 2, top + block_h + 2), draw_lines, supersample=1)
+
+    def finish(self):
+        for points, color, linewidth, alpha in self._lines:
+            self._line(points, color, linewidth, alpha)
+        for text in self._texts:
+            if text[2]:
+                self._draw_text(*text)
+        return self.image
+
+
+def draw_icon_computer(canvas, x, y, size, color):
+    canvas._box((x-size/2, y-size/4), size, size/2, 0, color, 'white', 2)
+    canvas._box((x-size/2+0.1, y-size/4+0.1), size-0.2, size/2-0.3, 0, 'white', color, 1)
+    canvas._box((x-0.1, y-size/2), 0.2, size/4, 0, color, 'white', 1)
+    canvas._box((x-size/3, y-size/2), size*2/3, 0.1, 0, color, 'white', 1)
+
+def draw_icon_brain(canvas, x, y, size, color):
+    canvas._circle(x, y, size/2, color, 'white', 2, alpha=0.8)
+    for i in range(3):
+        canvas._circle(x + (i-1)*0.15, y + 0.1, 0.08, 'white', color, 1, alpha=0.7)
+
+def draw_icon_rocket(canvas, x, y, size, color):
+    canvas._box((x-size/6, y-size/2), size/3, size, 0.02, color, 'white', 2)
+    tip = [(x-size/6, y+size/2), (x, y+size/2+size/3), (x+size/6, y+size/2)]
+    canvas._polygon(tip, color, alpha=0.8)
+    canvas._line(tip, 'white', 3)
+    canvas._polygon([(x-size/8, y-size/2), (x, y-size/2-size/4), (x+size/8, y-size/2)], '#FFA500', alpha=0.8)
+
+def draw_icon_chart(canvas, x, y, size, color):
+    canvas._box((x-size/2, y-size/2), size, size, 0, 'white', color, 2)
+    bar_width = size/6
+    for i, height in enumerate([0.2, 0.5, 0.3, 0.7]):
+        bar_x = x - size/2 + 0.1 + i * bar_width * 1.2
+        canvas._box((bar_x, y-size/2+0.1), bar_width, height*size*0.6, 0, color, alpha=0.8)
+
+def draw_icon_gear(canvas, x, y, size, color):
+    canvas._circle(x, y, size/3, color, 'white', 2)
+    for i in range(8):
+        angle = 2 * math.pi * i / 8
+        canvas._circle(x + (size/3 + 0.1) * math.cos(angle), y + (size/3 + 0.1) * math.sin(angle), 0.05, color, 'white', 1)
+    canvas._circle(x, y, size/8, 'white', color, 2)
+
+def draw_icon_lightbulb(canvas, x, y, size, color):
+    canvas._circle(x, y+size/6, size/3, color, 'white', 2, alpha=0.9)
+    canvas._box((x-size/6, y-size/3), size/3, size/4, 0, '#E17055', 'white', 2)
+    for angle in [45, 90, 135, 225, 270, 315]:
+        rad = math.radians(angle)
+        start_x = x + (size/3 + 0.05) * math.cos(rad)
+        start_y = y + size/6 + (size/3 + 0.05) * math.sin(rad)
+        canvas._line([(start_x, start_y), (start_x + size/4 * math.cos(rad), start_y + size/4 * math.sin(rad))],
+                     color, 3, alpha=0.7)
+
+PIL_ICONS = {
+    'computer': draw_icon_computer,
+    'brain': draw_icon_brain,
+    'rocket': draw_icon_rocket,
+    'chart': draw_icon_chart,
+    'gear': draw_icon_gear,
+    'lightbulb': draw_icon_lightbulb
+}
+
+def background_cache_stats():
+    return _backgrounds.stats()
+
+metrics.register_cache('pil_backgrounds', _backgrounds)
@@ -0,0 +1,175 @@
+import copy
+from admission import get_admission_controller, estimate_render_bytes
+from slide_specs import (build_slide_specs, validate_structure, iter_slide_specs, get_render_workers, RENDER_PROFILES,
+                         RENDERERS, IMAGE_ENCODINGS)
+from ai_structures import get_presentation_structure, stream_presentation_structure
+import metrics
+
+PPTX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+OUTPUT_FORMATS = {
+    'pdf': ('application/pdf', 'presentation.pdf'),
+    'ppt': (PPTX_MIMETYPE, 'presentation.pptx'),
+    'html': ('text/html', 'presentation.html')
+}
+RENDER_MODES = ['vector', 'raster']
+
+def _no_progress(stage, done=None, total=None):
+    pass
+
+def track_progress(items, progress, total=None):
+    """Report ('rendering', n, total) as each slide is produced and ('merging') once all are done"""
+    done = 0
+    progress('rendering', done, total)
+    for item in items:
+        yield item
+        done += 1
+        progress('rendering', done, total)
+    progress('merging', done, done)
+
+def validate_options(format, mode='vector', profile='print', renderer=None, encoding=None):
+    if format not in OUTPUT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(OUTPUT_FORMATS)}")
+    if mode not in RENDER_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(RENDER_MODES)}")
+    if profile not in RENDER_PROFILES:
+        raise ValueError(f"profile must be one of: {', '.join(RENDER_PROFILES)}")
+    if renderer is not None and renderer not in RENDERERS:
+        raise ValueError(f"renderer must be one of: {', '.join(RENDERERS)}")
+    if encoding is not None and encoding not in IMAGE_ENCODINGS:
+        raise ValueError(f"encoding must be one of: {', '.join(IMAGE_ENCODINGS)}")
+
+def validate_workers(workers):
+    """Parse a client-supplied worker count; it only caps the request's share of the fixed-size render pool"""
+    if workers is None or workers == '':
+        return None
+    # JSON bodies can carry true or 2.5, which int() would quietly turn into 1 and 2
+    if isinstance(workers, bool) or (isinstance(workers, float) and not workers.is_integer()):
+        raise ValueError('workers must be a positive integer')
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        raise ValueError('workers must be a positive integer')
+    if workers < 1:
+        raise ValueError('workers must be a positive integer')
+    return get_render_workers(workers)
+
+def generate_deck(prompt, format, mode='vector', profile='print', workers=None, stream=False, progress=None,
+                  renderer=None, encoding=None, interactive=True):
+    """Run structure -> render -> merge for one prompt and return (buffer, mimetype, download_name)
+
+    renderer picks the raster backend ('matplotlib' or 'pillow') and encoding overrides the profile's slide
+    image encoding; vector output always uses its own backend and ignores both. Background callers pass
+    interactive=False to wait for render capacity instead of being rejected.
+    """
+    validate_options(format, mode, profile, renderer, encoding)
+    progress = progress or _no_progress
+    progress('structure')
+    if stream:
+        # Slides are rendered while the LLM is still generating the rest of the deck
+        specs = iter_slide_specs(stream_presentation_structure(prompt))
+        total = None
+    else:
+        specs = build_slide_specs(get_presentation_structure(prompt))
+        total = len(specs)
+    return render_deck(specs, format, mode, profile, workers, progress, renderer, total, encoding, interactive)
+
+def stream_deck_pdf(prompt, profile='print', workers=None, renderer=None, encoding=None):
+    """Streamed raster PDF: render slides while the LLM is still generating and send each page once written.
+
+    Returns (chunk iterator, mimetype, download_name). Admission happens before this returns, so an overloaded
+    server still answers 503 instead of starting a response it cannot finish.
+    """
+    validate_options('pdf', 'raster', profile, renderer, encoding)
+    chunks = _iter_streamed_pdf(prompt, profile, workers, renderer, encoding)
+    next(chunks)
+    mimetype, download_name = OUTPUT_FORMATS['pdf']
+    return chunks, mimetype, download_name
+
+def _iter_streamed_pdf(prompt, profile, workers, renderer, encoding):
+    from ppt_generator import iter_rendered_slides
+    from file_utils import iter_images_to_pdf
+    cost = estimate_render_bytes(None, 'pdf', 'raster', profile, renderer, encoding, workers)
+    with get_admission_controller().admit(cost):
+        yield b''
+        specs = iter_slide_specs(stream_presentation_structure(prompt))
+        size = 0
+        for chunk in iter_images_to_pdf(iter_rendered_slides(specs, workers, profile, renderer, encoding)):
+            size += len(chunk)
+            yield chunk
+    metrics.output_bytes.observe(size, format='pdf', mode='raster')
+
+def generate_deck_cached(prompt, format, mode='vector', profile='print', workers=None, renderer=None, encoding=None):
+    """Like generate_deck, but reuse a finished artifact for the same structure and options.
+
+    Returns (fileobj, mimetype, download_name, etag); the ETag is a strong validator for the returned bytes.
+    """
+    validate_options(format, mode, profile, renderer, encoding)
+    structure = get_presentation_structure(prompt)
+    return render_structure_cached(structure, format, mode, profile, workers, renderer, encoding)
+
+def render_structure_cached(structure, format, mode='vector', profile='print', workers=None, renderer=None,
+                            encoding=None):
+    """The render half of generate_deck_cached, for callers that fetched the structure themselves"""
+    from artifact_cache import artifact_key, open_artifact, store_artifact
+    key = artifact_key(structure, format, mode, profile, renderer, encoding)
+    cached = open_artifact(key)
+    if cached is not None:
+        return cached
+    specs = build_slide_specs(structure)
+    result, mimetype, download_name = render_deck(specs, format, mode, profile, workers, None, renderer, len(specs),
+                                                  encoding)
+    return store_artifact(key, result, mimetype, download_name)
+
+def regenerate_deck(structure, format, mode='raster', profile='print', workers=None, progress=None, renderer=None,
+                    encoding=None):
+    """Re-export an edited structure (the shape get_presentation_structure returns) without calling the LLM.
+
+    In raster mode unchanged slides come from the slide raster cache, so a one-slide edit costs one render plus
+    the merge.
+    """
+    validate_options(format, mode, profile, renderer, encoding)
+    validate_structure(structure)
+    specs = build_slide_specs(copy.deepcopy(structure))
+    return render_deck(specs, format, mode, profile, workers, progress, renderer, len(specs), encoding)
+
+def render_deck(specs, format, mode='vector', profile='print', workers=None, progress=None, renderer=None, total=None,
+                encoding=None, interactive=True):
+    """Render and merge slide specs (a list or an iterator) into one artifact: (buffer, mimetype, download_name).
+
+    Waits for admission against the render memory budget first; interactive callers get admission.Overloaded
+    when the queue is full or the wait runs out.
+    """
+    progress = progress or _no_progress
+    cost = estimate_render_bytes(total, format, mode, profile, renderer, encoding, workers)
+    with get_admission_controller().admit(cost, bounded=interactive):
+        result = _render_and_merge(specs, format, mode, profile, workers, progress, renderer, total, encoding)
+    result.seek(0, 2)
+    metrics.output_bytes.observe(result.tell(), format=format, mode=mode)
+    result.seek(0)
+    mimetype, download_name = OUTPUT_FORMATS[format]
+    return result, mimetype, download_name
+
+def _render_and_merge(specs, format, mode, profile, workers, progress, renderer, total, encoding):
+    # Backends are imported per output path so e.g. native PPTX never loads matplotlib or numpy
+    if format == 'html':
+        # Always SVG, whatever the mode: there is no raster to choose a profile for
+        from svg_renderer import build_html_deck
+        result = build_html_deck(track_progress(specs, progress, total))
+    elif mode == 'vector' and format == 'ppt':
+        from pptx_renderer import build_native_pptx_from_specs
+        result = build_native_pptx_from_specs(track_progress(specs, progress, total))
+    elif mode == 'vector':
+        from ppt_generator import iter_slide_figures
+        from file_utils import merge_figures_to_pdf
+        result = merge_figures_to_pdf(track_progress(iter_slide_figures(specs, dpi=None), progress, total))
+    else:
+        from ppt_generator import iter_rendered_slides
+        from file_utils import merge_images_to_pdf, merge_images_to_ppt
+        # Slide PNGs and the merged artifact stay in memory (spilling past OUTPUT_SPILL_BYTES)
+        image_buffers = track_progress(iter_rendered_slides(specs, workers, profile, renderer, encoding), progress, total)
+        if format == 'pdf':
+            result = merge_images_to_pdf(image_buffers)
+        else:
+            result = merge_images_to_ppt(image_buffers)
+    return result
@@ -1,13 +1,37 @@
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.transforms import Bbox
+import hashlib
 import io
+import json
+import os
 import textwrap
-from design_elements import COLOR_SCHEMES, ICON_FUNCTIONS, create_gradient_background, add_decorative_elements, create_title_banner
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import metrics
+from caching import LRUCache, DiskCache
+from PIL import Image
+from slide_specs import (RENDER_PROFILES, DEFAULT_PROFILE, SLIDE_TYPES, get_render_profile, get_image_encoding,
+                         determine_theme_from_topic, suggest_icons_for_topic, make_title_spec, make_content_spec,
+                         build_slide_specs, iter_slide_specs, DEFAULT_RENDERER, RENDER_WORKERS,
+                         get_render_workers)
+from design_elements import COLOR_SCHEMES, ICON_FUNCTIONS, draw_background_layer, stamp_icon
+from slide_layouts import draw_slide, draw_static
+from pil_renderer import PillowSlideCanvas
+from image_encoding import encode_image
+
+DEFAULT_DPI = 600
 
 def setup_high_quality_rendering():
     """Configure matplotlib for high-quality text rendering"""
-    plt.rcParams.update({
+    matplotlib.rcParams.update({
         'text.antialiased': True,
         'font.family': 'sans-serif',
         'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans'],
@@ -22,357 +46,399 @@ def setup_high_quality_rendering():
         'savefig.pad_inches': 0.1
     })
 
-def create_title_slide(slide_data, theme='professional'):
-    setup_high_quality_rendering()
-    colors = COLOR_SCHEMES[theme]
-    fig, ax = plt.subplots(figsize=(16, 9))
-    fig.set_dpi(150)
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 10)
-    ax.axis('off')
-    fig.patch.set_facecolor(colors['bg'])
-    create_gradient_background(ax, [colors['bg'], colors['light']], 'diagonal')
-    title = slide_data.get('title', 'Presentation Title')
-    ax.text(5, 7, title, fontsize=32, fontweight='bold', 
-            color=colors['primary'], ha='center', va='center',
-            bbox=dict(boxstyle="round,pad=0.5", facecolor=colors['light'], 
-                     edgecolor=colors['accent'], linewidth=3))
-    subtitle = slide_data.get('subtitle', '')
-    if subtitle:
-        ax.text(5, 5.5, subtitle, fontsize=20, 
-                color=colors['text'], ha='center', va='center', style='italic')
-    icon_name = slide_data.get('icon', 'lightbulb')
-    if icon_name in ICON_FUNCTIONS:
-        ICON_FUNCTIONS[icon_name](ax, 5, 3.5, size=1.5, color=colors['accent'])
-    add_decorative_elements(ax, theme)
-    ax.text(5, 1, 'Slide 1', fontsize=12, color=colors['text'], ha='center', va='center', alpha=0.7)
-    plt.tight_layout()
-    return fig
-
-def create_definition_slide(slide_data, slide_num, theme='professional'):
-    setup_high_quality_rendering()
-    colors = COLOR_SCHEMES[theme]
-    fig, ax = plt.subplots(figsize=(16, 9))
-    fig.set_dpi(150)
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 10)
-    ax.axis('off')
-    fig.patch.set_facecolor(colors['bg'])
-    create_gradient_background(ax, [colors['bg'], colors['light']], 'horizontal')
-    title = slide_data.get('title', f'Definition - Slide {slide_num}')
-    create_title_banner(ax, title, theme, 8.5)
-    definition = slide_data.get('definition', '')
-    if definition:
-        wrapped_def = textwrap.fill(definition, width=70)
-        def_bg = FancyBboxPatch((0.5, 5.5), 9, 1.5, 
-                               boxstyle="round,pad=0.3", 
-                               facecolor=colors['light'], 
-                               edgecolor=colors['primary'], 
-                               linewidth=2, alpha=0.9)
-        ax.add_patch(def_bg)
-        ax.text(5, 6.25, wrapped_def, fontsize=16, 
-                color=colors['text'], ha='center', va='center', weight='normal')
-    characteristics = slide_data.get('characteristics', [])
-    if characteristics:
-        ax.text(5, 4.8, 'Key Characteristics:', fontsize=18, fontweight='bold',
-                color=colors['primary'], ha='center', va='center')
-        for i, char in enumerate(characteristics[:4]):
-            y_pos = 4.2 - (i * 0.4)
-            bullet = FancyBboxPatch((1, y_pos-0.1), 0.2, 0.2, 
-                                   boxstyle="round,pad=0.02", 
-                                   facecolor=colors['accent'], 
-                                   edgecolor='white', linewidth=1)
-            ax.add_patch(bullet)
-            ax.text(1.1, y_pos, '✓', fontsize=12, color='white', 
-                    ha='center', va='center', fontweight='bold')
-            wrapped_char = textwrap.fill(char, width=55)
-            ax.text(1.5, y_pos, wrapped_char, fontsize=14, 
-                    color=colors['text'], ha='left', va='center')
-    icon_name = slide_data.get('icon', 'brain')
-    if icon_name in ICON_FUNCTIONS:
-        ICON_FUNCTIONS[icon_name](ax, 8.5, 3.5, size=1, color=colors['secondary'])
-    add_decorative_elements(ax, theme)
-    ax.text(5, 0.5, f'Slide {slide_num}', fontsize=12, color=colors['text'], ha='center', va='center', alpha=0.7)
-    plt.tight_layout()
-    return fig
-
-def create_use_cases_slide(slide_data, slide_num, theme='professional'):
-    setup_high_quality_rendering()
-    colors = COLOR_SCHEMES[theme]
-    fig, ax = plt.subplots(figsize=(16, 9))
-    fig.set_dpi(150)
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 10)
-    ax.axis('off')
-    fig.patch.set_facecolor(colors['bg'])
-    create_gradient_background(ax, [colors['bg'], colors['light']], 'vertical')
-    title = slide_data.get('title', f'Use Cases - Slide {slide_num}')
-    create_title_banner(ax, title, theme, 8.5)
-    use_cases = slide_data.get('use_cases', [])
-    y_start = 7.2
-    for i, use_case in enumerate(use_cases[:4]):
-        y_pos = y_start - (i * 1.2)
-        number_circle = FancyBboxPatch((0.8, y_pos-0.15), 0.3, 0.3, 
-                                      boxstyle="round,pad=0.05", 
-                                      facecolor=colors['primary'], 
-                                      edgecolor='white', linewidth=2)
-        ax.add_patch(number_circle)
-        ax.text(0.95, y_pos, str(i+1), fontsize=16, color='white', 
-                ha='center', va='center', fontweight='bold')
-        case_title = use_case.get('title', f'Use Case {i+1}')
-        case_desc = use_case.get('description', '')
-        ax.text(1.5, y_pos+0.15, case_title, fontsize=16, fontweight='bold',
-                color=colors['primary'], ha='left', va='center')
-        if case_desc:
-            wrapped_desc = textwrap.fill(case_desc, width=50)
-            ax.text(1.5, y_pos-0.15, wrapped_desc, fontsize=13, 
-                    color=colors['text'], ha='left', va='center')
-    icon_name = slide_data.get('icon', 'gear')
-    if icon_name in ICON_FUNCTIONS and len(use_cases) <= 3:
-        ICON_FUNCTIONS[icon_name](ax, 8.5, 4, size=1.2, color=colors['secondary'])
-    add_decorative_elements(ax, theme)
-    ax.text(5, 0.5, f'Slide {slide_num}', fontsize=12, color=colors['text'], ha='center', va='center', alpha=0.7)
-    plt.tight_layout()
-    return fig
-
-def create_examples_slide(slide_data, slide_num, theme='professional'):
-    setup_high_quality_rendering()
-    colors = COLOR_SCHEMES[theme]
-    fig, ax = plt.subplots(figsize=(16, 9))
-    fig.set_dpi(150)
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 10)
-    ax.axis('off')
-    fig.patch.set_facecolor(colors['bg'])
-    create_gradient_background(ax, [colors['light'], colors['bg']], 'diagonal')
-    title = slide_data.get('title', f'Examples - Slide {slide_num}')
-    create_title_banner(ax, title, theme, 8.5)
-    examples = slide_data.get('examples', [])
-    if len(examples) <= 2:
-        for i, example in enumerate(examples):
-            y_base = 6.5 - (i * 2.5)
-            example_box = FancyBboxPatch((0.5, y_base-0.8), 9, 1.6, 
-                                        boxstyle="round,pad=0.2", 
-                                        facecolor='white', 
-                                        edgecolor=colors['primary'], 
-                                        linewidth=2, alpha=0.9)
-            ax.add_patch(example_box)
-            ex_title = example.get('title', f'Example {i+1}')
-            ax.text(5, y_base+0.3, ex_title, fontsize=18, fontweight='bold',
-                    color=colors['primary'], ha='center', va='center')
-            ex_desc = example.get('description', '')
-            if ex_desc:
-                wrapped_desc = textwrap.fill(ex_desc, width=80)
-                ax.text(5, y_base-0.2, wrapped_desc, fontsize=14, 
-                        color=colors['text'], ha='center', va='center')
-    else:
-        for i, example in enumerate(examples[:4]):
-            col = i % 2
-            row = i // 2
-            x_pos = 2.5 + (col * 5)
-            y_pos = 6 - (row * 2.5)
-            example_box = FancyBboxPatch((x_pos-2, y_pos-0.8), 4, 1.6, 
-                                        boxstyle="round,pad=0.15", 
-                                        facecolor='white', 
-                                        edgecolor=colors['accent'], 
-                                        linewidth=2, alpha=0.9)
-            ax.add_patch(example_box)
-            ex_title = example.get('title', f'Example {i+1}')
-            ax.text(x_pos, y_pos+0.2, ex_title, fontsize=14, fontweight='bold',
-                    color=colors['primary'], ha='center', va='center')
-            ex_desc = example.get('description', '')[:80] + '...' if len(example.get('description', '')) > 80 else example.get('description', '')
-            if ex_desc:
-                wrapped_desc = textwrap.fill(ex_desc, width=30)
-                ax.text(x_pos, y_pos-0.3, wrapped_desc, fontsize=11, 
-                        color=colors['text'], ha='center', va='center')
-    add_decorative_elements(ax, theme)
-    ax.text(5, 0.5, f'Slide {slide_num}', fontsize=12, color=colors['text'], ha='center', va='center', alpha=0.7)
-    plt.tight_layout()
-    return fig
-
-def create_benefits_challenges_slide(slide_data, slide_num, theme='professional'):
-    setup_high_quality_rendering()
-    colors = COLOR_SCHEMES[theme]
-    fig, ax = plt.subplots(figsize=(16, 9))
-    fig.set_dpi(150)
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 10)
-    ax.axis('off')
-    fig.patch.set_facecolor(colors['bg'])
-    create_gradient_background(ax, [colors['bg'], colors['light']], 'horizontal')
-    title = slide_data.get('title', f'Benefits & Challenges - Slide {slide_num}')
-    create_title_banner(ax, title, theme, 8.5)
-    benefits = slide_data.get('benefits', [])
-    ax.text(2.5, 7.5, '✅ Benefits', fontsize=20, fontweight='bold',
-            color='#27AE60', ha='center', va='center')
-    for i, benefit in enumerate(benefits[:4]):
-        y_pos = 6.8 - (i * 0.6)
-        ax.text(0.5, y_pos, '•', fontsize=16, color='#27AE60', 
-                ha='center', va='center', fontweight='bold')
-        wrapped_benefit = textwrap.fill(benefit, width=35)
-        ax.text(0.8, y_pos, wrapped_benefit, fontsize=13, 
-                color=COLOR_SCHEMES[theme]['text'], ha='left', va='center')
-    challenges = slide_data.get('challenges', [])
-    ax.text(7.5, 7.5, '⚠️ Challenges', fontsize=20, fontweight='bold',
-            color='#E74C3C', ha='center', va='center')
-    for i, challenge in enumerate(challenges[:4]):
-        y_pos = 6.8 - (i * 0.6)
-        ax.text(5.5, y_pos, '•', fontsize=16, color='#E74C3C', 
-                ha='center', va='center', fontweight='bold')
-        wrapped_challenge = textwrap.fill(challenge, width=35)
-        ax.text(5.8, y_pos, wrapped_challenge, fontsize=13, 
-                color=COLOR_SCHEMES[theme]['text'], ha='left', va='center')
-    ax.axvline(x=5, ymin=0.2, ymax=0.8, color=colors['primary'], linewidth=3, alpha=0.7)
-    add_decorative_elements(ax, theme)
-    ax.text(5, 0.5, f'Slide {slide_num}', fontsize=12, color=colors['text'], ha='center', va='center', alpha=0.7)
-    plt.tight_layout()
-    return fig
-
-def create_detailed_content_slide(slide_data, slide_num, theme='professional'):
-    setup_high_quality_rendering()
-    colors = COLOR_SCHEMES[theme]
-    fig, ax = plt.subplots(figsize=(16, 9))
-    fig.set_dpi(150)
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 10)
-    ax.axis('off')
-    fig.patch.set_facecolor(colors['bg'])
-    create_gradient_background(ax, [colors['bg'], colors['light']], 'horizontal')
-    title = slide_data.get('title', f'Slide {slide_num}')
-    create_title_banner(ax, title, theme, 8.5)
-    description = slide_data.get('description', '')
-    if description:
-        wrapped_desc = textwrap.fill(description, width=80)
-        ax.text(5, 7, wrapped_desc, fontsize=15, 
-                color=colors['text'], ha='center', va='center',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='white', 
-                         edgecolor=colors['light'], linewidth=1, alpha=0.9))
-    points = slide_data.get('points', [])
-    y_start = 5.8
-    for i, point in enumerate(points[:5]):
-        y_pos = y_start - (i * 0.7)
-        bullet = FancyBboxPatch((0.8, y_pos-0.12), 0.25, 0.25, 
-                               boxstyle="round,pad=0.03", 
-                               facecolor=colors['accent'], 
-                               edgecolor='white', linewidth=2)
-        ax.add_patch(bullet)
-        ax.text(0.925, y_pos, '●', fontsize=14, color='white', 
-                ha='center', va='center', fontweight='bold')
-        wrapped_text = textwrap.fill(point, width=55)
-        ax.text(1.3, y_pos, wrapped_text, fontsize=14, 
-                color=colors['text'], ha='left', va='center',
-                bbox=dict(boxstyle="round,pad=0.2", facecolor='white', 
-                         edgecolor=colors['light'], linewidth=1, alpha=0.8))
-    icon_name = slide_data.get('icon', 'chart')
-    if icon_name in ICON_FUNCTIONS and len(points) <= 3:
-        ICON_FUNCTIONS[icon_name](ax, 8.5, 3.5, size=1.2, color=colors['secondary'])
-    add_decorative_elements(ax, theme)
-    ax.text(5, 0.5, f'Slide {slide_num}', fontsize=12, color=colors['text'], ha='center', va='center', alpha=0.7)
-    plt.tight_layout()
-    return fig
-
-def create_conclusion_slide(slide_data, slide_num, theme='professional'):
-    setup_high_quality_rendering()
-    colors = COLOR_SCHEMES[theme]
-    fig, ax = plt.subplots(figsize=(16, 9))
-    fig.set_dpi(150)
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 10)
-    ax.axis('off')
-    fig.patch.set_facecolor(colors['bg'])
-    create_gradient_background(ax, [colors['light'], colors['bg']], 'vertical')
-    ax.text(5, 8, 'Conclusion', fontsize=28, fontweight='bold', 
-            color='white', ha='center', va='center',
-            bbox=dict(boxstyle="round,pad=0.4", facecolor=colors['primary'], 
-                     edgecolor=colors['accent'], linewidth=2, alpha=0.9))
-    conclusion = slide_data.get('conclusion', 'Thank you for your attention!')
-    wrapped_conclusion = textwrap.fill(conclusion, width=60)
-    ax.text(5, 6.2, wrapped_conclusion, fontsize=18, 
-            color=colors['text'], ha='center', va='center',
-            bbox=dict(boxstyle="round,pad=0.5", facecolor='white', 
-                     edgecolor=colors['primary'], linewidth=2, alpha=0.9))
-    takeaways = slide_data.get('takeaways', [])
-    if takeaways:
-        ax.text(5, 4.8, '🎯 Key Takeaways:', fontsize=18, fontweight='bold',
-                color=colors['primary'], ha='center', va='center')
-        for i, takeaway in enumerate(takeaways[:4]):
-            y_pos = 4.2 - (i * 0.4)
-            ax.text(5, y_pos, f'• {takeaway}', fontsize=15, 
-                    color=colors['text'], ha='center', va='center',
-                    bbox=dict(boxstyle="round,pad=0.1", facecolor=colors['light'], 
-                             alpha=0.7))
-    ICON_FUNCTIONS['lightbulb'](ax, 5, 1.8, size=1, color=colors['accent'])
-    ax.text(5, 1, 'Thank You!', fontsize=20, fontweight='bold',
-            color=colors['primary'], ha='center', va='center')
-    add_decorative_elements(ax, theme)
-    ax.text(5, 0.3, f'Slide {slide_num}', fontsize=12, color=colors['text'], ha='center', va='center', alpha=0.7)
-    plt.tight_layout()
-    return fig
-
-def determine_theme_from_topic(topic):
-    topic_lower = topic.lower()
-    if any(word in topic_lower for word in ['business', 'professional', 'corporate', 'finance', 'management']):
-        return 'professional'
-    elif any(word in topic_lower for word in ['tech', 'technology', 'ai', 'computer', 'digital', 'software']):
-        return 'tech'
-    elif any(word in topic_lower for word in ['creative', 'design', 'art', 'marketing', 'brand']):
-        return 'creative'
-    else:
-        return 'modern'
-
-def suggest_icons_for_topic(topic):
-    topic_lower = topic.lower()
-    icon_mapping = {
-        'computer': ['computer', 'tech', 'software', 'digital', 'programming'],
-        'brain': ['ai', 'intelligence', 'learning', 'psychology', 'education'],
-        'rocket': ['startup', 'growth', 'innovation', 'space', 'future'],
-        'chart': ['business', 'data', 'analytics', 'sales', 'finance'],
-        'gear': ['process', 'system', 'engineering', 'manufacturing'],
-        'lightbulb': ['idea', 'creative', 'innovation', 'solution']
-    }
-    for icon, keywords in icon_mapping.items():
-        if any(keyword in topic_lower for keyword in keywords):
-            return icon
-    return 'lightbulb'
-
-def create_slide_images(presentation_data, theme=None):
-    slides = []
-    if not theme:
-        theme = determine_theme_from_topic(presentation_data.get('topic', ''))
-    title_data = {
-        'title': presentation_data.get('title', 'Presentation'),
-        'subtitle': presentation_data.get('subtitle', ''),
-        'icon': suggest_icons_for_topic(presentation_data.get('topic', ''))
-    }
-    title_fig = create_title_slide(title_data, theme)
-    slides.append(title_fig)
-    content_slides = presentation_data.get('slides', [])
-    for i, slide_data in enumerate(content_slides, 2):
-        slide_type = slide_data.get('type', 'content')
-        if slide_type == 'definition':
-            fig = create_definition_slide(slide_data, i, theme)
-        elif slide_type == 'use_cases':
-            fig = create_use_cases_slide(slide_data, i, theme)
-        elif slide_type == 'examples':
-            fig = create_examples_slide(slide_data, i, theme)
-        elif slide_type == 'benefits_challenges':
-            fig = create_benefits_challenges_slide(slide_data, i, theme)
-        elif slide_type == 'conclusion':
-            fig = create_conclusion_slide(slide_data, i, theme)
-        else:
-            slide_data['icon'] = suggest_icons_for_topic(slide_data.get('title', ''))
-            fig = create_detailed_content_slide(slide_data, i, theme)
-        slides.append(fig)
-    return slides
-
-def convert_slides_to_images(slides):
-    image_buffers = []
+# rcParams are process-global, so apply them once at import (including in render workers)
+setup_high_quality_rendering()
+
+class MatplotlibSlideCanvas:
+    """Renderer canvas drawing slide layouts onto a matplotlib figure; dpi=None keeps everything vector"""
+
+    def __init__(self, theme='professional', dpi=DEFAULT_DPI, fig=None):
+        self.theme = theme
+        self.dpi = dpi
+        if fig is None:
+            # A bare Figure rather than pyplot's global figure manager, so slides can be built on any thread
+            fig = Figure(figsize=(16, 9))
+            FigureCanvasAgg(fig)
+            fig.add_subplot()
+        self.fig = fig
+        self.ax = fig.axes[0]
+        self.fig.set_dpi(150)
+        self.ax.set_xlim(0, 10)
+        self.ax.set_ylim(0, 10)
+        self.ax.axis('off')
+        self.fig.patch.set_facecolor(COLOR_SCHEMES[theme]['bg'])
+        self.static_ready = False
+        self.slots = {}
+
+    def background(self, gradient_colors, direction, banner_y=None):
+        draw_background_layer(self.ax, self.theme, gradient_colors, direction, self.dpi, banner_y=banner_y)
+
+    def text(self, x, y, s, fontsize, color, ha='center', va='center', fontweight='normal', style='normal',
+             alpha=None, bbox=None):
+        return self.ax.text(x, y, s, fontsize=fontsize, color=color, ha=ha, va=va, fontweight=fontweight,
+                            style=style, alpha=alpha, bbox=bbox)
+
+    def text_slot(self, name, x, y, fontsize, color, **text_kwargs):
+        self.slots[name] = self.text(x, y, '', fontsize, color, **text_kwargs)
+
+    def fill_slot(self, name, s):
+        self.slots[name].set_text(s)
+
+    def round_box(self, xy, width, height, pad, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        self.ax.add_patch(FancyBboxPatch(xy, width, height, boxstyle=f"round,pad={pad}", facecolor=facecolor,
+                                         edgecolor=edgecolor, linewidth=linewidth, alpha=alpha))
+
+    def vline(self, x, ymin, ymax, color, linewidth, alpha=None):
+        self.ax.axvline(x=x, ymin=ymin, ymax=ymax, color=color, linewidth=linewidth, alpha=alpha)
+
+    def icon(self, icon_name, x, y, size, color):
+        stamp_icon(self.ax, icon_name, x, y, size, color, self.dpi)
+
+    def finish(self):
+        if not self.static_ready:
+            self.fig.tight_layout()
+        return self.fig
+
+
+class SlideTemplate(MatplotlibSlideCanvas):
+    """A figure with one slide type's static layer already drawn and laid out, reset after each render"""
+
+    def __init__(self, slide_type, theme='professional', dpi=DEFAULT_DPI):
+        super().__init__(theme, dpi)
+        self.key = (slide_type, theme, dpi)
+        draw_static(self, slide_type, theme)
+        # With the axis off and the slide's text inside the static layer, the layout only depends on the figure
+        # size, so it and the static layer's tight bbox are computed once; render_bbox handles text that overflows
+        self.fig.tight_layout()
+        self.static_bbox = self.fig.get_tightbbox()
+        self.bbox_inches = self.static_bbox.padded(matplotlib.rcParams['savefig.pad_inches'])
+        self.subplot_params = self._subplot_params()
+        self.relaid = False
+        self.static_artists = set(self.ax.get_children())
+        self.static_ready = True
+
+    def _subplot_params(self):
+        return {name: getattr(self.fig.subplotpars, name) for name in ('left', 'bottom', 'right', 'top')}
+
+    def render_bbox(self):
+        """The savefig bbox for the slide drawn now.
+
+        That is the template's unless the slide's text reaches past the static layer; then the figure is laid
+        out again from the default subplot, exactly as an untemplated slide would be, and reset() restores it.
+        """
+        renderer = self.fig.canvas.get_renderer()
+        extents = [artist.get_tightbbox(renderer) for artist in self.ax.get_children()
+                   if artist not in self.static_artists or artist in self.slots.values()]
+        extents = [bbox for bbox in extents if bbox is not None and bbox.width and bbox.height]
+        if not extents:
+            return self.bbox_inches
+        drawn = Bbox.union(extents).transformed(self.fig.dpi_scale_trans.inverted())
+        static = self.static_bbox
+        if drawn.x0 >= static.x0 and drawn.y0 >= static.y0 and drawn.x1 <= static.x1 and drawn.y1 <= static.y1:
+            return self.bbox_inches
+        self.relaid = True
+        self.fig.subplots_adjust(**{name: matplotlib.rcParams[f'figure.subplot.{name}'] for name in self.subplot_params})
+        self.fig.tight_layout()
+        return self.fig.get_tightbbox().padded(matplotlib.rcParams['savefig.pad_inches'])
+
+    def reset(self):
+        for artist in self.ax.get_children():
+            if artist not in self.static_artists:
+                artist.remove()
+        for slot in self.slots.values():
+            slot.set_text('')
+        if self.relaid:
+            self.fig.subplots_adjust(**self.subplot_params)
+            self.relaid = False
+
+
+class SlideTemplatePool:
+    """Reusable SlideTemplates per (slide type, theme, dpi).
+
+    A template is checked out by one thread at a time and never shared, and each process (e.g. a render
+    worker) builds its own: figures inherited across a fork are dropped.
+    """
+
+    def __init__(self, per_key=None):
+        self.per_key = per_key if per_key is not None else int(os.environ.get('FIGURE_TEMPLATES_PER_KEY', 4))
+        self._reset_process()
+
+    def _reset_process(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._free = {}
+        self.hits = self.misses = self.evictions = 0
+
+    def acquire(self, slide_type, theme='professional', dpi=DEFAULT_DPI):
+        if self._pid != os.getpid():
+            self._reset_process()
+        with self._lock:
+            free = self._free.get((slide_type, theme, dpi))
+            if free:
+                self.hits += 1
+                return free.pop()
+            self.misses += 1
+        return SlideTemplate(slide_type, theme, dpi)
+
+    def release(self, template):
+        template.reset()
+        with self._lock:
+            free = self._free.setdefault(template.key, [])
+            if len(free) < self.per_key:
+                free.append(template)
+            else:
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': sum(len(free) for free in self._free.values()), 'bytes': 0, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+_slide_templates = SlideTemplatePool()
+metrics.register_cache('figure_templates', _slide_templates)
+
+# Encoded slide images keyed by content, so re-exporting an edited deck only renders the slides that changed.
+# Bump SLIDE_CACHE_VERSION whenever layouts or renderers change what a slide looks like.
+SLIDE_CACHE_VERSION = 2
+_slide_rasters = LRUCache(max_bytes=int(os.environ.get('SLIDE_CACHE_BYTES', 256 * 1024 * 1024)), sizeof=len)
+_slide_rasters_disk = (DiskCache(os.environ['SLIDE_CACHE_DIR'], int(os.environ.get('SLIDE_CACHE_DIR_BYTES', 2 * 1024 ** 3)))
+                       if os.environ.get('SLIDE_CACHE_DIR') else None)
+metrics.register_cache('slide_rasters', _slide_rasters)
+if _slide_rasters_disk is not None:
+    metrics.register_cache('slide_rasters_disk', _slide_rasters_disk)
+
+
+def create_title_slide(slide_data, theme='professional', dpi=DEFAULT_DPI):
+    return draw_slide(MatplotlibSlideCanvas(theme, dpi), 'title', slide_data, 1, theme)
+
+def create_definition_slide(slide_data, slide_num, theme='professional', dpi=DEFAULT_DPI):
+    return draw_slide(MatplotlibSlideCanvas(theme, dpi), 'definition', slide_data, slide_num, theme)
+
+def create_use_cases_slide(slide_data, slide_num, theme='professional', dpi=DEFAULT_DPI):
+    return draw_slide(MatplotlibSlideCanvas(theme, dpi), 'use_cases', slide_data, slide_num, theme)
+
+def create_examples_slide(slide_data, slide_num, theme='professional', dpi=DEFAULT_DPI):
+    return draw_slide(MatplotlibSlideCanvas(theme, dpi), 'examples', slide_data, slide_num, theme)
+
+def create_benefits_challenges_slide(slide_data, slide_num, theme='professional', dpi=DEFAULT_DPI):
+    return draw_slide(MatplotlibSlideCanvas(theme, dpi), 'benefits_challenges', slide_data, slide_num, theme)
+
+def create_detailed_content_slide(slide_data, slide_num, theme='professional', dpi=DEFAULT_DPI):
+    return draw_slide(MatplotlibSlideCanvas(theme, dpi), 'content', slide_data, slide_num, theme)
+
+def create_conclusion_slide(slide_data, slide_num, theme='professional', dpi=DEFAULT_DPI):
+    return draw_slide(MatplotlibSlideCanvas(theme, dpi), 'conclusion', slide_data, slide_num, theme)
+
+SLIDE_BUILDERS = {
+    'definition': create_definition_slide,
+    'use_cases': create_use_cases_slide,
+    'examples': create_examples_slide,
+    'benefits_challenges': create_benefits_challenges_slide,
+    'content': create_detailed_content_slide,
+    'conclusion': create_conclusion_slide
+}
+
+def create_slide_figure(slide_type, slide_data, slide_num, theme='professional', dpi=DEFAULT_DPI):
+    if slide_type == 'title':
+        return create_title_slide(slide_data, theme, dpi)
+    return SLIDE_BUILDERS[slide_type](slide_data, slide_num, theme, dpi)
+
+def iter_slide_figures(specs, dpi=DEFAULT_DPI):
+    for spec in specs:
+        with metrics.timed('slide_figure', slide_type=spec[0]):
+            fig = create_slide_figure(*spec, dpi=dpi)
+        yield fig
+
+def create_slide_images(presentation_data, theme=None, dpi=DEFAULT_DPI):
+    return list(iter_slide_figures(build_slide_specs(presentation_data, theme), dpi))
+
+def iter_slide_previews(specs, profile='preview', renderer=None, encoding=None):
+    """Yield (spec, image buffer) per slide of a spec list, in deck order.
+
+    Slides render in the calling thread, so the first preview does not queue behind full-resolution work in the
+    shared render pool.
+    """
+    return zip(specs, iter_rendered_slides(specs, 1, profile, renderer, encoding))
+
+class _RawSink(io.BytesIO):
+    """File object for savefig(format='rgba') that keeps the renderer's buffer instead of copying it"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+        return len(data)
+
+    def getbuffer(self):
+        if len(self.chunks) == 1:
+            return self.chunks[0]
+        return b''.join(self.chunks)
+
+
+def figure_to_image(slide, dpi=DEFAULT_DPI, bbox_inches='tight'):
+    """Rasterize a slide figure to an RGB PIL image, cropped the way savefig(bbox_inches=...) crops it"""
+    if bbox_inches == 'tight':
+        bbox_inches = slide.get_tightbbox().padded(matplotlib.rcParams['savefig.pad_inches'])
+    sink = _RawSink()
+    slide.savefig(sink, format='rgba', dpi=dpi, bbox_inches=bbox_inches, facecolor='white', edgecolor='none')
+    # savefig sizes its canvas to int(bbox size * dpi), so the raw buffer has exactly these dimensions
+    size = (int(bbox_inches.width * dpi), int(bbox_inches.height * dpi))
+    return Image.frombuffer('RGBA', size, sink.getbuffer(), 'raw', 'RGBA', 0, 1).convert('RGB')
+
+def save_slide_image(slide, buf, dpi=DEFAULT_DPI, encoding=None, bbox_inches='tight', theme=None):
+    """Encode a slide figure into buf; encoding is an IMAGE_ENCODINGS entry (optimized PNG by default)"""
+    encode_image(figure_to_image(slide, dpi, bbox_inches), buf, encoding or get_image_encoding('print'), dpi, theme)
+
+def iter_slide_images(slides, profile=None, theme=None):
+    """Encode (and close) slide figures one at a time, yielding each image buffer as soon as it is ready"""
+    profile = get_render_profile(profile)
+    encoding = get_image_encoding(profile)
     for slide in slides:
         buf = io.BytesIO()
-        slide.savefig(buf, format='png', dpi=600, bbox_inches='tight', 
-                     facecolor='white', edgecolor='none', 
-                     pil_kwargs={'optimize': True, 'quality': 95})
+        with metrics.timed('slide_encode', dpi=profile['dpi']):
+            save_slide_image(slide, buf, profile['dpi'], encoding, theme=theme)
         buf.seek(0)
-        image_buffers.append(buf)
-        plt.close(slide)
-    return image_buffers
+        yield buf
+
+def convert_slides_to_images(slides, profile=None, theme=None):
+    return list(iter_slide_images(slides, profile, theme))
+
+def render_slide_png(spec, profile=None, renderer=None):
+    """Build one slide figure from its spec and return the encoded image bytes"""
+    return _record_render(spec, profile, render_slide_task(spec, profile, renderer))
+
+def render_slide_task(spec, profile=None, renderer=None):
+    """Worker entry point: returns (image_bytes, figure_seconds, encode_seconds) so the parent can record timings"""
+    profile = get_render_profile(profile)
+    if (renderer or DEFAULT_RENDERER) == 'pillow':
+        return render_slide_task_pillow(spec, profile)
+    slide_type, slide_data, slide_num, theme = spec
+    started = time.perf_counter()
+    template = _slide_templates.acquire(slide_type, theme, profile['dpi'])
+    try:
+        fig = draw_slide(template, slide_type, slide_data, slide_num, theme)
+        built = time.perf_counter()
+        image = figure_to_image(fig, profile['dpi'], template.render_bbox())
+    finally:
+        _slide_templates.release(template)
+    buf = io.BytesIO()
+    encode_image(image, buf, get_image_encoding(profile), profile['dpi'], theme)
+    return buf.getvalue(), built - started, time.perf_counter() - built
+
+def render_slide_task_pillow(spec, profile):
+    slide_type, slide_data, slide_num, theme = spec
+    started = time.perf_counter()
+    image = draw_slide(PillowSlideCanvas(theme, profile['dpi']), slide_type, slide_data, slide_num, theme)
+    built = time.perf_counter()
+    buf = io.BytesIO()
+    encode_image(image, buf, get_image_encoding(profile), profile['dpi'], theme)
+    return buf.getvalue(), built - started, time.perf_counter() - built
+
+def slide_cache_key(spec, profile=None, renderer=None):
+    """Hash of everything that determines a slide's pixels: content, type, number, theme, profile and renderer"""
+    slide_type, slide_data, slide_num, theme = spec
+    payload = [SLIDE_CACHE_VERSION, slide_type, slide_data, slide_num, theme, get_render_profile(profile),
+               renderer or DEFAULT_RENDERER]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def get_cached_slide(key):
+    data = _slide_rasters.get(key)
+    if data is None and _slide_rasters_disk is not None:
+        data = _slide_rasters_disk.get(key)
+        if data is not None:
+            _slide_rasters.put(key, data)
+    return data
+
+def put_cached_slide(key, data):
+    _slide_rasters.put(key, data)
+    if _slide_rasters_disk is not None:
+        _slide_rasters_disk.put(key, data)
+    return data
+
+def slide_cache_stats():
+    stats = {'memory': _slide_rasters.stats()}
+    if _slide_rasters_disk is not None:
+        stats['disk'] = _slide_rasters_disk.stats()
+    return stats
+
+def _record_render(spec, profile, result):
+    data, figure_seconds, encode_seconds = result
+    dpi = get_render_profile(profile)['dpi']
+    metrics.observe_stage('slide_figure', figure_seconds, slide_type=spec[0])
+    metrics.observe_stage('slide_encode', encode_seconds, slide_type=spec[0], dpi=dpi)
+    return data
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+def get_render_pool():
+    """Return the shared RENDER_WORKERS-process slide pool, or None when process pools are unavailable (e.g. no /dev/shm)"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            try:
+                _render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+            except (OSError, NotImplementedError, PermissionError):
+                return None
+        return _render_pool
+
+def iter_rendered_slides(specs, workers=None, profile=None, renderer=None, encoding=None, cache=True):
+    """Submit specs to the render pool as they arrive and yield encoded image buffers in deck order.
+
+    Slides found in the raster cache are not rendered again; pass cache=False to bypass it.
+    """
+    profile = get_render_profile(profile, encoding)
+    workers = get_render_workers(workers)
+    pool = get_render_pool() if workers > 1 else None
+    # (spec, cache key, encoded bytes or a pending Future)
+    pending = deque()
+    for spec in specs:
+        # workers caps this deck's share of the shared pool: wait for the oldest slide before submitting more
+        while pool is not None and sum(not isinstance(entry[2], bytes) for entry in pending) >= workers:
+            yield io.BytesIO(_pending_result(*pending.popleft(), profile, renderer))
+        key = slide_cache_key(spec, profile, renderer) if cache else None
+        result = get_cached_slide(key) if cache else None
+        if result is None:
+            if pool is None:
+                result = render_slide_png(spec, profile, renderer)
+                if cache:
+                    put_cached_slide(key, result)
+            else:
+                result = pool.submit(render_slide_task, spec, profile, renderer)
+        pending.append((spec, key, result))
+        while pending and (isinstance(pending[0][2], bytes) or pending[0][2].done()):
+            yield io.BytesIO(_pending_result(*pending.popleft(), profile, renderer))
+    while pending:
+        yield io.BytesIO(_pending_result(*pending.popleft(), profile, renderer))
+
+def _pending_result(spec, key, result, profile, renderer=None):
+    if isinstance(result, bytes):
+        return result
+    data = _pool_result(spec, result, profile, renderer)
+    if key is not None:
+        put_cached_slide(key, data)
+    return data
+
+def _pool_result(spec, future, profile, renderer=None):
+    try:
+        return _record_render(spec, profile, future.result())
+    except BrokenProcessPool:
+        shutdown_render_pool()
+        return render_slide_png(spec, profile, renderer)
+
+def render_slides_parallel(presentation_data, theme=None, workers=None, profile=None, renderer=None, encoding=None):
+    """Render every slide in a worker process and return encoded image buffers in deck order"""
+    return list(iter_rendered_slides(build_slide_specs(presentation_data, theme), workers, profile, renderer, encoding))
+
+def shutdown_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False)
+            _render_pool = None
@@ -0,0 +1,242 @@
+import io
+import math
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_CONNECTOR, MSO_SHAPE
+from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
+from pptx.util import Emu, Inches, Pt
+from themes import COLOR_SCHEMES
+from slide_specs import build_slide_specs
+from slide_layouts import draw_slide
+import metrics
+
+# slide_layouts draws in the same 10x10 data space as ppt_generator (origin bottom-left); no matplotlib needed.
+SLIDE_WIDTH = Inches(13.333)
+SLIDE_HEIGHT = Inches(7.5)
+# Matplotlib slides are 16in wide; scale their point sizes to the 13.333in PPTX slide
+FONT_SCALE = 13.333 / 16
+
+def _x(x):
+    return Emu(int(x / 10 * SLIDE_WIDTH))
+
+def _y(y):
+    return Emu(int((10 - y) / 10 * SLIDE_HEIGHT))
+
+def _w(w):
+    return Emu(int(w / 10 * SLIDE_WIDTH))
+
+def _h(h):
+    return Emu(int(h / 10 * SLIDE_HEIGHT))
+
+def _rgb(color):
+    color = {'white': '#FFFFFF', 'black': '#000000'}.get(color, color)
+    return RGBColor.from_string(color.lstrip('#').upper())
+
+def blend(color, alpha, base='#FFFFFF'):
+    """Flatten a translucent color onto base, as matplotlib composites alpha onto the white slide"""
+    fg = _rgb(color)
+    bg = _rgb(base)
+    return '#' + ''.join('%02X' % round(f * alpha + b * (1 - alpha)) for f, b in zip(fg, bg))
+
+def add_shape(slide, shape_type, x0, y0, w, h, fill=None, line=None, line_width=None):
+    shape = slide.shapes.add_shape(shape_type, _x(x0), _y(y0 + h), _w(w), _h(h))
+    if fill:
+        shape.fill.solid()
+        shape.fill.fore_color.rgb = _rgb(fill)
+    else:
+        shape.fill.background()
+    if line:
+        shape.line.color.rgb = _rgb(line)
+        shape.line.width = Pt(line_width or 1)
+    else:
+        shape.line.fill.background()
+    shape.shadow.inherit = False
+    return shape
+
+def add_box(slide, x0, y0, w, h, fill=None, line=None, line_width=None):
+    shape = add_shape(slide, MSO_SHAPE.ROUNDED_RECTANGLE, x0, y0, w, h, fill, line, line_width)
+    shape.adjustments[0] = 0.1
+    return shape
+
+def add_circle(slide, x, y, r, fill=None, line=None, line_width=None):
+    return add_shape(slide, MSO_SHAPE.OVAL, x - r, y - r, 2 * r, 2 * r, fill, line, line_width)
+
+def add_line(slide, x0, y0, x1, y1, color, width):
+    line = slide.shapes.add_connector(MSO_CONNECTOR.STRAIGHT, _x(x0), _y(y0), _x(x1), _y(y1))
+    line.line.color.rgb = _rgb(color)
+    line.line.width = Pt(width)
+    return line
+
+# Average glyph advance and line pitch as fractions of the point size, to size text boxes without a font engine
+CHAR_WIDTH = 0.55
+LINE_SPACING = 1.2
+
+def _text_size(s, fontsize):
+    """Approximate (width, height) of a text block in slide data units"""
+    lines = s.split('\n')
+    width = Pt(max(len(line) for line in lines) * fontsize * FONT_SCALE * CHAR_WIDTH)
+    height = Pt(len(lines) * fontsize * FONT_SCALE * LINE_SPACING)
+    return width / SLIDE_WIDTH * 10, height / SLIDE_HEIGHT * 10
+
+def add_text(slide, x, y, text, fontsize, color, bold=False, italic=False, ha='center', va='center', width=None,
+             height=None, fill=None, line=None, line_width=None, pad=0):
+    """Place text anchored like matplotlib's ax.text(x, y, ha=..., va=...), boxed when fill or line is given"""
+    text_w, text_h = _text_size(text, fontsize)
+    width = width or text_w
+    height = height or text_h
+    x0 = x - width / 2 if ha == 'center' else x
+    y0 = {'top': y - height, 'bottom': y}.get(va, y - height / 2)
+    if fill or line:
+        # pad is in font sizes, like matplotlib's boxstyle pad; the frame margins keep the text where it was
+        pad_x = Pt(pad * fontsize * FONT_SCALE) / SLIDE_WIDTH * 10
+        pad_y = Pt(pad * fontsize * FONT_SCALE) / SLIDE_HEIGHT * 10
+        shape = add_box(slide, x0 - pad_x, y0 - pad_y, width + 2 * pad_x, height + 2 * pad_y, fill, line, line_width)
+        frame = shape.text_frame
+        frame.margin_left = frame.margin_right = _w(pad_x)
+        frame.margin_top = frame.margin_bottom = _h(pad_y)
+    else:
+        shape = slide.shapes.add_textbox(_x(x0), _y(y0 + height), _w(width), _h(height))
+        frame = shape.text_frame
+        frame.margin_left = frame.margin_right = frame.margin_top = frame.margin_bottom = 0
+    # Layouts wrap their own text, so PowerPoint must not rewrap it against the estimated width
+    frame.word_wrap = False
+    frame.vertical_anchor = MSO_ANCHOR.MIDDLE
+    for i, line_text in enumerate(text.split('\n')):
+        paragraph = frame.paragraphs[0] if i == 0 else frame.add_paragraph()
+        paragraph.alignment = PP_ALIGN.CENTER if ha == 'center' else PP_ALIGN.LEFT
+        run = paragraph.add_run()
+        run.text = line_text
+        run.font.size = Pt(fontsize * FONT_SCALE)
+        run.font.bold = bold
+        run.font.italic = italic
+        run.font.color.rgb = _rgb(color)
+    return shape
+
+def add_background(slide, theme, gradient_colors, direction, banner_y=None):
+    fill = slide.background.fill
+    fill.gradient()
+    fill.gradient_angle = {'vertical': 90, 'horizontal': 0}.get(direction, 45)
+    stops = fill.gradient_stops
+    stops[0].color.rgb = _rgb(blend(gradient_colors[0], 0.3))
+    stops[0].position = 0
+    stops[1].color.rgb = _rgb(blend(gradient_colors[1], 0.3))
+    stops[1].position = 1
+    colors = COLOR_SCHEMES[theme]
+    add_circle(slide, 0.5, 9.5, 0.3, fill=blend(colors['accent'], 0.3))
+    add_circle(slide, 9.5, 0.5, 0.25, fill=blend(colors['secondary'], 0.3))
+    add_shape(slide, MSO_SHAPE.RECTANGLE, 0, 4, 0.1, 2, fill=blend(colors['primary'], 0.8))
+    if banner_y is not None:
+        add_box(slide, 0.5, banner_y - 0.4, 9, 0.8, fill=colors['primary'], line=colors['accent'], line_width=2)
+
+def add_icon(slide, icon_name, x, y, size, color):
+    if icon_name == 'computer':
+        add_shape(slide, MSO_SHAPE.RECTANGLE, x - size / 2, y - size / 4, size, size / 2, color, 'white', 2)
+        add_shape(slide, MSO_SHAPE.RECTANGLE, x - size / 2 + 0.1, y - size / 4 + 0.1, size - 0.2, size / 2 - 0.3, 'white', color, 1)
+        add_shape(slide, MSO_SHAPE.RECTANGLE, x - 0.1, y - size / 2, 0.2, size / 4, color, 'white', 1)
+        add_shape(slide, MSO_SHAPE.RECTANGLE, x - size / 3, y - size / 2, size * 2 / 3, 0.1, color, 'white', 1)
+    elif icon_name == 'brain':
+        add_circle(slide, x, y, size / 2, blend(color, 0.8), 'white', 2)
+        for i in range(3):
+            add_circle(slide, x + (i - 1) * 0.15, y + 0.1, 0.08, 'white', color, 1)
+    elif icon_name == 'rocket':
+        add_box(slide, x - size / 6, y - size / 2, size / 3, size, color, 'white', 2)
+        add_shape(slide, MSO_SHAPE.ISOSCELES_TRIANGLE, x - size / 6, y + size / 2, size / 3, size / 3, color, 'white', 2)
+        flame = add_shape(slide, MSO_SHAPE.ISOSCELES_TRIANGLE, x - size / 8, y - size * 3 / 4, size / 4, size / 4, blend('#FFA500', 0.8))
+        flame.rotation = 180
+    elif icon_name == 'chart':
+        add_shape(slide, MSO_SHAPE.RECTANGLE, x - size / 2, y - size / 2, size, size, 'white', color, 2)
+        bar_width = size / 6
+        for i, height in enumerate([0.2, 0.5, 0.3, 0.7]):
+            bar_x = x - size / 2 + 0.1 + i * bar_width * 1.2
+            add_shape(slide, MSO_SHAPE.RECTANGLE, bar_x, y - size / 2 + 0.1, bar_width, height * size * 0.6, blend(color, 0.8))
+    elif icon_name == 'gear':
+        add_circle(slide, x, y, size / 3, color, 'white', 2)
+        for i in range(8):
+            angle = 2 * math.pi * i / 8
+            add_circle(slide, x + (size / 3 + 0.1) * math.cos(angle), y + (size / 3 + 0.1) * math.sin(angle), 0.05, color, 'white', 1)
+        add_circle(slide, x, y, size / 8, 'white', color, 2)
+    elif icon_name == 'lightbulb':
+        add_circle(slide, x, y + size / 6, size / 3, blend(color, 0.9), 'white', 2)
+        add_shape(slide, MSO_SHAPE.RECTANGLE, x - size / 6, y - size / 3, size / 3, size / 4, '#E17055', 'white', 2)
+        for angle in [45, 90, 135, 225, 270, 315]:
+            rad = math.radians(angle)
+            start_x = x + (size / 3 + 0.05) * math.cos(rad)
+            start_y = y + size / 6 + (size / 3 + 0.05) * math.sin(rad)
+            add_line(slide, start_x, start_y, start_x + size / 4 * math.cos(rad), start_y + size / 4 * math.sin(rad), blend(color, 0.7), 3)
+
+class PptxSlideCanvas:
+    """Renderer canvas drawing slide layouts as native, editable PPTX shapes and text"""
+
+    def __init__(self, slide, theme='professional'):
+        self.slide = slide
+        self.theme = theme
+        self.static_ready = False
+        self._lines = []
+        self._texts = []
+        self._slots = {}
+
+    def background(self, gradient_colors, direction, banner_y=None):
+        add_background(self.slide, self.theme, gradient_colors, direction, banner_y)
+
+    def text(self, x, y, s, fontsize, color, ha='center', va='center', fontweight='normal', style='normal',
+             alpha=None, bbox=None):
+        self._texts.append([x, y, s, fontsize, color, ha, va, fontweight, style, alpha, bbox])
+
+    def text_slot(self, name, x, y, fontsize, color, **text_kwargs):
+        self.text(x, y, '', fontsize, color, **text_kwargs)
+        self._slots[name] = self._texts[-1]
+
+    def fill_slot(self, name, s):
+        self._slots[name][2] = s
+
+    def round_box(self, xy, width, height, pad, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        fill = blend(facecolor, alpha) if alpha is not None else facecolor
+        add_box(self.slide, xy[0] - pad, xy[1] - pad, width + 2 * pad, height + 2 * pad, fill, edgecolor, linewidth)
+
+    def vline(self, x, ymin, ymax, color, linewidth, alpha=None):
+        self._lines.append((x, ymin * 10, ymax * 10, blend(color, alpha) if alpha is not None else color, linewidth))
+
+    def icon(self, icon_name, x, y, size, color):
+        add_icon(self.slide, icon_name, x, y, size, color)
+
+    def _draw_text(self, x, y, s, fontsize, color, ha, va, fontweight, style, alpha, bbox):
+        fill = line = None
+        pad = 0
+        if bbox:
+            # Like matplotlib's text bbox, the patch gets a black 1pt edge unless told otherwise
+            pad = float(bbox.get('boxstyle', 'round,pad=0.3').split('pad=')[-1])
+            fill = bbox.get('facecolor')
+            line = bbox.get('edgecolor', 'black')
+            fill = None if fill == 'none' else blend(fill, bbox['alpha']) if fill and 'alpha' in bbox else fill
+            line = None if line == 'none' else line
+        add_text(self.slide, x, y, s, fontsize, blend(color, alpha) if alpha is not None else color,
+                 bold=fontweight == 'bold', italic=style == 'italic', ha=ha, va=va, fill=fill, line=line,
+                 line_width=bbox.get('linewidth', 1) if bbox else None, pad=pad)
+
+    def finish(self):
+        # Shapes stack in insertion order, so lines and text go on top of the boxes and icons, as in matplotlib
+        for x, y0, y1, color, linewidth in self._lines:
+            add_line(self.slide, x, y0, x, y1, color, linewidth)
+        for text in self._texts:
+            if text[2]:
+                self._draw_text(*text)
+        return self.slide
+
+def build_native_pptx(presentation_data, theme=None):
+    """Build an editable PPTX from the structure with native shapes and text, no rasterization"""
+    return build_native_pptx_from_specs(build_slide_specs(presentation_data, theme))
+
+def build_native_pptx_from_specs(specs):
+    prs = Presentation()
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
+    blank_slide_layout = prs.slide_layouts[6]
+    for slide_type, slide_data, slide_num, slide_theme in specs:
+        with metrics.timed('slide_figure', slide_type=slide_type, mode='native'):
+            slide = prs.slides.add_slide(blank_slide_layout)
+            draw_slide(PptxSlideCanvas(slide, slide_theme), slide_type, slide_data, slide_num, slide_theme)
+    buf = io.BytesIO()
+    with metrics.timed('merge', format='ppt', mode='vector'):
+        prs.save(buf)
+    buf.seek(0)
+    return buf
@@ -0,0 +1,316 @@
+"""Slide layouts written against a renderer canvas, so every backend draws the same slides.
+
+A canvas works in the 10x10 slide data space (origin bottom-left) and provides:
+
+    static_ready                                          # True when the static layer is already drawn (templates)
+    background(gradient_colors, direction, banner_y=None)
+    text(x, y, s, fontsize, color, ha='center', va='center', fontweight='normal', style='normal', alpha=None, bbox=None)
+    text_slot(name, x, y, fontsize, color, **text_kwargs)  # an empty named text, filled in per slide
+    fill_slot(name, s)
+    round_box(xy, width, height, pad, facecolor, edgecolor=None, linewidth=1, alpha=None)
+    vline(x, ymin, ymax, color, linewidth, alpha=None)    # ymin/ymax as axes fractions, like ax.axvline
+    icon(icon_name, x, y, size, color)
+    finish()
+
+`bbox` takes the same dict as matplotlib's ax.text (boxstyle "round,pad=...").
+
+Each slide type has a static layer (background, banner, fixed headings and the title/slide number slots) that
+does not depend on the slide data, so a templated canvas can draw it once and reuse it for many slides.
+"""
+import textwrap
+from themes import COLOR_SCHEMES
+from slide_specs import ICON_NAMES
+from fonts import text_width
+
+# slide type -> (gradient color keys, gradient direction, title banner y or None)
+SLIDE_BACKGROUNDS = {
+    'title': (('bg', 'light'), 'diagonal', None),
+    'definition': (('bg', 'light'), 'horizontal', 8.5),
+    'use_cases': (('bg', 'light'), 'vertical', 8.5),
+    'examples': (('light', 'bg'), 'diagonal', 8.5),
+    'benefits_challenges': (('bg', 'light'), 'horizontal', 8.5),
+    'content': (('bg', 'light'), 'horizontal', 8.5),
+    'conclusion': (('light', 'bg'), 'vertical', None)
+}
+SLIDE_NUMBER_Y = {'title': 1, 'conclusion': 0.3}
+# Points per x data unit: tight_layout leaves the 10 units at 15.7in of the 16in slide
+DATA_UNIT_POINTS = 15.7 / 10 * 72
+# Widths (in data units) titles and bullets are wrapped to. Besides the slide frame they keep text inside the
+# default subplot tight_layout starts from, so untemplated figures get the same frame as templated ones.
+BANNER_TITLE_WIDTH = 7.8
+BANNER_TITLE_LINES = 3
+
+def fit_text(s, fontsize, max_width, fontweight='normal', style='normal', max_lines=None):
+    """Re-wrap the lines of s wider than max_width data units, measured in the slide font.
+
+    Breaks at spaces, and inside words that are wider than the line on their own. Past max_lines the text
+    is cut with an ellipsis. Keeps LLM text inside the frame on every backend rather than overflowing it
+    (matplotlib) or being clipped (Pillow).
+    """
+    limit = max_width * DATA_UNIT_POINTS
+
+    def fits(line):
+        return text_width(line, fontsize, fontweight, style) <= limit
+
+    lines = []
+    for line in s.split('\n'):
+        current = ''
+        for word in line.split(' '):
+            candidate = f'{current} {word}' if current else word
+            if fits(candidate):
+                current = candidate
+                continue
+            if current:
+                lines.append(current)
+            current = ''
+            for ch in word:
+                if current and not fits(current + ch):
+                    lines.append(current)
+                    current = ''
+                current += ch
+        lines.append(current)
+    if max_lines and len(lines) > max_lines:
+        last = lines[max_lines - 1]
+        while last and not fits(last + '…'):
+            last = last[:-1]
+        lines = lines[:max_lines - 1] + [last.rstrip() + '…']
+    return '\n'.join(lines)
+
+def fit_banner_title(title):
+    return fit_text(title, 24, BANNER_TITLE_WIDTH, 'bold', max_lines=BANNER_TITLE_LINES)
+
+def static_benefits_challenges(canvas, colors):
+    canvas.text(2.5, 7.5, '✅ Benefits', fontsize=20, fontweight='bold',
+                color='#27AE60', ha='center', va='center')
+    canvas.text(7.5, 7.5, '⚠️ Challenges', fontsize=20, fontweight='bold',
+                color='#E74C3C', ha='center', va='center')
+    canvas.vline(5, 0.2, 0.8, color=colors['primary'], linewidth=3, alpha=0.7)
+
+def static_conclusion(canvas, colors):
+    canvas.text(5, 8, 'Conclusion', fontsize=28, fontweight='bold',
+                color='white', ha='center', va='center',
+                bbox=dict(boxstyle="round,pad=0.4", facecolor=colors['primary'],
+                          edgecolor=colors['accent'], linewidth=2, alpha=0.9))
+    canvas.icon('lightbulb', 5, 1.8, 1, colors['accent'])
+    canvas.text(5, 1, 'Thank You!', fontsize=20, fontweight='bold',
+                color=colors['primary'], ha='center', va='center')
+
+STATIC_LAYOUTS = {
+    'benefits_challenges': static_benefits_challenges,
+    'conclusion': static_conclusion
+}
+
+def draw_static(canvas, slide_type, theme='professional'):
+    """Draw what depends only on the slide type and theme, leaving 'title' and 'slide_number' slots to fill"""
+    colors = COLOR_SCHEMES[theme]
+    color_keys, direction, banner_y = SLIDE_BACKGROUNDS[slide_type]
+    canvas.background([colors[key] for key in color_keys], direction, banner_y=banner_y)
+    if banner_y is not None:
+        canvas.text_slot('title', 5, banner_y, fontsize=24, fontweight='bold', color='white', ha='center', va='center',
+                         bbox=dict(boxstyle="round,pad=0.3", facecolor='none', edgecolor='none'))
+    if slide_type in STATIC_LAYOUTS:
+        STATIC_LAYOUTS[slide_type](canvas, colors)
+    canvas.text_slot('slide_number', 5, SLIDE_NUMBER_Y.get(slide_type, 0.5), fontsize=12, color=colors['text'],
+                     ha='center', va='center', alpha=0.7)
+
+def layout_title_slide(canvas, slide_data, slide_num, theme='professional'):
+    colors = COLOR_SCHEMES[theme]
+    title = fit_text(slide_data.get('title', 'Presentation Title'), 32, 7.6, 'bold', max_lines=3)
+    canvas.text(5, 7, title, fontsize=32, fontweight='bold',
+                color=colors['primary'], ha='center', va='center',
+                bbox=dict(boxstyle="round,pad=0.5", facecolor=colors['light'],
+                          edgecolor=colors['accent'], linewidth=3))
+    subtitle = slide_data.get('subtitle', '')
+    if subtitle:
+        canvas.text(5, 5.5, fit_text(subtitle, 20, 7.8, style='italic', max_lines=2), fontsize=20,
+                    color=colors['text'], ha='center', va='center', style='italic')
+    icon_name = slide_data.get('icon', 'lightbulb')
+    if icon_name in ICON_NAMES:
+        canvas.icon(icon_name, 5, 3.5, 1.5, colors['accent'])
+    canvas.fill_slot('slide_number', 'Slide 1')
+
+def layout_definition_slide(canvas, slide_data, slide_num, theme='professional'):
+    colors = COLOR_SCHEMES[theme]
+    title = slide_data.get('title', f'Definition - Slide {slide_num}')
+    canvas.fill_slot('title', fit_banner_title(title))
+    definition = slide_data.get('definition', '')
+    if definition:
+        wrapped_def = textwrap.fill(definition, width=70)
+        canvas.round_box((0.5, 5.5), 9, 1.5, pad=0.3,
+                         facecolor=colors['light'],
+                         edgecolor=colors['primary'],
+                         linewidth=2, alpha=0.9)
+        canvas.text(5, 6.25, wrapped_def, fontsize=16,
+                    color=colors['text'], ha='center', va='center')
+    characteristics = slide_data.get('characteristics', [])
+    if characteristics:
+        canvas.text(5, 4.8, 'Key Characteristics:', fontsize=18, fontweight='bold',
+                    color=colors['primary'], ha='center', va='center')
+        for i, char in enumerate(characteristics[:4]):
+            y_pos = 4.2 - (i * 0.4)
+            canvas.round_box((1, y_pos-0.1), 0.2, 0.2, pad=0.02,
+                             facecolor=colors['accent'],
+                             edgecolor='white', linewidth=1)
+            canvas.text(1.1, y_pos, '✓', fontsize=12, color='white',
+                        ha='center', va='center', fontweight='bold')
+            wrapped_char = fit_text(textwrap.fill(char, width=55), 14, 6.6)
+            canvas.text(1.5, y_pos, wrapped_char, fontsize=14,
+                        color=colors['text'], ha='left', va='center')
+    icon_name = slide_data.get('icon', 'brain')
+    if icon_name in ICON_NAMES:
+        canvas.icon(icon_name, 8.5, 3.5, 1, colors['secondary'])
+    canvas.fill_slot('slide_number', f'Slide {slide_num}')
+
+def layout_use_cases_slide(canvas, slide_data, slide_num, theme='professional'):
+    colors = COLOR_SCHEMES[theme]
+    title = slide_data.get('title', f'Use Cases - Slide {slide_num}')
+    canvas.fill_slot('title', fit_banner_title(title))
+    use_cases = slide_data.get('use_cases', [])
+    y_start = 7.2
+    for i, use_case in enumerate(use_cases[:4]):
+        y_pos = y_start - (i * 1.2)
+        canvas.round_box((0.8, y_pos-0.15), 0.3, 0.3, pad=0.05,
+                         facecolor=colors['primary'],
+                         edgecolor='white', linewidth=2)
+        canvas.text(0.95, y_pos, str(i+1), fontsize=16, color='white',
+                    ha='center', va='center', fontweight='bold')
+        case_title = fit_text(use_case.get('title', f'Use Case {i+1}'), 16, 6.6, 'bold', max_lines=1)
+        case_desc = use_case.get('description', '')
+        canvas.text(1.5, y_pos+0.15, case_title, fontsize=16, fontweight='bold',
+                    color=colors['primary'], ha='left', va='center')
+        if case_desc:
+            wrapped_desc = textwrap.fill(case_desc, width=50)
+            canvas.text(1.5, y_pos-0.15, wrapped_desc, fontsize=13,
+                        color=colors['text'], ha='left', va='center')
+    icon_name = slide_data.get('icon', 'gear')
+    if icon_name in ICON_NAMES and len(use_cases) <= 3:
+        canvas.icon(icon_name, 8.5, 4, 1.2, colors['secondary'])
+    canvas.fill_slot('slide_number', f'Slide {slide_num}')
+
+def layout_examples_slide(canvas, slide_data, slide_num, theme='professional'):
+    colors = COLOR_SCHEMES[theme]
+    title = slide_data.get('title', f'Examples - Slide {slide_num}')
+    canvas.fill_slot('title', fit_banner_title(title))
+    examples = slide_data.get('examples', [])
+    if len(examples) <= 2:
+        for i, example in enumerate(examples):
+            y_base = 6.5 - (i * 2.5)
+            canvas.round_box((0.5, y_base-0.8), 9, 1.6, pad=0.2,
+                             facecolor='white',
+                             edgecolor=colors['primary'],
+                             linewidth=2, alpha=0.9)
+            ex_title = fit_text(example.get('title', f'Example {i+1}'), 18, 7.8, 'bold', max_lines=1)
+            canvas.text(5, y_base+0.3, ex_title, fontsize=18, fontweight='bold',
+                        color=colors['primary'], ha='center', va='center')
+            ex_desc = example.get('description', '')
+            if ex_desc:
+                wrapped_desc = textwrap.fill(ex_desc, width=80)
+                canvas.text(5, y_base-0.2, wrapped_desc, fontsize=14,
+                            color=colors['text'], ha='center', va='center')
+    else:
+        for i, example in enumerate(examples[:4]):
+            col = i % 2
+            row = i // 2
+            x_pos = 2.5 + (col * 5)
+            y_pos = 6 - (row * 2.5)
+            canvas.round_box((x_pos-2, y_pos-0.8), 4, 1.6, pad=0.15,
+                             facecolor='white',
+                             edgecolor=colors['accent'],
+                             linewidth=2, alpha=0.9)
+            ex_title = fit_text(example.get('title', f'Example {i+1}'), 14, 3.8, 'bold', max_lines=1)
+            canvas.text(x_pos, y_pos+0.2, ex_title, fontsize=14, fontweight='bold',
+                        color=colors['primary'], ha='center', va='center')
+            ex_desc = example.get('description', '')[:80] + '...' if len(example.get('description', '')) > 80 else example.get('description', '')
+            if ex_desc:
+                wrapped_desc = textwrap.fill(ex_desc, width=30)
+                canvas.text(x_pos, y_pos-0.3, wrapped_desc, fontsize=11,
+                            color=colors['text'], ha='center', va='center')
+    canvas.fill_slot('slide_number', f'Slide {slide_num}')
+
+def layout_benefits_challenges_slide(canvas, slide_data, slide_num, theme='professional'):
+    colors = COLOR_SCHEMES[theme]
+    title = slide_data.get('title', f'Benefits & Challenges - Slide {slide_num}')
+    canvas.fill_slot('title', fit_banner_title(title))
+    benefits = slide_data.get('benefits', [])
+    for i, benefit in enumerate(benefits[:4]):
+        y_pos = 6.8 - (i * 0.6)
+        canvas.text(0.5, y_pos, '•', fontsize=16, color='#27AE60',
+                    ha='center', va='center', fontweight='bold')
+        wrapped_benefit = fit_text(textwrap.fill(benefit, width=35), 13, 3.9)
+        canvas.text(0.8, y_pos, wrapped_benefit, fontsize=13,
+                    color=colors['text'], ha='left', va='center')
+    challenges = slide_data.get('challenges', [])
+    for i, challenge in enumerate(challenges[:4]):
+        y_pos = 6.8 - (i * 0.6)
+        canvas.text(5.5, y_pos, '•', fontsize=16, color='#E74C3C',
+                    ha='center', va='center', fontweight='bold')
+        wrapped_challenge = fit_text(textwrap.fill(challenge, width=35), 13, 3.3)
+        canvas.text(5.8, y_pos, wrapped_challenge, fontsize=13,
+                    color=colors['text'], ha='left', va='center')
+    canvas.fill_slot('slide_number', f'Slide {slide_num}')
+
+def layout_content_slide(canvas, slide_data, slide_num, theme='professional'):
+    colors = COLOR_SCHEMES[theme]
+    title = slide_data.get('title', f'Slide {slide_num}')
+    canvas.fill_slot('title', fit_banner_title(title))
+    description = slide_data.get('description', '')
+    if description:
+        wrapped_desc = textwrap.fill(description, width=80)
+        canvas.text(5, 7, wrapped_desc, fontsize=15,
+                    color=colors['text'], ha='center', va='center',
+                    bbox=dict(boxstyle="round,pad=0.3", facecolor='white',
+                              edgecolor=colors['light'], linewidth=1, alpha=0.9))
+    points = slide_data.get('points', [])
+    y_start = 5.8
+    for i, point in enumerate(points[:5]):
+        y_pos = y_start - (i * 0.7)
+        canvas.round_box((0.8, y_pos-0.12), 0.25, 0.25, pad=0.03,
+                         facecolor=colors['accent'],
+                         edgecolor='white', linewidth=2)
+        canvas.text(0.925, y_pos, '●', fontsize=14, color='white',
+                    ha='center', va='center', fontweight='bold')
+        wrapped_text = fit_text(textwrap.fill(point, width=55), 14, 6.8)
+        canvas.text(1.3, y_pos, wrapped_text, fontsize=14,
+                    color=colors['text'], ha='left', va='center',
+                    bbox=dict(boxstyle="round,pad=0.2", facecolor='white',
+                              edgecolor=colors['light'], linewidth=1, alpha=0.8))
+    icon_name = slide_data.get('icon', 'chart')
+    if icon_name in ICON_NAMES and len(points) <= 3:
+        canvas.icon(icon_name, 8.5, 3.5, 1.2, colors['secondary'])
+    canvas.fill_slot('slide_number', f'Slide {slide_num}')
+
+def layout_conclusion_slide(canvas, slide_data, slide_num, theme='professional'):
+    colors = COLOR_SCHEMES[theme]
+    conclusion = slide_data.get('conclusion', 'Thank you for your attention!')
+    wrapped_conclusion = textwrap.fill(conclusion, width=60)
+    canvas.text(5, 6.2, wrapped_conclusion, fontsize=18,
+                color=colors['text'], ha='center', va='center',
+                bbox=dict(boxstyle="round,pad=0.5", facecolor='white',
+                          edgecolor=colors['primary'], linewidth=2, alpha=0.9))
+    takeaways = slide_data.get('takeaways', [])
+    if takeaways:
+        canvas.text(5, 4.8, '🎯 Key Takeaways:', fontsize=18, fontweight='bold',
+                    color=colors['primary'], ha='center', va='center')
+        for i, takeaway in enumerate(takeaways[:4]):
+            y_pos = 4.2 - (i * 0.4)
+            canvas.text(5, y_pos, fit_text(f'• {takeaway}', 15, 7.8, max_lines=1), fontsize=15,
+                        color=colors['text'], ha='center', va='center',
+                        bbox=dict(boxstyle="round,pad=0.1", facecolor=colors['light'],
+                                  alpha=0.7))
+    canvas.fill_slot('slide_number', f'Slide {slide_num}')
+
+SLIDE_LAYOUTS = {
+    'title': layout_title_slide,
+    'definition': layout_definition_slide,
+    'use_cases': layout_use_cases_slide,
+    'examples': layout_examples_slide,
+    'benefits_challenges': layout_benefits_challenges_slide,
+    'content': layout_content_slide,
+    'conclusion': layout_conclusion_slide
+}
+
+def draw_slide(canvas, slide_type, slide_data, slide_num, theme='professional'):
+    if not canvas.static_ready:
+        draw_static(canvas, slide_type, theme)
+    SLIDE_LAYOUTS[slide_type](canvas, slide_data, slide_num, theme)
+    return canvas.finish()
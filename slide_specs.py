@@ -0,0 +1,210 @@
+"""Slide specs and render options, kept free of matplotlib so non-raster paths import quickly"""
+import os
+
+SLIDE_TYPES = ('definition', 'use_cases', 'examples', 'benefits_challenges', 'content', 'conclusion')
+ICON_NAMES = ('computer', 'brain', 'rocket', 'chart', 'gear', 'lightbulb')
+# Fields each layout reads: 'text' is a string, 'texts' a list of strings, 'items' a list of
+# {"title", "description"} objects; every slide may also carry a text 'title' and 'icon'
+SLIDE_FIELDS = {
+    'definition': {'definition': 'text', 'characteristics': 'texts'},
+    'use_cases': {'use_cases': 'items'},
+    'examples': {'examples': 'items'},
+    'benefits_challenges': {'benefits': 'texts', 'challenges': 'texts'},
+    'content': {'description': 'text', 'points': 'texts'},
+    'conclusion': {'conclusion': 'text', 'takeaways': 'texts'}
+}
+
+# Encoder settings for raster slides (see image_encoding.encode_image)
+IMAGE_ENCODINGS = {
+    'fast': {'format': 'png', 'compress_level': 1},
+    'png': {'format': 'png', 'compress_level': 6},
+    'optimized': {'format': 'png', 'optimize': True},
+    'palette': {'format': 'png', 'palette': True, 'optimize': True},
+    'jpeg': {'format': 'jpeg', 'quality': 90, 'optimize': True},
+    'webp': {'format': 'webp', 'quality': 90}
+}
+# Interactive profiles favour encode speed; 'archive' favours file size
+RENDER_PROFILES = {
+    'preview': {'dpi': 72, 'encoding': 'fast'},
+    'screen': {'dpi': 150, 'encoding': 'fast'},
+    'print': {'dpi': 600, 'encoding': 'optimized'},
+    'archive': {'dpi': 300, 'encoding': 'palette'}
+}
+DEFAULT_PROFILE = 'print'
+# Profiles cheap enough to inline as base64 in a /preview/ response
+PREVIEW_PROFILES = ('preview', 'screen')
+# Raster backends for slide_layouts: the matplotlib figure pipeline or direct Pillow drawing
+RENDERERS = ('matplotlib', 'pillow')
+DEFAULT_RENDERER = os.environ.get('SLIDE_RENDERER', 'matplotlib')
+# Size of the shared slide render pool; it is never resized per request
+RENDER_WORKERS = max(1, int(os.environ.get('RENDER_WORKERS', 0)) or os.cpu_count() or 1)
+
+# A complete deck in the structure format the LLM returns, for cache warmup and the benchmarks
+SAMPLE_DECK = {
+    "title": "Introduction to Machine Learning",
+    "subtitle": "How computers learn from data",
+    "topic": "machine learning technology",
+    "slides": [
+        {
+            "title": "Definition of Machine Learning",
+            "definition": "Machine learning is a field of artificial intelligence in which systems improve at a task by learning patterns from data instead of following explicit rules.",
+            "characteristics": ["Learns from examples", "Improves with more data", "Generalizes to unseen inputs", "Relies on statistics"],
+            "type": "definition"
+        },
+        {
+            "title": "Key Use Cases",
+            "use_cases": [
+                {"title": "Recommendation", "description": "Suggesting products, films and music based on past behaviour."},
+                {"title": "Fraud Detection", "description": "Flagging unusual transactions in real time."},
+                {"title": "Forecasting", "description": "Predicting demand, prices and capacity needs."}
+            ],
+            "type": "use_cases"
+        },
+        {
+            "title": "Real-World Examples",
+            "examples": [
+                {"title": "Spam Filters", "description": "Email providers classify billions of messages a day using learned models."},
+                {"title": "Voice Assistants", "description": "Speech recognition converts audio to text with deep neural networks."},
+                {"title": "Medical Imaging", "description": "Models highlight suspicious regions in scans for radiologists to review."}
+            ],
+            "type": "examples"
+        },
+        {
+            "title": "Benefits & Challenges",
+            "benefits": ["Automates repetitive decisions", "Finds patterns humans miss", "Scales to huge datasets"],
+            "challenges": ["Needs quality training data", "Can encode bias", "Hard to interpret"],
+            "type": "benefits_challenges"
+        },
+        {
+            "title": "How Models Are Trained",
+            "description": "Training adjusts model parameters to minimise the error between predictions and known answers on a training set.",
+            "points": ["Collect and label data", "Choose a model family", "Optimise a loss function", "Validate on held-out data"],
+            "type": "content"
+        },
+        {
+            "title": "Conclusion",
+            "conclusion": "Machine learning turns data into decisions and is now part of everyday software.",
+            "takeaways": ["Data quality matters most", "Start with simple models", "Monitor models in production"],
+            "type": "conclusion"
+        }
+    ]
+}
+
+def get_render_workers(workers=None):
+    """Slides one deck may render at once: the requested count, capped at the shared pool's size"""
+    if workers:
+        return max(1, min(int(workers), RENDER_WORKERS))
+    return RENDER_WORKERS
+
+def get_render_profile(profile=None, encoding=None):
+    """Resolve a profile name or dict; encoding (a name or dict) overrides the profile's own"""
+    if not isinstance(profile, dict):
+        profile = RENDER_PROFILES[profile or DEFAULT_PROFILE]
+    if encoding is not None:
+        profile = dict(profile, encoding=encoding)
+    return profile
+
+def get_image_encoding(profile=None):
+    encoding = get_render_profile(profile).get('encoding', 'png')
+    if isinstance(encoding, dict):
+        return encoding
+    return IMAGE_ENCODINGS[encoding]
+
+def determine_theme_from_topic(topic):
+    topic_lower = topic.lower()
+    if any(word in topic_lower for word in ['business', 'professional', 'corporate', 'finance', 'management']):
+        return 'professional'
+    elif any(word in topic_lower for word in ['tech', 'technology', 'ai', 'computer', 'digital', 'software']):
+        return 'tech'
+    elif any(word in topic_lower for word in ['creative', 'design', 'art', 'marketing', 'brand']):
+        return 'creative'
+    else:
+        return 'modern'
+
+def suggest_icons_for_topic(topic):
+    topic_lower = topic.lower()
+    icon_mapping = {
+        'computer': ['computer', 'tech', 'software', 'digital', 'programming'],
+        'brain': ['ai', 'intelligence', 'learning', 'psychology', 'education'],
+        'rocket': ['startup', 'growth', 'innovation', 'space', 'future'],
+        'chart': ['business', 'data', 'analytics', 'sales', 'finance'],
+        'gear': ['process', 'system', 'engineering', 'manufacturing'],
+        'lightbulb': ['idea', 'creative', 'innovation', 'solution']
+    }
+    for icon, keywords in icon_mapping.items():
+        if any(keyword in topic_lower for keyword in keywords):
+            return icon
+    return 'lightbulb'
+
+def make_title_spec(presentation_data, theme):
+    title_data = {
+        'title': presentation_data.get('title', 'Presentation'),
+        'subtitle': presentation_data.get('subtitle', ''),
+        'icon': suggest_icons_for_topic(presentation_data.get('topic', ''))
+    }
+    return ('title', title_data, 1, theme)
+
+def make_content_spec(slide_data, slide_num, theme):
+    slide_type = slide_data.get('type', 'content')
+    if slide_type not in SLIDE_TYPES or slide_type == 'content':
+        slide_type = 'content'
+        slide_data['icon'] = suggest_icons_for_topic(slide_data.get('title', ''))
+    return (slide_type, slide_data, slide_num, theme)
+
+def _check_field(value, kind, where):
+    if kind == 'text':
+        if not isinstance(value, str):
+            raise ValueError(f'{where} must be a string')
+    elif not isinstance(value, list):
+        raise ValueError(f'{where} must be a list')
+    else:
+        for i, item in enumerate(value):
+            if kind == 'texts':
+                _check_field(item, 'text', f'{where}[{i}]')
+            elif not isinstance(item, dict):
+                raise ValueError(f'{where}[{i}] must be an object')
+            else:
+                for name in ('title', 'description'):
+                    if name in item:
+                        _check_field(item[name], 'text', f'{where}[{i}].{name}')
+
+def validate_structure(structure):
+    """Reject a client-supplied structure the layouts cannot draw; raises ValueError naming the bad field"""
+    if not isinstance(structure, dict) or not isinstance(structure.get('slides'), list):
+        raise ValueError('structure must be an object with a slides list')
+    for name in ('title', 'subtitle', 'topic'):
+        if name in structure:
+            _check_field(structure[name], 'text', name)
+    for i, slide in enumerate(structure['slides']):
+        where = f'slides[{i}]'
+        if not isinstance(slide, dict):
+            raise ValueError(f'{where} must be an object')
+        slide_type = slide.get('type', 'content')
+        if slide_type not in SLIDE_FIELDS:
+            raise ValueError(f"{where}.type must be one of {', '.join(SLIDE_TYPES)}")
+        fields = dict(SLIDE_FIELDS[slide_type], title='text', icon='text')
+        for name, kind in fields.items():
+            if name in slide:
+                _check_field(slide[name], kind, f'{where}.{name}')
+
+def build_slide_specs(presentation_data, theme=None):
+    """Flatten a presentation structure into picklable (slide_type, slide_data, slide_num, theme) specs"""
+    if not theme:
+        theme = determine_theme_from_topic(presentation_data.get('topic', ''))
+    specs = [make_title_spec(presentation_data, theme)]
+    content_slides = presentation_data.get('slides', [])
+    for i, slide_data in enumerate(content_slides, 2):
+        specs.append(make_content_spec(slide_data, i, theme))
+    return specs
+
+def iter_slide_specs(structure_events, theme=None):
+    """Turn streamed ('header' | 'slide' | 'done', payload) events into slide specs as they arrive"""
+    slide_num = 1
+    for kind, payload in structure_events:
+        if kind == 'header':
+            if not theme:
+                theme = determine_theme_from_topic(payload.get('topic', ''))
+            yield make_title_spec(payload, theme)
+        elif kind == 'slide':
+            slide_num += 1
+            yield make_content_spec(payload, slide_num, theme)
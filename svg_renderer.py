@@ -0,0 +1,260 @@
+"""SVG backend for slide_layouts: one HTML document with an inline SVG per slide, for decks shown in a browser.
+
+Geometry and z-order follow the Pillow canvas (same 15.9x8.9in page, at 100 user units per inch). Theme colors
+are CSS custom properties from one stylesheet per theme, and backgrounds, gradients and icons are <symbol>s or
+<linearGradient>s defined once per document and referenced from every slide that uses them.
+"""
+import functools
+import io
+from xml.sax.saxutils import escape
+from themes import COLOR_SCHEMES
+from fonts import text_width
+from pil_renderer import PIL_ICONS, SLIDE_AXES_INCHES, SLIDE_PAD_INCHES, TEXT_LINE_SPACING
+
+UNITS_PER_INCH = 100
+SLIDE_VIEWBOX = (round((SLIDE_AXES_INCHES[0] + 2 * SLIDE_PAD_INCHES) * UNITS_PER_INCH),
+                 round((SLIDE_AXES_INCHES[1] + 2 * SLIDE_PAD_INCHES) * UNITS_PER_INCH))
+FONT_FAMILY = "'DejaVu Sans', Verdana, sans-serif"
+# Matching the Pillow gradients: direction -> (x1, y1, x2, y2) of the linearGradient
+GRADIENT_VECTORS = {'vertical': (0, 0, 0, 1), 'horizontal': (0, 0, 1, 0), 'diagonal': (0, 0, 1, 1)}
+
+def _n(value):
+    """Compact number for attributes: one decimal place, no trailing zeros"""
+    return f'{value:.1f}'.rstrip('0').rstrip('.') or '0'
+
+@functools.lru_cache(maxsize=None)
+def theme_stylesheet(theme):
+    """CSS for one theme: its colors as custom properties plus the fill/stroke/color classes that use them"""
+    colors = COLOR_SCHEMES[theme]
+    rules = [':root{' + ';'.join(f'--{key}:{value}' for key, value in colors.items()) + '}']
+    for key in colors:
+        rules.append(f'.f-{key}{{fill:var(--{key})}}.s-{key}{{stroke:var(--{key})}}'
+                     f'.c-{key}{{color:var(--{key})}}.g-{key}{{stop-color:var(--{key})}}')
+    rules.append(f'body{{margin:0;padding:24px;background:#eceff1;font-family:{FONT_FAMILY}}}'
+                 f'svg.slide{{display:block;width:100%;max-width:{SLIDE_VIEWBOX[0]}px;margin:0 auto 24px;'
+                 f'background:#fff;box-shadow:0 1px 4px rgba(0,0,0,.25)}}'
+                 f'svg.slide text{{font-family:{FONT_FAMILY}}}symbol{{overflow:visible}}'
+                 '.b{font-weight:bold}.i{font-style:italic}')
+    return ''.join(rules)
+
+
+class SvgDeck:
+    """Shared <defs> for one document: symbols and gradients, each emitted once however many slides use it"""
+
+    def __init__(self, theme='professional'):
+        self.theme = theme
+        self.defs = {}
+
+    def define(self, def_id, build):
+        if def_id not in self.defs:
+            self.defs[def_id] = build()
+        return def_id
+
+    def render_defs(self):
+        return ('<svg width="0" height="0" style="position:absolute" aria-hidden="true"><defs>' +
+                ''.join(self.defs.values()) + '</defs></svg>')
+
+
+class SvgSlideCanvas:
+    """Renderer canvas collecting one slide's SVG elements; finish() returns the <svg> markup"""
+
+    static_ready = False
+
+    def __init__(self, deck, slide_num=None):
+        self.deck = deck
+        self.theme = deck.theme
+        self.slide_num = slide_num
+        self.scale_x = SLIDE_AXES_INCHES[0] / 10 * UNITS_PER_INCH
+        self.scale_y = SLIDE_AXES_INCHES[1] / 10 * UNITS_PER_INCH
+        self.pad = SLIDE_PAD_INCHES * UNITS_PER_INCH
+        # Theme color value -> its key, so theme colors become CSS classes instead of inline hex
+        self._theme_keys = {}
+        for key, value in COLOR_SCHEMES[self.theme].items():
+            self._theme_keys.setdefault(value.lower(), key)
+        self._shapes = []
+        self._lines = []
+        self._texts = []
+        self._slots = {}
+
+    def px(self, x, y):
+        return self.pad + x * self.scale_x, self.pad + (10 - y) * self.scale_y
+
+    def pt(self, points):
+        return points * UNITS_PER_INCH / 72
+
+    def _paint(self, attr, color):
+        """(class, attributes) painting attr ('fill' or 'stroke') with color"""
+        if color in (None, 'none'):
+            return None, f' {attr}="none"'
+        key = self._theme_keys.get(color.lower())
+        if key is not None:
+            return f'{attr[0]}-{key}', ''
+        return None, f' {attr}="{color}"'
+
+    def _style(self, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        classes, attrs = [], ''
+        for attr, color in (('fill', facecolor), ('stroke', edgecolor if linewidth else None)):
+            if attr == 'stroke' and color in (None, 'none'):
+                continue
+            cls, extra = self._paint(attr, color)
+            if cls:
+                classes.append(cls)
+            attrs += extra
+        if edgecolor not in (None, 'none') and linewidth:
+            attrs += f' stroke-width="{_n(self.pt(linewidth))}"'
+        if alpha is not None and alpha < 1:
+            attrs += f' opacity="{alpha:g}"'
+        if classes:
+            attrs = f' class="{" ".join(classes)}"' + attrs
+        return attrs
+
+    def _box(self, xy, width, height, pad, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        x0, y1 = self.px(xy[0] - pad, xy[1] - pad)
+        x1, y0 = self.px(xy[0] + width + pad, xy[1] + height + pad)
+        corners = f' rx="{_n(pad * self.scale_x)}" ry="{_n(pad * self.scale_y)}"' if pad else ''
+        self._shapes.append(f'<rect x="{_n(x0)}" y="{_n(y0)}" width="{_n(x1 - x0)}" height="{_n(y1 - y0)}"{corners}'
+                            f'{self._style(facecolor, edgecolor, linewidth, alpha)}/>')
+
+    def _circle(self, x, y, radius, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        cx, cy = self.px(x, y)
+        self._shapes.append(f'<ellipse cx="{_n(cx)}" cy="{_n(cy)}" rx="{_n(radius * self.scale_x)}" '
+                            f'ry="{_n(radius * self.scale_y)}"{self._style(facecolor, edgecolor, linewidth, alpha)}/>')
+
+    def _points(self, points):
+        return ' '.join(f'{_n(px)},{_n(py)}' for px, py in (self.px(x, y) for x, y in points))
+
+    def _polygon(self, points, color, alpha=None):
+        self._shapes.append(f'<polygon points="{self._points(points)}"{self._style(color, alpha=alpha)}/>')
+
+    def _line(self, points, color, linewidth, alpha=None):
+        self._shapes.append(f'<polyline points="{self._points(points)}" stroke-linejoin="round"'
+                            f'{self._style("none", color, linewidth, alpha)}/>')
+
+    def _symbol(self, symbol_id, draw):
+        """Define a <symbol> holding whatever draw() adds to the shape layer, in slide coordinates"""
+        def build():
+            shapes, self._shapes = self._shapes, []
+            try:
+                draw()
+                return f'<symbol id="{symbol_id}">' + ''.join(self._shapes) + '</symbol>'
+            finally:
+                self._shapes = shapes
+        return self.deck.define(symbol_id, build)
+
+    def _gradient(self, color_keys, direction):
+        gradient_id = f'grad-{direction}-{"-".join(color_keys)}'
+        x1, y1, x2, y2 = GRADIENT_VECTORS.get(direction, GRADIENT_VECTORS['diagonal'])
+        stops = ''.join(f'<stop offset="{offset}" class="g-{key}"/>' for offset, key in zip((0, 1), color_keys))
+        return self.deck.define(gradient_id, lambda: f'<linearGradient id="{gradient_id}" x1="{x1}" y1="{y1}" '
+                                                     f'x2="{x2}" y2="{y2}">{stops}</linearGradient>')
+
+    def background(self, gradient_colors, direction, banner_y=None):
+        colors = COLOR_SCHEMES[self.theme]
+        color_keys = [self._theme_keys.get(color.lower()) for color in gradient_colors]
+        if None in color_keys:
+            raise ValueError('background gradients must use theme colors')
+        gradient_id = self._gradient(color_keys, direction)
+        banner = 'none' if banner_y is None else _n(banner_y)
+        symbol_id = f'bg-{gradient_id[5:]}-{banner}'
+
+        def draw():
+            left, top = self.px(0, 10)
+            right, bottom = self.px(10, 0)
+            self._shapes.append(f'<rect x="{_n(left)}" y="{_n(top)}" width="{_n(right - left)}" '
+                                f'height="{_n(bottom - top)}" fill="url(#{gradient_id})" opacity="0.3"/>')
+            self._circle(0.5, 9.5, 0.3, colors['accent'], alpha=0.3)
+            self._circle(9.5, 0.5, 0.25, colors['secondary'], alpha=0.3)
+            self._box((0, 4), 0.1, 2, 0, colors['primary'], alpha=0.8)
+            if banner_y is not None:
+                self._box((0.5, banner_y - 0.4), 9, 0.8, 0.1, colors['primary'], colors['accent'], 2, 0.9)
+
+        self._shapes.append(f'<use href="#{self._symbol(symbol_id, draw)}"/>')
+
+    def text(self, x, y, s, fontsize, color, ha='center', va='center', fontweight='normal', style='normal',
+             alpha=None, bbox=None):
+        self._texts.append([x, y, s, fontsize, color, ha, va, fontweight, style, alpha, bbox])
+
+    def text_slot(self, name, x, y, fontsize, color, **text_kwargs):
+        self.text(x, y, '', fontsize, color, **text_kwargs)
+        self._slots[name] = self._texts[-1]
+
+    def fill_slot(self, name, s):
+        self._slots[name][2] = s
+
+    def round_box(self, xy, width, height, pad, facecolor, edgecolor=None, linewidth=1, alpha=None):
+        self._box(xy, width, height, pad, facecolor, edgecolor, linewidth, alpha)
+
+    def vline(self, x, ymin, ymax, color, linewidth, alpha=None):
+        x0, y0 = self.px(x, ymax * 10)
+        _, y1 = self.px(x, ymin * 10)
+        self._lines.append(f'<line x1="{_n(x0)}" y1="{_n(y0)}" x2="{_n(x0)}" y2="{_n(y1)}"'
+                           f'{self._style("none", color, linewidth, alpha)}/>')
+
+    def icon(self, icon_name, x, y, size, color):
+        # Icons are drawn once at the origin; stroke widths and insets do not scale, so the size is part of the id
+        symbol_id = self._symbol(f'icon-{icon_name}-{_n(size * 10)}',
+                                 lambda: PIL_ICONS[icon_name](self, 0, 0, size, 'currentColor'))
+        cls, attrs = self._paint('color', color)
+        paint = f' class="{cls}"' if cls else attrs
+        self._shapes.append(f'<use href="#{symbol_id}" x="{_n(x * self.scale_x)}" y="{_n(-y * self.scale_y)}"{paint}/>')
+
+    def _draw_text(self, x, y, s, fontsize, color, ha, va, fontweight, style, alpha, bbox):
+        size = self.pt(fontsize)
+        bold, italic = fontweight == 'bold', style == 'italic'
+        lines = s.split('\n')
+        pitch = size * TEXT_LINE_SPACING
+        block_h = (len(lines) - 1) * pitch + size
+        px, py = self.px(x, y)
+        top = {'center': py - block_h / 2, 'top': py, 'bottom': py - block_h}.get(va, py - block_h / 2)
+        parts = []
+        if bbox and not (bbox.get('facecolor') in (None, 'none') and bbox.get('edgecolor', 'black') in (None, 'none')):
+            # Like matplotlib's text bbox, the patch gets a black 1pt edge unless told otherwise
+            block_w = max(text_width(line, size, fontweight, style) for line in lines)
+            left = px - block_w / 2 if ha == 'center' else px
+            pad = float(bbox.get('boxstyle', 'round,pad=0.3').split('pad=')[-1]) * size
+            style_attrs = self._style(bbox.get('facecolor'), bbox.get('edgecolor', 'black'), bbox.get('linewidth', 1),
+                                      bbox.get('alpha'))
+            parts.append(f'<rect x="{_n(left - pad)}" y="{_n(top - pad)}" width="{_n(block_w + 2 * pad)}" '
+                         f'height="{_n(block_h + 2 * pad)}" rx="{_n(pad)}"{style_attrs}/>')
+        cls, attrs = self._paint('fill', color)
+        classes = [c for c, on in ((cls, cls), ('b', bold), ('i', italic)) if on]
+        if classes:
+            attrs = f' class="{" ".join(classes)}"' + attrs
+        if alpha is not None and alpha < 1:
+            attrs += f' opacity="{alpha:g}"'
+        anchor = ' text-anchor="middle"' if ha == 'center' else ''
+        first = top + size / 2
+        if len(lines) == 1:
+            body = escape(s)
+        else:
+            body = ''.join(f'<tspan x="{_n(px)}" y="{_n(first + i * pitch)}">{escape(line)}</tspan>'
+                           for i, line in enumerate(lines))
+        parts.append(f'<text x="{_n(px)}" y="{_n(first)}" font-size="{_n(size)}" dominant-baseline="central"'
+                     f'{anchor}{attrs}>{body}</text>')
+        return ''.join(parts)
+
+    def finish(self):
+        label = f' aria-label="Slide {self.slide_num}"' if self.slide_num else ''
+        texts = [self._draw_text(*text) for text in self._texts if text[2]]
+        return (f'<svg class="slide" viewBox="0 0 {SLIDE_VIEWBOX[0]} {SLIDE_VIEWBOX[1]}" role="img"{label}>' +
+                ''.join(self._shapes) + ''.join(self._lines) + ''.join(texts) + '</svg>')
+
+
+def build_html_deck(specs):
+    """Render slide specs into one self-contained HTML document and return it as a BytesIO"""
+    from slide_layouts import draw_slide
+    deck = None
+    title = 'Presentation'
+    slides = []
+    for slide_type, slide_data, slide_num, theme in specs:
+        if deck is None:
+            deck = SvgDeck(theme)
+        if slide_type == 'title':
+            title = slide_data.get('title') or title
+        slides.append(draw_slide(SvgSlideCanvas(deck, slide_num), slide_type, slide_data, slide_num, deck.theme))
+    deck = deck or SvgDeck()
+    document = (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+                f'<meta name="viewport" content="width=device-width, initial-scale=1">'
+                f'<title>{escape(title)}</title><style>{theme_stylesheet(deck.theme)}</style></head><body>'
+                f'{deck.render_defs()}' + '\n'.join(slides) + '</body></html>')
+    return io.BytesIO(document.encode('utf-8'))
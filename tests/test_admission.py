@@ -0,0 +1,110 @@
+import threading
+import time
+import pytest
+import admission
+import ai_structures
+import slide_specs
+from admission import AdmissionController, Overloaded, estimate_render_bytes
+
+
+def test_requests_within_budget_run_together():
+    controller = AdmissionController(budget=100, max_queue=1, max_wait=1)
+    with controller.admit(40), controller.admit(60):
+        assert controller.stats() == {'queue_depth': 0, 'active': 2, 'in_use_bytes': 100, 'budget_bytes': 100}
+    assert controller.stats()['in_use_bytes'] == 0
+
+
+def test_full_queue_is_rejected():
+    controller = AdmissionController(budget=100, max_queue=0, max_wait=1)
+    with controller.admit(100):
+        with pytest.raises(Overloaded) as excinfo:
+            with controller.admit(1):
+                pass
+    assert excinfo.value.reason == 'queue_full'
+
+
+def test_bounded_waiter_times_out():
+    controller = AdmissionController(budget=100, max_queue=1, max_wait=0.05)
+    with controller.admit(100):
+        started = time.monotonic()
+        with pytest.raises(Overloaded) as excinfo:
+            with controller.admit(1):
+                pass
+        assert time.monotonic() - started >= 0.05
+    assert excinfo.value.reason == 'timeout'
+    assert controller.stats()['queue_depth'] == 0
+
+
+def test_waiters_are_admitted_in_order_as_budget_frees():
+    controller = AdmissionController(budget=100, max_queue=2, max_wait=5)
+    order = []
+
+    def request(name, cost):
+        with controller.admit(cost):
+            order.append(name)
+
+    held = controller.admit(100)
+    held.__enter__()
+    big = threading.Thread(target=request, args=('big', 80))
+    big.start()
+    while controller.stats()['queue_depth'] < 1:
+        time.sleep(0.01)
+    # The small request would fit next to 'big' but may not overtake it
+    small = threading.Thread(target=request, args=('small', 10))
+    small.start()
+    while controller.stats()['queue_depth'] < 2:
+        time.sleep(0.01)
+    assert order == []
+    held.__exit__(None, None, None)
+    big.join(5)
+    small.join(5)
+    assert order == ['big', 'small']
+
+
+def test_unbounded_waiters_ignore_the_queue_limit():
+    controller = AdmissionController(budget=100, max_queue=0, max_wait=0.01)
+    admitted = threading.Event()
+
+    def job():
+        with controller.admit(50, bounded=False):
+            admitted.set()
+
+    with controller.admit(100):
+        thread = threading.Thread(target=job)
+        thread.start()
+        time.sleep(0.05)
+        assert not admitted.is_set()
+    thread.join(5)
+    assert admitted.is_set()
+
+
+def test_overloaded_preview_answers_503(monkeypatch):
+    from app import app
+    controller = AdmissionController(budget=100, max_queue=0, max_wait=1)
+    monkeypatch.setattr(admission, '_controller', controller)
+    monkeypatch.setattr(ai_structures, 'get_presentation_structure',
+                        lambda prompt: {'title': prompt, 'slides': [{'type': 'text', 'title': 'One', 'content': ['a']}]})
+    with controller.admit(100):
+        response = app.test_client().get('/preview/?prompt=topic')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(admission.ADMISSION_RETRY_AFTER)
+    assert 'queue_full' in response.get_json()['error']
+
+
+def test_raster_estimate_follows_slides_in_flight_not_deck_length(monkeypatch):
+    monkeypatch.setattr(slide_specs, 'RENDER_WORKERS', 2)
+    assert estimate_render_bytes(7, 'pdf', 'raster') == estimate_render_bytes(70, 'pdf', 'raster')
+    assert estimate_render_bytes(1, 'pdf', 'raster') < estimate_render_bytes(7, 'pdf', 'raster')
+    assert estimate_render_bytes(7, 'pdf', 'raster', workers=1) == estimate_render_bytes(1, 'pdf', 'raster')
+    assert estimate_render_bytes(70, 'pdf', 'vector') > estimate_render_bytes(7, 'pdf', 'vector')
+
+
+def test_two_long_default_print_decks_share_the_default_budget(monkeypatch):
+    # A 64 GiB machine running two render workers: only two slides per deck are ever in flight
+    pages = {'SC_PAGE_SIZE': 4096, 'SC_PHYS_PAGES': 64 * 1024 ** 3 // 4096}
+    monkeypatch.setattr(admission.os, 'sysconf', pages.__getitem__)
+    monkeypatch.setattr(slide_specs, 'RENDER_WORKERS', 2)
+    controller = AdmissionController(budget=admission._default_budget(), max_queue=0)
+    cost = estimate_render_bytes(30, 'pdf', 'raster', 'print')
+    with controller.admit(cost), controller.admit(cost):
+        assert controller.stats()['active'] == 2
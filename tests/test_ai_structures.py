@@ -0,0 +1,154 @@
+import json
+import threading
+import pytest
+import ai_structures
+from ai_structures import IncrementalSlidesParser, stream_presentation_structure
+
+DECK = {
+    'title': 'Graph {Theory}',
+    'subtitle': 'Nodes, "edges" and paths',
+    'topic': 'math',
+    'slides': [
+        {'title': 'Definition', 'definition': 'A set of vertices [V] and edges {E}', 'type': 'definition'},
+        {'title': 'Uses', 'use_cases': [{'title': 'Maps', 'description': 'Shortest \\"paths\\"'}], 'type': 'use_cases'},
+        {'title': 'Wrap-up', 'conclusion': 'Graphs are everywhere', 'takeaways': ['a', 'b'], 'type': 'conclusion'}
+    ]
+}
+COMPLETION = 'Sure! Here is the JSON:\n' + json.dumps(DECK, indent=2) + '\nHope this helps.'
+
+
+class _Obj:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class FakeStreamingClient:
+    """Stands in for groq.Groq: chat.completions.create(stream=True) yields the text in fixed-size chunks"""
+
+    def __init__(self, text, chunk_size=7):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.chat = _Obj(completions=self)
+
+    def create(self, stream=False, **kwargs):
+        assert stream
+        self.calls += 1
+        return self._chunks()
+
+    def _chunks(self):
+        for i in range(0, len(self.text), self.chunk_size):
+            yield _Obj(choices=[_Obj(delta=_Obj(content=self.text[i:i + self.chunk_size]))])
+        yield _Obj(choices=[])
+
+
+@pytest.fixture(autouse=True)
+def clear_structure_cache():
+    ai_structures._structure_cache.clear()
+    yield
+    ai_structures._structure_cache.clear()
+
+
+def feed_all(text, chunk_size):
+    parser = IncrementalSlidesParser()
+    events = []
+    for i in range(0, len(text), chunk_size):
+        events += parser.feed(text[i:i + chunk_size])
+    return events
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5, 64, 10000])
+def test_parser_emits_header_then_each_slide_whatever_the_chunking(chunk_size):
+    events = feed_all(COMPLETION, chunk_size)
+    assert events[0] == ('header', {'title': DECK['title'], 'subtitle': DECK['subtitle'], 'topic': 'math'})
+    assert events[1:] == [('slide', slide) for slide in DECK['slides']]
+
+
+def test_parser_only_emits_closed_slides_from_truncated_input():
+    text = json.dumps(DECK)
+    cut = text.index('"Wrap-up"')
+    events = feed_all(text[:cut], 3)
+    assert [kind for kind, _ in events] == ['header', 'slide', 'slide']
+
+
+def test_parser_ignores_nested_arrays_and_slides_key_inside_slides():
+    deck = {'title': 't', 'slides': [{'title': 's', 'slides': [{'title': 'nested'}], 'points': [[1], [2]]}]}
+    events = feed_all(json.dumps(deck), 4)
+    assert events == [('header', {'title': 't'}), ('slide', deck['slides'][0])]
+
+
+def test_parser_tolerates_malformed_input():
+    events = feed_all('not json at all ] } "unterminated', 3)
+    assert events == []
+
+
+def test_stream_yields_header_slides_and_caches_the_result():
+    client = FakeStreamingClient(COMPLETION)
+    events = list(stream_presentation_structure('graphs', llm_client=client))
+    assert [kind for kind, _ in events] == ['header', 'slide', 'slide', 'slide', 'done']
+    assert events[-1][1] == DECK
+    # The second call is served from the cache without touching the client
+    assert list(stream_presentation_structure('graphs', llm_client=client))[-1][1] == DECK
+    assert client.calls == 1
+
+
+def test_truncated_stream_ends_after_streamed_slides_without_fallback_content():
+    text = json.dumps(DECK)
+    client = FakeStreamingClient(text[:text.index('"Wrap-up"')])
+    events = list(stream_presentation_structure('graphs', llm_client=client))
+    slides = [payload for kind, payload in events if kind == 'slide']
+    assert slides == DECK['slides'][:2]
+    done = events[-1][1]
+    assert done['slides'] == DECK['slides'][:2] and done['degraded'] is True
+    assert done['title'] == DECK['title']
+    # Degraded decks are not cached
+    assert ai_structures._structure_cache.get(ai_structures.structure_cache_key('graphs')) is None
+
+
+def test_malformed_slide_ends_the_stream_after_the_slides_before_it():
+    text = json.dumps(DECK)
+    cut = text.index('"Wrap-up"')
+    bad = text[:cut] + '"Wrap-up", "type": "conclusion",}, {"title": "after"}]}'
+    parser_events = feed_all(bad, 4)
+    assert [kind for kind, _ in parser_events] == ['header', 'slide', 'slide']
+    events = list(stream_presentation_structure('graphs', llm_client=FakeStreamingClient(bad)))
+    assert [kind for kind, _ in events] == ['header', 'slide', 'slide', 'done']
+    done = events[-1][1]
+    assert done['slides'] == DECK['slides'][:2] and done['degraded'] is True
+    assert ai_structures._structure_cache.get(ai_structures.structure_cache_key('graphs')) is None
+
+
+def test_malformed_stream_without_slides_falls_back():
+    client = FakeStreamingClient('I cannot help with that {oops')
+    events = list(stream_presentation_structure('graphs', llm_client=client))
+    fallback = ai_structures.fallback_structure('graphs')
+    assert events[0] == ('header', {k: v for k, v in fallback.items() if k != 'slides'})
+    assert events[-1] == ('done', fallback)
+
+
+def test_concurrent_streams_for_one_topic_share_a_completion():
+    release = threading.Event()
+
+    class SlowClient(FakeStreamingClient):
+        def _chunks(self):
+            release.wait(5)
+            yield from super()._chunks()
+
+    client = SlowClient(COMPLETION)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(list(stream_presentation_structure('graphs', client))))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert client.calls == 1
+    assert [events[-1][1] for events in results] == [DECK] * 4
+
+
+def test_missing_api_key_fails_clearly(monkeypatch):
+    monkeypatch.setattr(ai_structures, 'GROQ_API_KEY', None)
+    monkeypatch.setattr(ai_structures, 'client', None)
+    with pytest.raises(RuntimeError, match='GROQ_API_KEY'):
+        ai_structures.get_client()
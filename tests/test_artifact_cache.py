@@ -0,0 +1,60 @@
+import copy
+import pytest
+import artifact_cache
+import pipeline
+from caching import DiskCache
+from slide_specs import SAMPLE_DECK
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(artifact_cache, '_artifacts', cache)
+    monkeypatch.setattr(pipeline, 'get_presentation_structure', lambda prompt: copy.deepcopy(SAMPLE_DECK))
+    renders = []
+    render_deck = pipeline.render_deck
+
+    def counting_render_deck(*args, **kwargs):
+        renders.append(args[1])
+        return render_deck(*args, **kwargs)
+    monkeypatch.setattr(pipeline, 'render_deck', counting_render_deck)
+    return renders
+
+
+def test_second_request_is_served_from_the_artifact_cache(artifacts):
+    first, mimetype, _, etag = pipeline.generate_deck_cached('topic', 'html')
+    with first:
+        body = first.read()
+    second, _, _, second_etag = pipeline.generate_deck_cached('topic', 'html')
+    with second:
+        assert second.read() == body
+    assert artifacts == ['html'] and second_etag == etag and mimetype == 'text/html'
+
+
+def test_options_are_part_of_the_key():
+    structure = copy.deepcopy(SAMPLE_DECK)
+    keys = {artifact_cache.artifact_key(structure, 'pdf', 'raster', profile) for profile in ('preview', 'screen')}
+    keys.add(artifact_cache.artifact_key(structure, 'pdf', 'vector', 'preview'))
+    assert len(keys) == 3
+    # Vector output ignores the raster profile
+    assert (artifact_cache.artifact_key(structure, 'pdf', 'vector', 'preview') ==
+            artifact_cache.artifact_key(structure, 'pdf', 'vector', 'print'))
+
+
+def test_conditional_get_answers_304(artifacts):
+    from app import app
+    client = app.test_client()
+    response = client.get('/generate/html/?prompt=topic')
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and response.data.startswith(b'<!DOCTYPE html>')
+    response = client.get('/generate/html/?prompt=topic', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.data == b''
+    assert artifacts == ['html']
+
+
+def test_disabled_cache_still_returns_the_deck(monkeypatch, artifacts):
+    monkeypatch.setattr(artifact_cache, 'ARTIFACT_CACHE_BYTES', 0)
+    for _ in range(2):
+        fileobj, _, _, etag = pipeline.generate_deck_cached('topic', 'html')
+        fileobj.close()
+    assert artifacts == ['html', 'html'] and etag
@@ -0,0 +1,86 @@
+import asyncio
+import copy
+import json
+import pytest
+import admission
+import ai_structures
+import artifact_cache
+import asgi
+from admission import AdmissionController
+from caching import DiskCache
+from slide_specs import SAMPLE_DECK
+
+
+def call(path, query=b'', headers=()):
+    """Drive the ASGI app through one GET and return (status, headers dict, body)"""
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query, 'root_path': '',
+             'headers': [(name, value) for name, value in headers], 'http_version': '1.1', 'scheme': 'http',
+             'server': ('testserver', 80), 'client': ('127.0.0.1', 1234)}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    start = sent[0]
+    assert start['type'] == 'http.response.start'
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    assert not sent[-1].get('more_body')
+    return start['status'], dict(start['headers']), body
+
+
+@pytest.fixture
+def structures(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_cache, '_artifacts', DiskCache(str(tmp_path), max_bytes=10 * 1024 * 1024))
+    prompts = []
+
+    async def get_presentation_structure_async(prompt):
+        prompts.append(prompt)
+        return copy.deepcopy(SAMPLE_DECK)
+    monkeypatch.setattr(ai_structures, 'get_presentation_structure_async', get_presentation_structure_async)
+    return prompts
+
+
+def test_generate_streams_the_deck_with_validators(structures):
+    status, headers, body = call('/generate/html/', b'prompt=ml')
+    assert status == 200 and structures == ['ml']
+    assert headers[b'content-type'].startswith(b'text/html')
+    assert int(headers[b'content-length']) == len(body) and body.startswith(b'<!DOCTYPE html>')
+    assert headers[b'etag'] and b'max-age=' in headers[b'cache-control'] and b'total' in headers[b'server-timing']
+
+
+def test_matching_etag_answers_304_with_only_the_validators(structures):
+    _, headers, _ = call('/generate/html/', b'prompt=ml')
+    status, not_modified, body = call('/generate/html/', b'prompt=ml', [(b'if-none-match', headers[b'etag'])])
+    assert status == 304 and body == b''
+    assert not_modified == {b'etag': headers[b'etag'], b'cache-control': headers[b'cache-control']}
+
+
+@pytest.mark.parametrize('path, query', [('/generate/doc/', b'prompt=ml'), ('/generate/pdf/', b''),
+                                         ('/generate/pdf/', b'prompt=ml&mode=bitmap')])
+def test_bad_requests_answer_400(structures, path, query):
+    status, _, body = call(path, query)
+    assert status == 400 and body
+    assert structures == []
+
+
+def test_overloaded_render_answers_503(structures, monkeypatch):
+    controller = AdmissionController(budget=100, max_queue=0, max_wait=1)
+    monkeypatch.setattr(admission, '_controller', controller)
+    with controller.admit(100):
+        status, headers, body = call('/generate/pdf/', b'prompt=ml&mode=raster&profile=preview')
+    assert status == 503
+    assert headers[b'retry-after'] == str(admission.ADMISSION_RETRY_AFTER).encode()
+    assert 'queue_full' in json.loads(body)['error']
+
+
+def test_other_paths_go_to_flask(structures):
+    status, headers, body = call('/metrics')
+    assert status == 200 and b'flowchats_' in body
+    # Without the trailing slash the async route does not match; Flask redirects to the canonical URL
+    status, headers, _ = call('/generate/html', b'prompt=ml')
+    assert status == 308 and headers[b'location'].endswith(b'/generate/html/?prompt=ml')
+    assert structures == []
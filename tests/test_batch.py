@@ -0,0 +1,16 @@
+import pytest
+import slide_specs
+from batch import validate_batch
+
+
+@pytest.mark.parametrize('workers', ['abc', 0, -1, 2.5, True, '1e9'])
+def test_validate_batch_rejects_bad_worker_counts(workers):
+    with pytest.raises(ValueError, match='workers'):
+        validate_batch(['topic'], 'pdf', workers=workers)
+
+
+def test_validate_batch_caps_workers_at_the_render_pool(monkeypatch):
+    monkeypatch.setattr(slide_specs, 'RENDER_WORKERS', 4)
+    assert validate_batch(['topic'], 'pdf', workers='2') == 2
+    assert validate_batch(['topic'], 'pdf', workers=1000) == 4
+    assert validate_batch(['topic'], 'pdf') is None
@@ -0,0 +1,70 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import ai_structures
+import bulk
+
+
+@pytest.fixture
+def structures(monkeypatch):
+    """Serve structures without the LLM and run decks on threads so the patch reaches the workers"""
+    calls = []
+
+    def get_presentation_structure(prompt):
+        calls.append(prompt)
+        if prompt.startswith('fail'):
+            raise RuntimeError('llm down')
+        return {'title': prompt, 'slides': [{'type': 'text', 'title': 'One', 'content': ['a']}]}
+
+    monkeypatch.setattr(ai_structures, 'get_presentation_structure', get_presentation_structure)
+    monkeypatch.setattr(bulk, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    return calls
+
+
+def write_records(path, records):
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+
+
+def test_rerun_skips_finished_decks_and_retries_failures(tmp_path, structures, monkeypatch):
+    input_path = tmp_path / 'prompts.jsonl'
+    output_dir = tmp_path / 'decks'
+    write_records(input_path, [{'prompt': 'alpha', 'format': 'ppt'}, {'prompt': 'fail once', 'format': 'ppt'}])
+
+    report = bulk.run(str(input_path), str(output_dir), workers=2)
+    assert (report['succeeded'], report['failed'], report['skipped']) == (1, 1, 0)
+    assert sorted(structures) == ['alpha', 'fail once']
+    assert len(list(output_dir.glob('*.pptx'))) == 1
+
+    # A kill mid-checkpoint leaves a truncated line; the next run must still read the manifest
+    with open(output_dir / bulk.MANIFEST_NAME, 'a') as manifest:
+        manifest.write('{"key": "trunc')
+    structures.clear()
+    monkeypatch.setattr(ai_structures, 'get_presentation_structure',
+                        lambda prompt: structures.append(prompt) or {'title': prompt, 'slides': []})
+    report = bulk.run(str(input_path), str(output_dir), workers=2)
+    # Only the failed deck is generated again
+    assert structures == ['fail once']
+    assert (report['succeeded'], report['failed'], report['skipped']) == (1, 0, 1)
+    assert len(list(output_dir.glob('*.pptx'))) == 2
+    report = bulk.run(str(input_path), str(output_dir), workers=2)
+    assert (report['succeeded'], report['skipped']) == (0, 2)
+
+
+def test_missing_output_file_is_regenerated(tmp_path, structures):
+    input_path = tmp_path / 'prompts.jsonl'
+    output_dir = tmp_path / 'decks'
+    input_path.write_text(json.dumps({'prompt': 'alpha', 'format': 'ppt', 'id': 7}) + '\n')
+    bulk.run(str(input_path), str(output_dir), workers=1)
+    entry = bulk.load_manifest(str(output_dir))['7']
+    (output_dir / entry['file']).unlink()
+    report = bulk.run(str(input_path), str(output_dir), workers=1)
+    assert report['succeeded'] == 1 and report['skipped'] == 0
+    assert structures == ['alpha', 'alpha']
+
+
+def test_invalid_lines_fail_without_a_structure_call(tmp_path, structures):
+    input_path = tmp_path / 'prompts.jsonl'
+    input_path.write_text('not json\n\n{"prompt": "  "}\n')
+    report = bulk.run(str(input_path), str(tmp_path / 'decks'), workers=1)
+    assert (report['processed'], report['failed']) == (2, 2)
+    assert structures == []
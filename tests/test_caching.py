@@ -0,0 +1,157 @@
+import io
+import os
+import sqlite3
+import threading
+import time
+import pytest
+import caching
+from caching import LRUCache, SQLiteCache, DiskCache, SingleFlight
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_lru_byte_budget_skips_oversized_values():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put('a', b'x' * 6)
+    cache.put('b', b'x' * 6)
+    assert 'a' not in cache and cache.stats()['bytes'] == 6
+    cache.put('huge', b'x' * 11)
+    assert 'huge' not in cache and 'b' in cache
+
+
+def test_lru_ttl_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(caching.time, 'monotonic', lambda: now[0])
+    cache = LRUCache(ttl=5)
+    cache.put('a', 1)
+    now[0] += 4
+    assert cache.get('a') == 1
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    SQLiteCache(path).put('k', {'slides': [1, 2]})
+    assert SQLiteCache(path).get('k') == {'slides': [1, 2]}
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_sqlite_cache_purges_expired_rows_on_open_and_every_n_puts(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.db')
+    now = [1000.0]
+    monkeypatch.setattr(caching.time, 'time', lambda: now[0])
+    cache = SQLiteCache(path, ttl=10, purge_every=3)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    now[0] += 20
+    assert _rows(path) == 2
+    # The third put triggers a purge of the two expired rows
+    cache.put('c', 3)
+    assert _rows(path) == 1
+
+    now[0] += 20
+    SQLiteCache(path, ttl=10)
+    assert _rows(path) == 0
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'value'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('k', load)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do('k', load))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    assert calls == [1]
+    assert results == ['value'] * 5
+
+
+def test_single_flight_propagates_errors_and_forgets_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        flight.do('k', fail)
+    assert flight.do('k', lambda: 'retried') == 'retried'
+
+
+def age(cache, key, seconds_ago):
+    stamp = time.time() - seconds_ago
+    os.utime(cache._path(key), (stamp, stamp))
+
+
+def test_disk_cache_round_trip_and_stats(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    assert cache.get('missing') is None
+    cache.put('k', b'value')
+    assert cache.get('k') == b'value'
+    with cache.open('k') as f:
+        assert f.read() == b'value'
+    assert cache.stats() == {'entries': 1, 'bytes': 5, 'hits': 2, 'misses': 1, 'evictions': 0}
+
+
+def test_disk_cache_evicts_least_recently_used_files(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    cache.put('a', b'x' * 4)
+    cache.put('b', b'x' * 4)
+    age(cache, 'a', 20)
+    age(cache, 'b', 10)
+    # A hit refreshes the mtime, so 'b' becomes the oldest entry
+    assert cache.get('a') == b'x' * 4
+    cache.put('c', b'x' * 4)
+    assert cache.get('b') is None
+    assert cache.get('a') == b'x' * 4 and cache.get('c') == b'x' * 4
+    assert cache.stats()['evictions'] == 1 and cache.stats()['bytes'] == 8
+
+
+def test_disk_cache_skips_files_larger_than_the_budget(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    assert cache.put_file('big', io.BytesIO(b'x' * 11)) is False
+    assert cache.get('big') is None
+    # The temporary file is cleaned up too
+    assert os.listdir(tmp_path) == []
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    writer = DiskCache(str(tmp_path), max_bytes=100)
+    writer.put('k', b'value')
+    reader = DiskCache(str(tmp_path), max_bytes=100)
+    assert reader.stats()['bytes'] == 5
+    assert reader.get('k') == b'value'
+    reader.clear()
+    assert writer.get('k') is None
@@ -0,0 +1,69 @@
+import copy
+import json
+import threading
+import pytest
+import app as app_module
+import events
+import jobs
+from jobs import JobManager, InMemoryResultStore
+from slide_specs import SAMPLE_DECK
+
+
+def parse_events(chunks):
+    """Yield (event, data) per SSE message, skipping keep-alive comments"""
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk.decode('utf-8')
+        while '\n\n' in buffer:
+            message, buffer = buffer.split('\n\n', 1)
+            fields = dict(line.split(': ', 1) for line in message.split('\n') if not line.startswith(':'))
+            if fields:
+                yield fields['event'], json.loads(fields['data'])
+
+
+@pytest.fixture
+def job_manager(monkeypatch):
+    release = threading.Event()
+
+    def generate_deck(prompt, format, progress, interactive, **options):
+        progress('rendering', 1, 7)
+        release.wait(5)
+        return jobs.io.BytesIO(b'deck'), 'application/pdf', 'presentation.pdf'
+
+    monkeypatch.setattr(jobs, 'generate_deck', generate_deck)
+    monkeypatch.setattr(events, 'get_presentation_structure', lambda prompt: copy.deepcopy(SAMPLE_DECK))
+    manager = JobManager(InMemoryResultStore(), workers=1)
+    monkeypatch.setattr(app_module, '_job_manager', manager)
+    manager.release = release
+    return manager
+
+
+def test_events_stream_structure_slides_progress_then_done(job_manager):
+    response = app_module.app.test_client().get('/events/pdf/?prompt=ml', buffered=False)
+    assert response.status_code == 200 and response.mimetype == 'text/event-stream'
+    received = []
+    for event, data in parse_events(response.response):
+        received.append((event, data))
+        if event == 'progress' and data['stage'] == 'rendering':
+            # The deck finishes only after the previews, so the stream has to report progress first
+            job_manager.release.set()
+    response.close()
+    kinds = [event for event, _ in received]
+    slide_count = len(SAMPLE_DECK['slides']) + 1
+    progress_count = kinds.count('progress')
+    assert progress_count >= 1
+    assert kinds == ['structure'] + ['slide'] * slide_count + ['progress'] * progress_count + ['done']
+    structure = received[0][1]
+    assert structure['slide_count'] == slide_count and structure['slides'][0] == SAMPLE_DECK['title']
+    slides = [data for event, data in received if event == 'slide']
+    assert [slide['index'] for slide in slides] == list(range(slide_count))
+    assert all(slide['image'].startswith('data:image/jpeg;base64,') for slide in slides)
+    assert received[-2][1] == {'stage': 'rendering', 'slides_done': 1, 'slides_total': 7}
+    assert received[-1][1]['download_url'].endswith('/download')
+
+
+@pytest.mark.parametrize('query', ['/events/doc/?prompt=ml', '/events/pdf/?prompt=ml&mode=bitmap',
+                                   '/events/pdf/'])
+def test_events_reject_bad_requests_before_streaming(job_manager, query):
+    response = app_module.app.test_client().get(query)
+    assert response.status_code == 400 and response.mimetype != 'text/event-stream'
@@ -0,0 +1,80 @@
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from file_utils import merge_images_to_pdf, merge_images_to_ppt
+from image_encoding import IMAGE_MIMETYPES, encode_image, theme_palette_colors
+from slide_specs import IMAGE_ENCODINGS
+from test_pdf_writer import parse_pdf, image_stream
+
+THEME = 'tech'
+
+
+def slide_like_image():
+    """Flat bands in every theme color above a smooth gradient, like a slide's fills over its background"""
+    colors = theme_palette_colors(THEME)
+    pixels = np.zeros((120, 200, 3), dtype=np.uint8)
+    for i, color in enumerate(colors):
+        pixels[i * 8:(i + 1) * 8] = color
+    pixels[80:] = np.linspace(0, 255, 200, dtype=np.uint8)[None, :, None]
+    return Image.fromarray(pixels, 'RGB'), colors
+
+
+def encode(name, image, dpi=72):
+    buf = io.BytesIO()
+    encode_image(image, buf, IMAGE_ENCODINGS[name], dpi, THEME)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize('name', sorted(IMAGE_ENCODINGS))
+def test_each_encoding_produces_its_advertised_format(name):
+    image, _ = slide_like_image()
+    decoded = Image.open(io.BytesIO(encode(name, image)))
+    format = IMAGE_ENCODINGS[name]['format']
+    assert Image.MIME[decoded.format] == IMAGE_MIMETYPES[format]
+    assert decoded.size == image.size
+    if format != 'webp':
+        assert decoded.info['dpi'] == pytest.approx((72, 72), abs=0.01)
+
+
+@pytest.mark.parametrize('name', ['fast', 'png', 'optimized'])
+def test_png_encodings_are_lossless(name):
+    image, _ = slide_like_image()
+    assert np.array_equal(np.asarray(Image.open(io.BytesIO(encode(name, image)))), np.asarray(image))
+
+
+def test_palette_keeps_theme_colors_exact():
+    image, colors = slide_like_image()
+    decoded = Image.open(io.BytesIO(encode('palette', image)))
+    assert decoded.mode == 'P'
+    rgb = np.asarray(decoded.convert('RGB'))
+    for i, color in enumerate(colors):
+        assert (rgb[i * 8:(i + 1) * 8] == color).all()
+    # The gradient gets the adaptive entries, so it stays close without dithering noise
+    assert np.abs(rgb[80:].astype(int) - np.asarray(image)[80:]).max() <= 16
+
+
+@pytest.mark.parametrize('name, passthrough', [('png', True), ('palette', True), ('jpeg', True), ('webp', False)])
+def test_pdf_embeds_png_and_jpeg_slides_as_is(name, passthrough):
+    image, _ = slide_like_image()
+    data = encode(name, image)
+    pdf = merge_images_to_pdf([io.BytesIO(data)])
+    objects = parse_pdf(pdf.read())
+    xobject = next(obj for obj in objects.values() if b'/Subtype /Image' in obj)
+    assert b'/Width 200 /Height 120' in xobject
+    if name == 'jpeg':
+        assert b'/DCTDecode' in xobject and image_stream(xobject) == data
+    elif passthrough:
+        # PNG IDAT data carries its row filters, declared with the PNG predictor
+        assert b'/Predictor 15' in xobject
+    else:
+        assert b'/FlateDecode' in xobject and b'/Predictor' not in xobject
+
+
+def test_ppt_accepts_every_encoding():
+    from pptx import Presentation
+    image, _ = slide_like_image()
+    deck = merge_images_to_ppt([io.BytesIO(encode(name, image)) for name in sorted(IMAGE_ENCODINGS)])
+    slides = Presentation(deck).slides
+    assert len(slides) == len(IMAGE_ENCODINGS)
+    assert {slide.shapes[0].image.content_type for slide in slides} <= {'image/png', 'image/jpeg'}
@@ -0,0 +1,60 @@
+import io
+import threading
+import time
+import jobs
+from jobs import JobManager, FileSystemResultStore, InMemoryResultStore
+
+
+def fake_generate_deck(release):
+    def generate_deck(prompt, format, progress, interactive, **options):
+        progress('rendering', 1, 2)
+        release.wait(5)
+        return io.BytesIO(b'deck:' + prompt.encode()), 'application/pdf', 'presentation.pdf'
+    return generate_deck
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_job_status_is_shared_through_the_filesystem_store(tmp_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(jobs, 'generate_deck', fake_generate_deck(release))
+    worker = JobManager(FileSystemResultStore(str(tmp_path)), workers=1)
+    # Another process (or a restarted one) only shares the directory
+    reader = JobManager(FileSystemResultStore(str(tmp_path)), workers=1)
+    job_id = worker.submit('topic', 'pdf', mode='raster', profile='preview')
+    wait_for(lambda: reader.status(job_id)['status'] == 'running')
+    assert reader.status(job_id)['slides_done'] == 1
+    release.set()
+    wait_for(lambda: reader.status(job_id)['status'] == 'done')
+    fileobj, meta = reader.result(job_id)
+    with fileobj:
+        assert fileobj.read() == b'deck:topic'
+    assert meta['download_name'] == 'presentation.pdf'
+
+
+def test_failed_job_records_the_error(monkeypatch):
+    def generate_deck(*args, **kwargs):
+        raise RuntimeError('boom')
+    monkeypatch.setattr(jobs, 'generate_deck', generate_deck)
+    manager = JobManager(InMemoryResultStore(), workers=1)
+    job_id = manager.submit('topic', 'pdf')
+    wait_for(lambda: manager.status(job_id)['status'] == 'failed')
+    assert manager.status(job_id)['error'] == 'boom'
+    assert manager.result(job_id) is None
+
+
+def test_expired_statuses_are_purged(tmp_path, monkeypatch):
+    store = FileSystemResultStore(str(tmp_path), ttl=10)
+    store.put_status('job', {'status': 'done'})
+    store.put('job', io.BytesIO(b'x'), {'mimetype': 'application/pdf'})
+    assert store.get_status('job') == {'status': 'done'}
+    now = time.time()
+    monkeypatch.setattr(jobs.time, 'time', lambda: now + 11)
+    store.purge_expired()
+    assert list(tmp_path.iterdir()) == []
+    assert store.get_status('job') is None and store.get('job') is None
@@ -0,0 +1,81 @@
+import pstats
+import re
+import app as app_module
+import metrics
+from caching import LRUCache
+from metrics import Counter, Histogram
+
+
+def test_server_timing_header_sums_repeated_stages_in_first_seen_order():
+    header = metrics.server_timing_header([('llm', 0.5), ('render', 0.01234), ('llm', 0.25), ('total', 1)])
+    assert header == 'llm;dur=750.0, render;dur=12.3, total;dur=1000.0'
+    assert metrics.server_timing_header([]) == ''
+
+
+def test_stages_are_recorded_for_the_current_request_only():
+    metrics.observe_stage('outside', 1)
+    token = metrics.start_request_timings()
+    with metrics.timed('inside'):
+        pass
+    metrics.observe_stage('inside', 0.5)
+    timings = metrics.finish_request_timings(token)
+    assert [stage for stage, _ in timings] == ['inside', 'inside'] and timings[1][1] == 0.5
+    assert metrics.current_request_timings() == []
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    histogram = Histogram('demo_seconds', 'Demo', buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 5):
+        histogram.observe(value, stage='a"b')
+    assert histogram.render() == [
+        '# HELP demo_seconds Demo',
+        '# TYPE demo_seconds histogram',
+        'demo_seconds_bucket{stage="a\\"b",le="0.1"} 1',
+        'demo_seconds_bucket{stage="a\\"b",le="1"} 3',
+        'demo_seconds_bucket{stage="a\\"b",le="+Inf"} 4',
+        'demo_seconds_sum{stage="a\\"b"} 6.25',
+        'demo_seconds_count{stage="a\\"b"} 4',
+    ]
+
+
+def test_counter_renders_one_series_per_label_set():
+    counter = Counter('demo_total', 'Demo')
+    counter.inc(kind='prompt')
+    counter.inc(3, kind='prompt')
+    counter.inc()
+    assert counter.render()[2:] == ['demo_total 1', 'demo_total{kind="prompt"} 4']
+
+
+def test_metrics_endpoint_serves_prometheus_text_with_caches_and_gauges(monkeypatch):
+    cache = LRUCache(max_bytes=100, sizeof=len)
+    cache.put('key', b'value')
+    cache.get('key')
+    monkeypatch.setitem(metrics._caches, 'demo', cache)
+    response = app_module.app.test_client().get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.get_data(as_text=True)
+    assert '# TYPE flowchats_stage_duration_seconds histogram' in body
+    assert 'flowchats_cache_hits_total{cache="demo"} 1\n' in body
+    assert 'flowchats_cache_bytes{cache="demo"} 5\n' in body
+    assert re.search(r'^flowchats_admission_queue_depth \d+$', body, re.M)
+    # Every sample line is "name{labels} value"
+    samples = [line for line in body.splitlines() if line and not line.startswith('#')]
+    assert all(re.fullmatch(r'[a-z_]+(\{[^}]*\})? \S+', line) for line in samples)
+    assert re.fullmatch(r'(\w+;dur=\d+\.\d, )*total;dur=\d+\.\d', response.headers['Server-Timing'])
+
+
+def test_sampled_requests_dump_a_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'PROFILE_SAMPLE_RATE', 1.0)
+    monkeypatch.setattr(app_module, 'PROFILE_DIR', str(tmp_path))
+    app_module.app.test_client().get('/metrics')
+    [profile] = tmp_path.iterdir()
+    assert profile.name.endswith('.prof') and '-metrics_endpoint-' in profile.name
+    assert any(name == 'render_prometheus' for _, _, name in pstats.Stats(str(profile)).stats)
+
+
+def test_unsampled_requests_are_not_profiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'PROFILE_SAMPLE_RATE', 0.0)
+    monkeypatch.setattr(app_module, 'PROFILE_DIR', str(tmp_path))
+    app_module.app.test_client().get('/metrics')
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,110 @@
+import io
+import re
+import zlib
+import pytest
+from PIL import Image
+from pdf_writer import StreamingPDFWriter, PendingBytes
+
+
+def encode(img, format='PNG', **params):
+    buf = io.BytesIO()
+    img.save(buf, format=format, **params)
+    return buf.getvalue()
+
+
+def parse_pdf(data):
+    """Check the xref table against the file and return {object number: object bytes}"""
+    assert data.startswith(b'%PDF-1.4\n') and data.endswith(b'%%EOF\n')
+    xref_offset = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', data).group(1))
+    assert data[xref_offset:].startswith(b'xref\n')
+    header, *rows = data[xref_offset:].split(b'trailer')[0].splitlines()[1:]
+    first, count = map(int, header.split())
+    assert first == 0 and len(rows) == count
+    size = int(re.search(rb'/Size (\d+)', data[xref_offset:]).group(1))
+    assert size == count
+    objects = {}
+    for num, row in enumerate(rows[1:], start=1):
+        offset = int(row[:10])
+        assert row.endswith(b' n ')
+        assert data[offset:].startswith(b'%d 0 obj\n' % num)
+        objects[num] = data[offset:data.index(b'endobj\n', offset)]
+    return objects
+
+
+def image_stream(obj):
+    length = int(re.search(rb'/Length (\d+)', obj).group(1))
+    start = obj.index(b'stream\n') + len(b'stream\n')
+    assert obj[start + length:].startswith(b'\nendstream')
+    return obj[start:start + length]
+
+
+def write_pdf(images, output=None):
+    output = output if output is not None else io.BytesIO()
+    writer = StreamingPDFWriter(output)
+    for image in images:
+        writer.add_image(image)
+    writer.close()
+    return output
+
+
+def test_pages_match_images_and_dpi():
+    slides = [encode(Image.new('RGB', (200, 100), 'red'), dpi=(100, 100)),
+              encode(Image.new('RGB', (300, 150), 'blue'), dpi=(150, 150))]
+    objects = parse_pdf(write_pdf(slides).getvalue())
+    assert re.search(rb'/Type /Pages /Kids \[(\d+ 0 R ?){2}\] /Count 2', objects[2])
+    assert b'/Type /Catalog /Pages 2 0 R' in objects[1]
+    pages = [obj for obj in objects.values() if b'/Type /Page ' in obj]
+    # 200px at 100dpi and 300px at 150dpi are both 2in = 144pt wide
+    assert len(pages) == 2
+    for page in pages:
+        box = re.search(rb'/MediaBox \[0 0 ([\d.]+) ([\d.]+)\]', page).groups()
+        # pHYs stores pixels per metre, so the dpi comes back slightly off
+        assert [float(v) for v in box] == pytest.approx([144, 72], rel=1e-3)
+
+
+@pytest.mark.parametrize('mode, colors', [('RGB', 3), ('L', 1)])
+def test_png_is_embedded_without_reencoding(mode, colors):
+    data = encode(Image.new(mode, (40, 30), 'white'))
+    objects = parse_pdf(write_pdf([data]).getvalue())
+    image = next(obj for obj in objects.values() if b'/Subtype /Image' in obj)
+    assert b'/Predictor 15 /Colors %d' % colors in image
+    # The stream is the PNG's own IDAT data: one filter byte per row ahead of the samples
+    assert len(zlib.decompress(image_stream(image))) == (40 * colors + 1) * 30
+
+
+def test_palette_png_keeps_its_palette():
+    data = encode(Image.new('RGB', (16, 16), '#123456').quantize(4))
+    objects = parse_pdf(write_pdf([data]).getvalue())
+    image = next(obj for obj in objects.values() if b'/Subtype /Image' in obj)
+    assert b'/Indexed /DeviceRGB' in image and b'123456' in image.lower()
+
+
+def test_jpeg_is_embedded_as_is():
+    data = encode(Image.new('RGB', (32, 32), 'green'), 'JPEG')
+    objects = parse_pdf(write_pdf([data]).getvalue())
+    image = next(obj for obj in objects.values() if b'/Subtype /Image' in obj)
+    assert b'/DCTDecode' in image and image_stream(image) == data
+
+
+def test_transparent_images_are_flattened_onto_white():
+    img = Image.new('RGBA', (8, 300), (255, 0, 0, 0))
+    img.paste((0, 0, 255, 255), (0, 0, 8, 10))
+    objects = parse_pdf(write_pdf([encode(img)]).getvalue())
+    image = next(obj for obj in objects.values() if b'/Subtype /Image' in obj)
+    pixels = zlib.decompress(image_stream(image))
+    assert len(pixels) == 8 * 300 * 3
+    assert pixels[:3] == b'\x00\x00\xff' and pixels[-3:] == b'\xff\xff\xff'
+
+
+def test_pending_bytes_streams_the_same_file():
+    slides = [encode(Image.new('RGB', (20, 20), color)) for color in ('red', 'green', 'blue')]
+    sink = PendingBytes()
+    writer = StreamingPDFWriter(sink)
+    chunks = []
+    for slide in slides:
+        writer.add_image(slide)
+        chunks.append(sink.drain())
+    writer.close()
+    chunks.append(sink.drain())
+    assert all(chunks) and sink.drain() == b''
+    assert b''.join(chunks) == write_pdf(slides).getvalue()
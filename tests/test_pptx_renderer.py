@@ -0,0 +1,16 @@
+import copy
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from slide_specs import SAMPLE_DECK, build_slide_specs
+from pptx_renderer import build_native_pptx_from_specs
+
+
+def test_native_pptx_has_one_editable_slide_per_spec():
+    specs = build_slide_specs(copy.deepcopy(SAMPLE_DECK), 'tech')
+    prs = Presentation(build_native_pptx_from_specs(specs))
+    assert len(prs.slides) == len(specs)
+    for slide, (_, slide_data, _, _) in zip(prs.slides, specs):
+        assert not [shape for shape in slide.shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+        texts = [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame and shape.text_frame.text]
+        assert texts
+        assert any(slide_data['title'] in text for text in texts)
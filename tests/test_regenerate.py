@@ -0,0 +1,34 @@
+import copy
+import pytest
+from app import app
+from slide_specs import SAMPLE_DECK, validate_structure
+
+
+def regenerate(structure, format='html'):
+    return app.test_client().post(f'/regenerate/{format}/', json={'structure': structure})
+
+
+@pytest.mark.parametrize('slide, message', [
+    ({'type': 'use_cases', 'use_cases': ['x']}, r'slides\[0\]\.use_cases\[0\] must be an object'),
+    ({'type': 'definition', 'characteristics': 'abc'}, r'slides\[0\]\.characteristics must be a list'),
+    ({'type': 'content', 'points': ['ok', 3]}, r'slides\[0\]\.points\[1\] must be a string'),
+    ({'type': 'examples', 'examples': [{'title': ['x']}]}, r'slides\[0\]\.examples\[0\]\.title must be a string'),
+    ({'type': 'chart', 'title': 'x'}, r'slides\[0\]\.type must be one of'),
+    ('not a slide', r'slides\[0\] must be an object'),
+])
+def test_malformed_slides_are_rejected(slide, message):
+    with pytest.raises(ValueError, match=message):
+        validate_structure({'title': 't', 'slides': [slide]})
+
+
+def test_regenerate_answers_400_for_a_malformed_structure():
+    response = regenerate({'title': 't', 'slides': [{'type': 'use_cases', 'use_cases': ['x']}]}, 'pdf')
+    assert response.status_code == 400
+    assert 'use_cases[0]' in response.get_json()['error']
+    assert regenerate({'slides': 'none'}).status_code == 400
+
+
+def test_regenerate_renders_a_valid_structure():
+    validate_structure(copy.deepcopy(SAMPLE_DECK))
+    response = regenerate(SAMPLE_DECK)
+    assert response.status_code == 200 and response.mimetype == 'text/html'
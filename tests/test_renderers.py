@@ -0,0 +1,51 @@
+import io
+import pytest
+from PIL import Image, ImageChops
+import ppt_generator
+
+PREVIEW = {'dpi': 72, 'encoding': 'fast'}
+LONG_TITLE = 'A very long content slide title that keeps going well past the edges of the banner area'
+OVERFLOWING = ('definition', {'title': 't', 'definition': 'word ' * 400, 'type': 'definition'}, 2, 'tech')
+
+
+def render(spec, renderer):
+    data, _, _ = ppt_generator.render_slide_task(spec, PREVIEW, renderer)
+    return Image.open(io.BytesIO(data)).convert('RGB')
+
+
+@pytest.mark.parametrize('spec', [
+    ('content', {'title': 'Short title', 'points': ['one', 'two'], 'type': 'content'}, 2, 'tech'),
+    ('content', {'title': LONG_TITLE, 'points': ['one', 'two'], 'type': 'content'}, 2, 'tech'),
+    OVERFLOWING
+])
+def test_template_render_matches_tight_layout(spec):
+    baseline = ppt_generator.figure_to_image(ppt_generator.create_slide_figure(*spec, dpi=PREVIEW['dpi']), PREVIEW['dpi'])
+    image = render(spec, 'matplotlib')
+    assert image.size == baseline.size
+    assert ImageChops.difference(image, baseline).getbbox() is None
+
+
+def test_template_is_restored_after_an_overflowing_slide():
+    spec = ('definition', {'title': 't', 'definition': 'short', 'type': 'definition'}, 2, 'tech')
+    before = render(spec, 'matplotlib')
+    render(OVERFLOWING, 'matplotlib')
+    assert ImageChops.difference(render(spec, 'matplotlib'), before).getbbox() is None
+
+
+@pytest.mark.parametrize('spec', [
+    ('title', {'title': LONG_TITLE + ' ' + LONG_TITLE, 'subtitle': 'and a subtitle ' * 20, 'icon': 'brain'}, 1, 'tech'),
+    ('content', {'title': LONG_TITLE, 'points': ['point ' * 60, 'x' * 120], 'type': 'content'}, 2, 'tech'),
+    ('conclusion', {'conclusion': 'Done', 'takeaways': ['takeaway ' * 40], 'type': 'conclusion'}, 3, 'modern'),
+])
+def test_overflowing_text_gives_the_same_frame_on_both_renderers(spec):
+    assert render(spec, 'pillow').size == render(spec, 'matplotlib').size
+
+
+def test_fit_text_wraps_breaks_and_truncates_to_the_width():
+    from fonts import text_width
+    from slide_layouts import fit_text, DATA_UNIT_POINTS
+    assert fit_text('Short title', 24, 7.8, 'bold') == 'Short title'
+    wrapped = fit_text(LONG_TITLE + ' ' + 'W' * 60, 24, 7.8, 'bold')
+    assert all(text_width(line, 24, 'bold') <= 7.8 * DATA_UNIT_POINTS for line in wrapped.split('\n'))
+    assert wrapped.replace('\n', ' ').replace(' ', '') == (LONG_TITLE + 'W' * 60).replace(' ', '')
+    assert fit_text(LONG_TITLE * 3, 24, 7.8, 'bold', max_lines=2).split('\n')[-1].endswith('…')
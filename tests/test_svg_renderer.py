@@ -0,0 +1,39 @@
+import copy
+import re
+from slide_specs import SAMPLE_DECK, build_slide_specs
+from svg_renderer import build_html_deck
+
+MARKUP = '<script>alert("x")</script> & R&D'
+ESCAPED = '&lt;script&gt;alert("x")&lt;/script&gt; &amp; R&amp;D'
+
+
+def render(deck):
+    return build_html_deck(build_slide_specs(copy.deepcopy(deck), 'tech')).getvalue().decode('utf-8')
+
+
+def test_slide_text_is_escaped():
+    deck = copy.deepcopy(SAMPLE_DECK)
+    deck['title'] = MARKUP
+    deck['slides'][0]['title'] = MARKUP
+    deck['slides'][0]['characteristics'][0] = '1 < 2 & "3" > 0'
+    html = render(deck)
+    assert '<script>' not in html
+    assert f'<title>{ESCAPED}</title>' in html
+    # Title slide and the definition slide's banner
+    assert html.count(f'>{ESCAPED}</') >= 2
+    assert '1 &lt; 2 &amp; "3" &gt; 0' in html
+
+
+def test_stylesheet_and_defs_are_shared():
+    html = render(SAMPLE_DECK)
+    assert html.count('<style>') == 1
+    assert html.count('<defs>') == 1
+    symbols = re.findall(r'<symbol id="([^"]+)"', html)
+    assert symbols and len(symbols) == len(set(symbols))
+    gradients = re.findall(r'<linearGradient id="([^"]+)"', html)
+    assert gradients and len(gradients) == len(set(gradients))
+    # Every slide's background is a <use> of a shared symbol, so some symbol is referenced from several slides
+    uses = re.findall(r'<use href="#([^"]+)"', html)
+    assert set(uses) <= set(symbols)
+    assert max(uses.count(symbol) for symbol in symbols) > 1
+    assert html.count('<svg class="slide"') == len(build_slide_specs(copy.deepcopy(SAMPLE_DECK), 'tech'))
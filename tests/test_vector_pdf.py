@@ -0,0 +1,17 @@
+import copy
+import re
+import pytest
+from slide_specs import SAMPLE_DECK, build_slide_specs
+from pipeline import render_deck
+
+
+@pytest.mark.filterwarnings('ignore:Glyph')
+def test_vector_pdf_has_one_page_per_slide():
+    specs = build_slide_specs(copy.deepcopy(SAMPLE_DECK), 'tech')
+    buf, mimetype, _ = render_deck(specs, 'pdf', 'vector', total=len(specs))
+    data = buf.read()
+    assert mimetype == 'application/pdf'
+    assert len(re.findall(rb'/Type /Page\b', data)) == len(specs)
+    assert re.search(rb'/Type /Pages\b.*?/Count (\d+)', data, re.S).group(1) == b'%d' % len(specs)
+    # Text stays text: the pages draw with embedded fonts rather than a screenshot of the slide
+    assert b'/Font' in data
@@ -0,0 +1,34 @@
+COLOR_SCHEMES = {
+    'professional': {
+        'primary': '#2E4057',
+        'secondary': '#048A81', 
+        'accent': '#54C6EB',
+        'bg': '#F8F9FA',
+        'text': '#2C3E50',
+        'light': '#E8F4F8'
+    },
+    'modern': {
+        'primary': '#667eea',
+        'secondary': '#764ba2',
+        'accent': '#f093fb',
+        'bg': '#ffecd2',
+        'text': '#4a4a4a',
+        'light': '#f8f1ff'
+    },
+    'tech': {
+        'primary': '#0f0f23',
+        'secondary': '#262640',
+        'accent': '#7c3aed',
+        'bg': '#f1f5f9',
+        'text': '#1e293b',
+        'light': '#e2e8f0'
+    },
+    'creative': {
+        'primary': '#ff6b6b',
+        'secondary': '#4ecdc4',
+        'accent': '#45b7d1',
+        'bg': '#fef7f7',
+        'text': '#2d3748',
+        'light': '#fef2f2'
+    }
+}
@@ -0,0 +1,64 @@
+"""Pre-build matplotlib's font cache and the render caches so the first request does not pay for them.
+
+The font cache lives on disk, so build it at build/deploy time with the same MPLCONFIGDIR the server will use:
+
+    MPLCONFIGDIR=.mplconfig python warmup.py --render
+
+The render caches are per process; the ASGI app runs warm(WARMUP_PROFILE) on lifespan startup, before it
+accepts requests.
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+# Profile rendered at server startup to fill the in-process caches; empty skips the render (fonts are still warmed)
+WARMUP_PROFILE = os.environ.get('WARMUP_PROFILE', 'preview')
+
+def warm_fonts():
+    """Build the font cache and resolve every configured family once"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import font_manager
+    import ppt_generator  # applies the rendering rcParams
+
+    resolved = {}
+    for family in matplotlib.rcParams['font.sans-serif']:
+        resolved[family] = font_manager.findfont(family, fallback_to_default=True)
+    return resolved
+
+def warm_render(profile='preview'):
+    """Render one sample deck at the given profile to fill the background layer and icon sprite caches"""
+    from slide_specs import SAMPLE_DECK
+    from ppt_generator import build_slide_specs, render_slide_png
+
+    for spec in build_slide_specs(copy.deepcopy(SAMPLE_DECK)):
+        render_slide_png(spec, profile)
+
+def warm(profile=WARMUP_PROFILE):
+    """Warm the fonts, then render the sample deck at profile unless it is empty; returns the seconds taken"""
+    start = time.perf_counter()
+    warm_fonts()
+    if profile:
+        warm_render(profile)
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--render', action='store_true', help='also render a sample deck to fill in-process caches')
+    parser.add_argument('--profile', default='preview')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    for family, path in warm_fonts().items():
+        print(f'{family:<20} {path}')
+    print(f'font cache ready in {time.perf_counter() - start:.2f}s')
+    if args.render:
+        start = time.perf_counter()
+        warm_render(args.profile)
+        print(f'sample deck rendered in {time.perf_counter() - start:.2f}s')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())